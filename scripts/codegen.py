@@ -20,12 +20,23 @@ def run_protoc() -> None:
         "grpc_tools.protoc",
         f"-I{PROTO.parent}",
         f"--python_out={OUT_PY}",
+        f"--grpc_python_out={OUT_PY}",
         str(PROTO),
     ]
     try:
         subprocess.check_call(cmd)
     except FileNotFoundError as exc:  # pragma: no cover - guard
         raise SystemExit("grpcio-tools is not installed; install via `pip install -e .[dev]`") from exc
+    _fix_grpc_imports()
+
+
+def _fix_grpc_imports() -> None:
+    """grpc_tools emits `import plan_pb2`; make it package-relative so `bstack_apis.python` can import it."""
+
+    stub = OUT_PY / f"{PROTO.stem}_pb2_grpc.py"
+    text = stub.read_text()
+    absolute = f"import {PROTO.stem}_pb2 as"
+    stub.write_text(text.replace(absolute, f"from . {absolute}", 1))
 
 
 if __name__ == "__main__":
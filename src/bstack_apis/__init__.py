@@ -18,4 +18,22 @@ __all__ = [
     "swap_window",
     "load_cache_plan",
     "load_swap_plan",
+    "PlanRecordKind",
+    "PlanRecord",
+    "PlanRingWriter",
+    "PlanRingReader",
+    "cache_plan_to_proto",
+    "cache_plan_from_proto",
+    "swap_plan_to_proto",
+    "swap_plan_from_proto",
+    "TRANSFER_KINDS",
+    "PlanColumns",
+    "plan_columns",
+    "kind_code",
+    "ArchiveEntry",
+    "PlanArchiveWriter",
+    "PlanArchiveReader",
+    "encode_plan",
+    "decode_plan",
+    "decode_columns",
 ]
@@ -1,5 +1,6 @@
 #pragma once
 
+#include <cstddef>
 #include <cstdint>
 #include <string>
 #include <vector>
@@ -65,4 +66,146 @@ struct SwapPlan {
     SwapWindow window;
 };
 
+// -----------------------------------------------------------------------------
+// Shared-memory plan ring (mirrors bstack_apis/python/ring.py)
+//
+// [0, 64)                      PlanRingHeader
+// [64, 64 + 16 * max_readers)  PlanRingCursor per reader
+// slots_offset + i * slot_size PlanRingSlotHeader followed by a compact JSON payload
+// Sequence numbers start at 1; slot i holds seq where (seq - 1) % slot_count == i.
+
+inline constexpr std::uint32_t kPlanRingMagic = 0x47525042;  // "BPRG"
+inline constexpr std::uint32_t kPlanRingVersion = 1;
+inline constexpr std::size_t kPlanRingAlign = 64;
+
+enum class PlanRecordKind : std::uint32_t {
+    UNSPECIFIED = 0,
+    CACHE_PLAN = 1,
+    SWAP_PLAN = 2,
+};
+
+struct PlanRingHeader {
+    std::uint32_t magic;
+    std::uint32_t version;
+    std::uint32_t slot_count;
+    std::uint32_t slot_size;
+    std::uint32_t max_readers;
+    std::uint32_t reserved0;
+    std::uint64_t write_seq;
+    std::uint8_t reserved[32];
+};
+static_assert(sizeof(PlanRingHeader) == 64, "PlanRingHeader layout must match ring.py");
+
+struct PlanRingCursor {
+    std::uint64_t active;
+    std::uint64_t read_seq;
+};
+static_assert(sizeof(PlanRingCursor) == 16, "PlanRingCursor layout must match ring.py");
+
+struct PlanRingSlotHeader {
+    std::uint64_t seq;
+    std::uint32_t kind;
+    std::uint32_t length;
+};
+static_assert(sizeof(PlanRingSlotHeader) == 16, "PlanRingSlotHeader layout must match ring.py");
+
+enum class PlanRingPoll : std::uint32_t {
+    RECORD = 0,
+    EMPTY = 1,
+    OVERRUN = 2,
+    DETACHED = 3,
+    INVALID = 4,
+};
+
+// Consumer over a mapped ring. The caller owns the mapping (e.g. shm_open + mmap of the
+// segment name published by PlanRingWriter) and assigns a unique reader_id.
+class PlanRingReader {
+public:
+    PlanRingReader(void* base, std::uint32_t reader_id, bool from_start = false)
+        : base_(static_cast<std::uint8_t*>(base)), reader_id_(reader_id) {
+        const auto* hdr = header();
+        valid_ = hdr->magic == kPlanRingMagic && hdr->version == kPlanRingVersion && reader_id < hdr->max_readers;
+        if (!valid_) {
+            return;
+        }
+        slots_offset_ = align(sizeof(PlanRingHeader) + sizeof(PlanRingCursor) * hdr->max_readers);
+        read_seq_ = from_start ? 0 : __atomic_load_n(&hdr->write_seq, __ATOMIC_ACQUIRE);
+        store_cursor(1);
+    }
+
+    ~PlanRingReader() {
+        if (valid_) {
+            store_cursor(0);
+        }
+    }
+
+    PlanRingReader(const PlanRingReader&) = delete;
+    PlanRingReader& operator=(const PlanRingReader&) = delete;
+
+    bool valid() const { return valid_; }
+    std::uint64_t seq() const { return read_seq_; }
+
+    // Copies the next record into `payload` when the result is RECORD. OVERRUN means the slot was
+    // reused before or while it was copied (or its header is corrupt); DETACHED means the writer
+    // dropped this reader, which stays detached until reattach().
+    PlanRingPoll poll(PlanRecordKind& kind, std::string& payload) {
+        if (!valid_) {
+            return PlanRingPoll::INVALID;
+        }
+        if (__atomic_load_n(&cursor()->active, __ATOMIC_ACQUIRE) == 0) {
+            return PlanRingPoll::DETACHED;
+        }
+        const auto* hdr = header();
+        const std::uint64_t next = read_seq_ + 1;
+        if (next > __atomic_load_n(&hdr->write_seq, __ATOMIC_ACQUIRE)) {
+            return PlanRingPoll::EMPTY;
+        }
+        const std::uint8_t* slot = base_ + slots_offset_ + ((next - 1) % hdr->slot_count) * hdr->slot_size;
+        const auto* slot_hdr = reinterpret_cast<const PlanRingSlotHeader*>(slot);
+        if (__atomic_load_n(&slot_hdr->seq, __ATOMIC_ACQUIRE) != next) {
+            return PlanRingPoll::OVERRUN;
+        }
+        const std::uint32_t length = slot_hdr->length;
+        if (length > hdr->slot_size - sizeof(PlanRingSlotHeader)) {
+            return PlanRingPoll::OVERRUN;
+        }
+        const auto record_kind = static_cast<PlanRecordKind>(slot_hdr->kind);
+        payload.assign(reinterpret_cast<const char*>(slot + sizeof(PlanRingSlotHeader)), length);
+        __atomic_thread_fence(__ATOMIC_ACQUIRE);
+        if (__atomic_load_n(&slot_hdr->seq, __ATOMIC_RELAXED) != next) {
+            return PlanRingPoll::OVERRUN;
+        }
+        kind = record_kind;
+        read_seq_ = next;
+        __atomic_store_n(&cursor()->read_seq, read_seq_, __ATOMIC_RELEASE);
+        return PlanRingPoll::RECORD;
+    }
+
+    // Re-registers a detached reader at the current write position, skipping the records it missed.
+    void reattach() {
+        if (valid_) {
+            read_seq_ = __atomic_load_n(&header()->write_seq, __ATOMIC_ACQUIRE);
+            store_cursor(1);
+        }
+    }
+
+private:
+    static std::size_t align(std::size_t value) { return (value + kPlanRingAlign - 1) / kPlanRingAlign * kPlanRingAlign; }
+
+    const PlanRingHeader* header() const { return reinterpret_cast<const PlanRingHeader*>(base_); }
+
+    PlanRingCursor* cursor() const { return reinterpret_cast<PlanRingCursor*>(base_ + sizeof(PlanRingHeader)) + reader_id_; }
+
+    void store_cursor(std::uint64_t active) {
+        __atomic_store_n(&cursor()->read_seq, read_seq_, __ATOMIC_RELEASE);
+        __atomic_store_n(&cursor()->active, active, __ATOMIC_RELEASE);
+    }
+
+    std::uint8_t* base_;
+    std::uint32_t reader_id_;
+    bool valid_{false};
+    std::size_t slots_offset_{0};
+    std::uint64_t read_seq_{0};
+};
+
 }  // namespace bw::stack
@@ -17,6 +17,10 @@ from .plan import (
     load_cache_plan,
     load_swap_plan,
 )
+from .archive import ArchiveEntry, PlanArchiveReader, PlanArchiveWriter, decode_columns, decode_plan, encode_plan
+from .columnar import TRANSFER_KINDS, PlanColumns, kind_code, plan_columns
+from .pb import cache_plan_from_proto, cache_plan_to_proto, swap_plan_from_proto, swap_plan_to_proto
+from .ring import PlanRecord, PlanRecordKind, PlanRingReader, PlanRingWriter
 
 __all__ = [
     "TransferKind",
@@ -36,4 +40,22 @@ __all__ = [
     "swap_window",
     "load_cache_plan",
     "load_swap_plan",
+    "PlanRecordKind",
+    "PlanRecord",
+    "PlanRingWriter",
+    "PlanRingReader",
+    "cache_plan_to_proto",
+    "cache_plan_from_proto",
+    "swap_plan_to_proto",
+    "swap_plan_from_proto",
+    "TRANSFER_KINDS",
+    "PlanColumns",
+    "plan_columns",
+    "kind_code",
+    "ArchiveEntry",
+    "PlanArchiveWriter",
+    "PlanArchiveReader",
+    "encode_plan",
+    "decode_plan",
+    "decode_columns",
 ]
@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+import json
+import lzma
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+
+from .columnar import PlanColumns
+from .plan import CachePlan, FileChunk, KvPageRef, SwapPlan, SwapWindow, WeightManifest
+from .ring import PlanRecordKind
+
+# Archive files are a sequence of records, each:
+#   _RECORD header | plan_id (utf-8) | payload compressed with `codec`
+# The uncompressed payload is `<I meta_len> | meta JSON | array bytes`; meta lists every array as
+# [name, dtype, count, delta] in the order its bytes follow. Integer arrays are stored in the
+# narrowest dtype that holds them; offsets and lengths are delta-encoded first. kv_refs are stored
+# as runs of consecutive pages sharing (op, tensor, head, layer).
+
+ARCHIVE_MAGIC = 0x31415042  # "BPA1"
+ARCHIVE_SUFFIX = ".bpa"
+
+_RECORD = struct.Struct("<IBBHqQQI")
+_META = struct.Struct("<I")
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+CODECS = {"none": 0, "zlib": 1, "lzma": 2}
+_CODEC_NAMES = {code: name for name, code in CODECS.items()}
+
+
+def _compress(codec: int, data: bytes, level: Optional[int]) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.compress(data, 6 if level is None else level)
+    if codec == CODECS["lzma"]:
+        return lzma.compress(data, preset=6 if level is None else level)
+    return data
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec == CODECS["lzma"]:
+        return lzma.decompress(data)
+    if codec == CODECS["none"]:
+        return data
+    raise ValueError(f"unknown archive codec {codec}")
+
+
+# -----------------------------------------------------------------------------
+# Payload encoding
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.arrays: list[list] = []
+        self.chunks: list[bytes] = []
+
+    def ints(self, name: str, values: np.ndarray, *, delta: bool = False) -> None:
+        values = np.asarray(values, dtype=np.int64)
+        if delta and values.size:
+            values = np.diff(values, prepend=0)
+        dtype = np.int64
+        if values.size:
+            lo, hi = int(values.min()), int(values.max())
+            dtype = next(dt for dt in _INT_DTYPES if np.iinfo(dt).min <= lo and hi <= np.iinfo(dt).max)
+        packed = values.astype(dtype)
+        self.arrays.append([name, packed.dtype.str, int(packed.shape[0]), delta])
+        self.chunks.append(packed.tobytes())
+
+    def runs(self, prefix: str, owner: np.ndarray, tensor: np.ndarray, page: np.ndarray, head: np.ndarray, layer: np.ndarray) -> None:
+        n = page.shape[0]
+        brk = np.ones(n, dtype=bool)
+        if n:
+            brk[1:] = (
+                (page[1:] != page[:-1] + 1)
+                | (owner[1:] != owner[:-1])
+                | (tensor[1:] != tensor[:-1])
+                | (head[1:] != head[:-1])
+                | (layer[1:] != layer[:-1])
+            )
+        starts = np.flatnonzero(brk)
+        self.ints(f"{prefix}_owner", owner[starts], delta=True)
+        self.ints(f"{prefix}_tensor", tensor[starts])
+        self.ints(f"{prefix}_page", page[starts], delta=True)
+        self.ints(f"{prefix}_len", np.diff(np.append(starts, n)))
+        self.ints(f"{prefix}_head", head[starts])
+        self.ints(f"{prefix}_layer", layer[starts])
+
+    def refs(self, prefix: str, refs: List[KvPageRef], meta: dict) -> None:
+        index: dict[str, int] = {}
+        tensor = np.asarray([index.setdefault(r.tensor, len(index)) for r in refs], dtype=np.int64)
+        page = np.asarray([r.page for r in refs], dtype=np.int64)
+        head = np.asarray([r.head for r in refs], dtype=np.int64)
+        layer = np.asarray([r.layer for r in refs], dtype=np.int64)
+        meta[f"{prefix}_tensor_values"] = list(index)
+        self.runs(prefix, np.zeros(len(refs), dtype=np.int64), tensor, page, head, layer)
+
+    def finish(self, meta: dict) -> bytes:
+        meta["arrays"] = self.arrays
+        head = json.dumps(meta, separators=(",", ":")).encode()
+        return b"".join([_META.pack(len(head)), head, *self.chunks])
+
+
+def _encode_ops(enc: _Encoder, cols: PlanColumns, meta: dict) -> None:
+    enc.ints("kind", cols.kind)
+    enc.ints("length", cols.length, delta=True)
+    enc.ints("src_offset", cols.src_offset, delta=True)
+    enc.ints("dst_offset", cols.dst_offset, delta=True)
+    enc.ints("src", cols.src)
+    enc.ints("dst", cols.dst)
+    enc.ints("note", cols.note)
+    owner = np.repeat(np.arange(len(cols), dtype=np.int64), np.diff(cols.kv_offsets))
+    enc.runs("kv", owner, cols.kv_tensor, cols.kv_page, cols.kv_head, cols.kv_layer)
+    meta.update(
+        ops=len(cols),
+        src_values=cols.src_values,
+        dst_values=cols.dst_values,
+        note_values=cols.note_values,
+        kv_tensor_values=cols.kv_tensor_values,
+    )
+
+
+def _encode_manifest(enc: _Encoder, prefix: str, manifest: WeightManifest, meta: dict) -> None:
+    files = manifest.files
+    enc.ints(f"{prefix}_offset", np.asarray([f.offset for f in files], dtype=np.int64))
+    enc.ints(f"{prefix}_length", np.asarray([f.length for f in files], dtype=np.int64))
+    meta[prefix] = {
+        "model_id": manifest.model_id,
+        "version": manifest.version,
+        "path": [f.path for f in files],
+        "sha256": [f.sha256 for f in files],
+    }
+
+
+def encode_plan(plan: Union[CachePlan, SwapPlan]) -> tuple[PlanRecordKind, bytes]:
+    """Columnar, uncompressed payload for `plan`; `decode_plan` inverts it."""
+
+    enc = _Encoder()
+    meta: dict = {"plan_id": plan.plan_id}
+    _encode_ops(enc, PlanColumns.from_ops(plan.ops), meta)
+    if isinstance(plan, CachePlan):
+        enc.refs("prefetch", plan.prefetch, meta)
+        enc.refs("evict", plan.evict, meta)
+        return PlanRecordKind.CACHE_PLAN, enc.finish(meta)
+    if isinstance(plan, SwapPlan):
+        _encode_manifest(enc, "manifest_from", plan.manifest_from, meta)
+        _encode_manifest(enc, "manifest_to", plan.manifest_to, meta)
+        meta["window"] = [plan.window.t_start_ns, plan.window.t_deadline_ns]
+        return PlanRecordKind.SWAP_PLAN, enc.finish(meta)
+    raise TypeError(f"unsupported plan type {type(plan).__name__}")
+
+
+def _decode_arrays(payload: bytes) -> tuple[dict, dict[str, np.ndarray]]:
+    (meta_len,) = _META.unpack_from(payload, 0)
+    pos = _META.size + meta_len
+    meta = json.loads(payload[_META.size : pos])
+    arrays: dict[str, np.ndarray] = {}
+    for name, dtype, count, delta in meta["arrays"]:
+        values = np.frombuffer(payload, dtype=np.dtype(dtype), count=count, offset=pos)
+        pos += values.nbytes
+        values = values.astype(np.int64)
+        arrays[name] = np.cumsum(values) if delta else values
+    return meta, arrays
+
+
+def _expand_runs(prefix: str, arrays: dict[str, np.ndarray]) -> tuple[np.ndarray, ...]:
+    lengths = arrays[f"{prefix}_len"]
+    first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    owner, tensor, page, head, layer = (np.repeat(arrays[f"{prefix}_{name}"], lengths) for name in ("owner", "tensor", "page", "head", "layer"))
+    page += np.arange(int(lengths.sum()), dtype=np.int64) - first
+    return owner, tensor, page, head, layer
+
+
+def _decode_refs(prefix: str, meta: dict, arrays: dict[str, np.ndarray]) -> List[KvPageRef]:
+    _, tensor, page, head, layer = _expand_runs(prefix, arrays)
+    values = meta[f"{prefix}_tensor_values"]
+    return [
+        KvPageRef(tensor=values[t], page=p, head=h, layer=lyr)
+        for t, p, h, lyr in zip(tensor.tolist(), page.tolist(), head.tolist(), layer.tolist())
+    ]
+
+
+def _decode_manifest(prefix: str, meta: dict, arrays: dict[str, np.ndarray]) -> WeightManifest:
+    info = meta[prefix]
+    files = list(map(FileChunk, info["path"], arrays[f"{prefix}_offset"].tolist(), arrays[f"{prefix}_length"].tolist(), info["sha256"]))
+    return WeightManifest(model_id=info["model_id"], version=info["version"], files=files)
+
+
+def _decode(payload: bytes) -> tuple[dict, dict[str, np.ndarray], PlanColumns]:
+    meta, arrays = _decode_arrays(payload)
+    owner, tensor, page, head, layer = _expand_runs("kv", arrays)
+    kv_offsets = np.zeros(meta["ops"] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owner, minlength=meta["ops"]), out=kv_offsets[1:])
+    cols = PlanColumns(
+        kind=arrays["kind"].astype(np.uint8),
+        length=arrays["length"],
+        src_offset=arrays["src_offset"],
+        dst_offset=arrays["dst_offset"],
+        src=arrays["src"].astype(np.int32),
+        dst=arrays["dst"].astype(np.int32),
+        note=arrays["note"].astype(np.int32),
+        src_values=meta["src_values"],
+        dst_values=meta["dst_values"],
+        note_values=meta["note_values"],
+        kv_offsets=kv_offsets,
+        kv_tensor=tensor.astype(np.int32),
+        kv_page=page,
+        kv_head=head.astype(np.int32),
+        kv_layer=layer.astype(np.int32),
+        kv_tensor_values=meta["kv_tensor_values"],
+    )
+    return meta, arrays, cols
+
+
+def decode_columns(payload: bytes) -> PlanColumns:
+    """The ops of an `encode_plan` payload as PlanColumns, without building TransferOps."""
+
+    return _decode(payload)[2]
+
+
+def decode_plan(kind: PlanRecordKind, payload: bytes) -> Union[CachePlan, SwapPlan]:
+    meta, arrays, cols = _decode(payload)
+    ops = cols.to_ops()
+    if kind == PlanRecordKind.CACHE_PLAN:
+        prefetch = _decode_refs("prefetch", meta, arrays)
+        evict = _decode_refs("evict", meta, arrays)
+        return CachePlan(plan_id=meta["plan_id"], ops=ops, prefetch=prefetch, evict=evict)
+    start, deadline = meta["window"]
+    return SwapPlan(
+        plan_id=meta["plan_id"],
+        manifest_from=_decode_manifest("manifest_from", meta, arrays),
+        manifest_to=_decode_manifest("manifest_to", meta, arrays),
+        ops=ops,
+        window=SwapWindow(t_start_ns=start, t_deadline_ns=deadline),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Archive files
+
+
+@dataclass
+class ArchiveEntry:
+    plan_id: str
+    kind: PlanRecordKind
+    ts_ms: int
+    path: Path
+    offset: int
+    raw_bytes: int
+    stored_bytes: int
+    codec: str
+
+
+class PlanArchiveWriter:
+    """Appends compressed columnar plan records to rolling `<prefix>-NNNNNN.bpa` files in `directory`.
+
+    A new file is started once the current one reaches `max_file_bytes` (or on `roll()`); an
+    existing archive is continued in a fresh file. Each record is written with a single `write`, so
+    a reader never sees a torn record body, only (at worst) a truncated tail it skips.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        codec: str = "zlib",
+        level: Optional[int] = None,
+        max_file_bytes: int = 256 << 20,
+        prefix: str = "plans",
+    ) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"codec must be one of {sorted(CODECS)}")
+        if max_file_bytes <= 0:
+            raise ValueError("max_file_bytes must be positive")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.level = level
+        self.max_file_bytes = max_file_bytes
+        self.prefix = prefix
+        existing = sorted(self.directory.glob(f"{prefix}-*{ARCHIVE_SUFFIX}"))
+        self._file_no = int(existing[-1].stem.rsplit("-", 1)[1]) + 1 if existing else 0
+        self._fh = None
+        self.path: Optional[Path] = None
+        self.files = 0
+        self.records = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def append(self, plan: Union[CachePlan, SwapPlan], *, ts_ms: Optional[int] = None) -> ArchiveEntry:
+        """Archive `plan` stamped `ts_ms`, the key `between`/`iter_range` select on.
+
+        A SwapPlan defaults to its window start. A CachePlan carries no time of its own, so `ts_ms`
+        is required for it: stamping it with the wall clock would mix clocks in one archive.
+        """
+
+        if ts_ms is None:
+            if not isinstance(plan, SwapPlan):
+                raise ValueError(f"ts_ms is required to archive CachePlan {plan.plan_id!r}")
+            ts_ms = plan.window.t_start_ns // 1_000_000
+        kind, payload = encode_plan(plan)
+        ts_ms = int(ts_ms)
+        code = CODECS[self.codec]
+        body = _compress(code, payload, self.level)
+        plan_id = plan.plan_id.encode()
+        header = _RECORD.pack(ARCHIVE_MAGIC, code, int(kind), len(plan_id), ts_ms, len(payload), len(body), zlib.crc32(body))
+        if self._fh is None:
+            self._open_next()
+        offset = self._fh.tell()
+        self._fh.write(header + plan_id + body)
+        self._fh.flush()
+        self.records += 1
+        self.raw_bytes += len(payload)
+        self.stored_bytes += len(body)
+        entry = ArchiveEntry(plan.plan_id, kind, ts_ms, self.path, offset, len(payload), len(body), self.codec)
+        if self._fh.tell() >= self.max_file_bytes:
+            self.roll()
+        return entry
+
+    def roll(self) -> None:
+        """Close the current file; the next append starts a new one."""
+
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def close(self) -> None:
+        self.roll()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "records": float(self.records),
+            "files": float(self.files),
+            "raw_bytes": float(self.raw_bytes),
+            "stored_bytes": float(self.stored_bytes),
+            "ratio": self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0,
+        }
+
+    def _open_next(self) -> None:
+        self.path = self.directory / f"{self.prefix}-{self._file_no:06d}{ARCHIVE_SUFFIX}"
+        self._file_no += 1
+        self.files += 1
+        self._fh = open(self.path, "ab")
+
+    def __enter__(self) -> "PlanArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PlanArchiveReader:
+    """Random access to a PlanArchiveWriter directory (or a single archive file).
+
+    Opening scans record headers only; payloads are read and decompressed on demand. `refresh()`
+    picks up records appended since, including new files. A plan_id archived more than once
+    resolves to its latest record.
+    """
+
+    def __init__(self, path: Path | str, *, prefix: str = "plans") -> None:
+        self.path = Path(path)
+        self.prefix = prefix
+        self._scanned: dict[Path, int] = {}
+        self._entries: list[ArchiveEntry] = []
+        self._by_id: dict[str, ArchiveEntry] = {}
+        self._order = np.zeros(0, dtype=np.int64)
+        self._sorted_ts = np.zeros(0, dtype=np.int64)
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, plan_id: str) -> bool:
+        return plan_id in self._by_id
+
+    @property
+    def entries(self) -> List[ArchiveEntry]:
+        return list(self._entries)
+
+    def plan_ids(self) -> List[str]:
+        return [entry.plan_id for entry in self._entries]
+
+    def refresh(self) -> int:
+        """Index records appended since the last scan; returns how many were added."""
+
+        files = [self.path] if self.path.is_file() else sorted(self.path.glob(f"{self.prefix}-*{ARCHIVE_SUFFIX}"))
+        added = 0
+        for path in files:
+            added += self._scan(path)
+        if added:
+            ts = np.fromiter((e.ts_ms for e in self._entries), dtype=np.int64, count=len(self._entries))
+            self._order = np.argsort(ts, kind="stable")
+            self._sorted_ts = ts[self._order]
+        return added
+
+    def read_payload(self, entry: ArchiveEntry) -> bytes:
+        with open(entry.path, "rb") as fh:
+            fh.seek(entry.offset)
+            raw = fh.read(_RECORD.size + len(entry.plan_id.encode()) + entry.stored_bytes)
+        magic, codec, _, id_len, _, _, stored, crc = _RECORD.unpack_from(raw, 0)
+        body = raw[_RECORD.size + id_len :]
+        if magic != ARCHIVE_MAGIC or len(body) != stored or zlib.crc32(body) != crc:
+            raise ValueError(f"corrupt archive record {entry.plan_id!r} at {entry.path}:{entry.offset}")
+        return _decompress(codec, body)
+
+    def get(self, plan_id: str) -> Union[CachePlan, SwapPlan]:
+        entry = self._by_id[plan_id]
+        return decode_plan(entry.kind, self.read_payload(entry))
+
+    def columns(self, plan_id: str) -> PlanColumns:
+        """Ops of `plan_id` as PlanColumns, skipping TransferOp construction."""
+
+        return decode_columns(self.read_payload(self._by_id[plan_id]))
+
+    def between(self, start_ms: int, end_ms: int) -> List[ArchiveEntry]:
+        """Entries stamped in [start_ms, end_ms), in timestamp then archive order."""
+
+        lo, hi = np.searchsorted(self._sorted_ts, [start_ms, end_ms], side="left").tolist()
+        return [self._entries[i] for i in self._order[lo:hi].tolist()]
+
+    def iter_range(self, start_ms: int, end_ms: int) -> Iterator[tuple[ArchiveEntry, Union[CachePlan, SwapPlan]]]:
+        for entry in self.between(start_ms, end_ms):
+            yield entry, decode_plan(entry.kind, self.read_payload(entry))
+
+    def _scan(self, path: Path) -> int:
+        pos = self._scanned.get(path, 0)
+        size = os.path.getsize(path)
+        added = 0
+        with open(path, "rb") as fh:
+            while pos + _RECORD.size <= size:
+                fh.seek(pos)
+                header = fh.read(_RECORD.size)
+                magic, codec, kind, id_len, ts_ms, raw, stored, _ = _RECORD.unpack(header)
+                if magic != ARCHIVE_MAGIC:
+                    raise ValueError(f"{path} is not a plan archive (bad record magic at offset {pos})")
+                end = pos + _RECORD.size + id_len + stored
+                if end > size:
+                    break  # tail still being written
+                plan_id = fh.read(id_len).decode()
+                entry = ArchiveEntry(plan_id, PlanRecordKind(kind), ts_ms, path, pos, raw, stored, _CODEC_NAMES[codec])
+                self._entries.append(entry)
+                self._by_id[plan_id] = entry
+                added += 1
+                pos = end
+        self._scanned[path] = pos
+        return added
+
+
+__all__ = [
+    "ARCHIVE_MAGIC",
+    "ArchiveEntry",
+    "CODECS",
+    "PlanArchiveReader",
+    "PlanArchiveWriter",
+    "decode_columns",
+    "decode_plan",
+    "encode_plan",
+]
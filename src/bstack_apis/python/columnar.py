@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from .plan import KvPageRef, TransferKind, TransferOp
+
+TRANSFER_KINDS: tuple[TransferKind, ...] = tuple(TransferKind)
+_KIND_CODE = {kind: code for code, kind in enumerate(TRANSFER_KINDS)}
+
+
+def kind_code(kind: TransferKind | str) -> int:
+    """Stable small-integer code of a TransferKind, as used in PlanColumns.kind."""
+
+    if not isinstance(kind, TransferKind):
+        kind = TransferKind.from_string(kind)
+    return _KIND_CODE[kind]
+
+
+def _empty(dtype) -> np.ndarray:
+    return np.zeros(0, dtype=dtype)
+
+
+@dataclass
+class PlanColumns:
+    """Column-oriented view of a TransferOp list.
+
+    String columns are dictionary encoded (`src` indexes `src_values`, ...). kv_refs are stored
+    ragged: op `i` owns rows `kv_offsets[i]:kv_offsets[i + 1]` of the `kv_*` arrays.
+    """
+
+    kind: np.ndarray = field(default_factory=lambda: _empty(np.uint8))
+    length: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    src_offset: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    dst_offset: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    src: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    dst: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    note: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    src_values: List[str] = field(default_factory=list)
+    dst_values: List[str] = field(default_factory=list)
+    note_values: List[Optional[str]] = field(default_factory=list)
+    kv_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int64))
+    kv_tensor: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    kv_page: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    kv_head: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    kv_layer: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    kv_tensor_values: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return int(self.kind.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.length.sum())
+
+    @classmethod
+    def from_ops(cls, ops: Iterable[TransferOp]) -> "PlanColumns":
+        kinds: list[int] = []
+        lengths: list[int] = []
+        src_offsets: list[int] = []
+        dst_offsets: list[int] = []
+        srcs: list[int] = []
+        dsts: list[int] = []
+        notes: list[int] = []
+        kv_counts: list[int] = []
+        kv_tensor: list[int] = []
+        kv_page: list[int] = []
+        kv_head: list[int] = []
+        kv_layer: list[int] = []
+        src_index: dict[str, int] = {}
+        dst_index: dict[str, int] = {}
+        note_index: dict[Optional[str], int] = {}
+        tensor_index: dict[str, int] = {}
+        for op in ops:
+            kinds.append(_KIND_CODE[op.kind])
+            lengths.append(op.length)
+            src_offsets.append(op.src_offset)
+            dst_offsets.append(op.dst_offset)
+            srcs.append(src_index.setdefault(op.src, len(src_index)))
+            dsts.append(dst_index.setdefault(op.dst, len(dst_index)))
+            notes.append(note_index.setdefault(op.note, len(note_index)))
+            kv_counts.append(len(op.kv_refs))
+            for ref in op.kv_refs:
+                kv_tensor.append(tensor_index.setdefault(ref.tensor, len(tensor_index)))
+                kv_page.append(ref.page)
+                kv_head.append(ref.head)
+                kv_layer.append(ref.layer)
+        kv_offsets = np.zeros(len(kv_counts) + 1, dtype=np.int64)
+        np.cumsum(kv_counts, out=kv_offsets[1:])
+        return cls(
+            kind=np.asarray(kinds, dtype=np.uint8),
+            length=np.asarray(lengths, dtype=np.int64),
+            src_offset=np.asarray(src_offsets, dtype=np.int64),
+            dst_offset=np.asarray(dst_offsets, dtype=np.int64),
+            src=np.asarray(srcs, dtype=np.int32),
+            dst=np.asarray(dsts, dtype=np.int32),
+            note=np.asarray(notes, dtype=np.int32),
+            src_values=list(src_index),
+            dst_values=list(dst_index),
+            note_values=list(note_index),
+            kv_offsets=kv_offsets,
+            kv_tensor=np.asarray(kv_tensor, dtype=np.int32),
+            kv_page=np.asarray(kv_page, dtype=np.int64),
+            kv_head=np.asarray(kv_head, dtype=np.int32),
+            kv_layer=np.asarray(kv_layer, dtype=np.int32),
+            kv_tensor_values=list(tensor_index),
+        )
+
+    def to_ops(self) -> List[TransferOp]:
+        kinds = [TRANSFER_KINDS[code] for code in self.kind.tolist()]
+        srcs = [self.src_values[i] for i in self.src.tolist()]
+        dsts = [self.dst_values[i] for i in self.dst.tolist()]
+        notes = [self.note_values[i] for i in self.note.tolist()]
+        tensors = [self.kv_tensor_values[i] for i in self.kv_tensor.tolist()]
+        refs = [
+            KvPageRef(tensor=t, page=p, head=h, layer=layer)
+            for t, p, h, layer in zip(tensors, self.kv_page.tolist(), self.kv_head.tolist(), self.kv_layer.tolist())
+        ]
+        bounds = self.kv_offsets.tolist()
+        return [
+            TransferOp(
+                kind=kind,
+                src=src,
+                dst=dst,
+                length=length,
+                src_offset=src_offset,
+                dst_offset=dst_offset,
+                kv_refs=refs[bounds[i] : bounds[i + 1]],
+                note=note,
+            )
+            for i, (kind, src, dst, length, src_offset, dst_offset, note) in enumerate(
+                zip(kinds, srcs, dsts, self.length.tolist(), self.src_offset.tolist(), self.dst_offset.tolist(), notes)
+            )
+        ]
+
+
+def plan_columns(ops: Iterable[TransferOp] | PlanColumns) -> PlanColumns:
+    """Return `ops` as PlanColumns, converting TransferOp sequences and passing columns through."""
+
+    if isinstance(ops, PlanColumns):
+        return ops
+    return PlanColumns.from_ops(ops)
+
+
+__all__ = [
+    "TRANSFER_KINDS",
+    "PlanColumns",
+    "plan_columns",
+    "kind_code",
+]
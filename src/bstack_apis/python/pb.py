@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .plan import (
+    CachePlan,
+    FileChunk,
+    KvPageRef,
+    SwapPlan,
+    SwapWindow,
+    TransferKind,
+    TransferOp,
+    WeightManifest,
+)
+
+
+def load_pb2() -> Any:
+    """Import the generated `plan_pb2` module (see `make codegen`)."""
+
+    try:
+        from . import plan_pb2
+    except ImportError as exc:
+        raise RuntimeError("protobuf bindings missing; run `make codegen` (requires grpcio-tools)") from exc
+    return plan_pb2
+
+
+# -----------------------------------------------------------------------------
+# IR -> protobuf
+
+
+def _kv_ref_to_proto(pb2: Any, ref: KvPageRef) -> Any:
+    return pb2.KvPageRef(tensor=ref.tensor, page=ref.page, head=ref.head, layer=ref.layer)
+
+
+def _transfer_op_to_proto(pb2: Any, op: TransferOp) -> Any:
+    return pb2.TransferOp(
+        kind=pb2.TransferKind.Value(TransferKind(op.kind).name),
+        src=op.src,
+        dst=op.dst,
+        length=op.length,
+        src_offset=op.src_offset,
+        dst_offset=op.dst_offset,
+        kv_refs=[_kv_ref_to_proto(pb2, ref) for ref in op.kv_refs],
+        note=op.note or "",
+    )
+
+
+def _manifest_to_proto(pb2: Any, manifest: WeightManifest) -> Any:
+    return pb2.WeightManifest(
+        model_id=manifest.model_id,
+        version=manifest.version,
+        files=[pb2.FileChunk(path=f.path, offset=f.offset, length=f.length, sha256=f.sha256) for f in manifest.files],
+    )
+
+
+def cache_plan_to_proto(plan: CachePlan) -> Any:
+    pb2 = load_pb2()
+    return pb2.CachePlan(
+        plan_id=plan.plan_id,
+        ops=[_transfer_op_to_proto(pb2, op) for op in plan.ops],
+        prefetch=[_kv_ref_to_proto(pb2, ref) for ref in plan.prefetch],
+        evict=[_kv_ref_to_proto(pb2, ref) for ref in plan.evict],
+    )
+
+
+def swap_plan_to_proto(plan: SwapPlan) -> Any:
+    pb2 = load_pb2()
+    msg = pb2.SwapPlan(
+        plan_id=plan.plan_id,
+        ops=[_transfer_op_to_proto(pb2, op) for op in plan.ops],
+        window=pb2.SwapWindow(t_start_ns=plan.window.t_start_ns, t_deadline_ns=plan.window.t_deadline_ns),
+    )
+    # `from`/`to` are Python keywords, so the manifests cannot be passed as constructor kwargs.
+    getattr(msg, "from").CopyFrom(_manifest_to_proto(pb2, plan.manifest_from))
+    getattr(msg, "to").CopyFrom(_manifest_to_proto(pb2, plan.manifest_to))
+    return msg
+
+
+# -----------------------------------------------------------------------------
+# protobuf -> IR
+
+
+def _kv_ref_from_proto(msg: Any) -> KvPageRef:
+    return KvPageRef(tensor=msg.tensor, page=int(msg.page), head=int(msg.head), layer=int(msg.layer))
+
+
+def _transfer_op_from_proto(pb2: Any, msg: Any) -> TransferOp:
+    return TransferOp(
+        kind=TransferKind.from_string(pb2.TransferKind.Name(msg.kind) if msg.kind else None),
+        src=msg.src,
+        dst=msg.dst,
+        length=int(msg.length),
+        src_offset=int(msg.src_offset),
+        dst_offset=int(msg.dst_offset),
+        kv_refs=[_kv_ref_from_proto(ref) for ref in msg.kv_refs],
+        note=msg.note or None,
+    )
+
+
+def _manifest_from_proto(msg: Any) -> WeightManifest:
+    return WeightManifest(
+        model_id=msg.model_id,
+        version=msg.version,
+        files=[FileChunk(path=f.path, offset=int(f.offset), length=int(f.length), sha256=f.sha256) for f in msg.files],
+    )
+
+
+def cache_plan_from_proto(msg: Any) -> CachePlan:
+    pb2 = load_pb2()
+    return CachePlan(
+        plan_id=msg.plan_id,
+        ops=[_transfer_op_from_proto(pb2, op) for op in msg.ops],
+        prefetch=[_kv_ref_from_proto(ref) for ref in msg.prefetch],
+        evict=[_kv_ref_from_proto(ref) for ref in msg.evict],
+    )
+
+
+def swap_plan_from_proto(msg: Any) -> SwapPlan:
+    pb2 = load_pb2()
+    return SwapPlan(
+        plan_id=msg.plan_id,
+        manifest_from=_manifest_from_proto(getattr(msg, "from")),
+        manifest_to=_manifest_from_proto(getattr(msg, "to")),
+        ops=[_transfer_op_from_proto(pb2, op) for op in msg.ops],
+        window=SwapWindow(t_start_ns=int(msg.window.t_start_ns), t_deadline_ns=int(msg.window.t_deadline_ns)),
+    )
+
+
+__all__ = [
+    "load_pb2",
+    "cache_plan_to_proto",
+    "cache_plan_from_proto",
+    "swap_plan_to_proto",
+    "swap_plan_from_proto",
+]
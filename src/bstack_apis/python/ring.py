@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from multiprocessing import shared_memory
+from typing import Optional, Union
+
+from .plan import CachePlan, SwapPlan, _cache_plan_from_dict, _swap_plan_from_dict
+
+# Layout (native little-endian, mirrored by `bw::stack::PlanRing*` in plan.hpp):
+#   [0, 64)                       PlanRingHeader
+#   [64, 64 + 16 * max_readers)   PlanRingCursor per reader
+#   slots_offset + i * slot_size  PlanRingSlotHeader followed by the payload bytes
+# Sequence numbers start at 1; a slot whose `seq` does not match the expected value is not yet published.
+#
+# The Python side writes cursors, slot headers and `write_seq` with plain `struct.pack_into`: each
+# aligned 8-byte field is a single store on the platforms we target, but there is no release/acquire
+# ordering, unlike the `__atomic` stores of the C++ reader in plan.hpp. The writer publishes the slot
+# `seq` after the payload and `write_seq` last, which suffices for x86-64's store ordering; on weaker
+# memory models a Python writer paired with a C++ reader needs the C++ side to re-check `seq`.
+
+RING_MAGIC = 0x47525042  # "BPRG"
+RING_VERSION = 1
+
+_HEADER = struct.Struct("<IIIIII Q 32x")
+_CURSOR = struct.Struct("<QQ")
+_SLOT = struct.Struct("<QII")
+_WRITE_SEQ_OFFSET = 24
+_ALIGN = 64
+_BACKOFF_MAX_S = 0.002
+
+
+class PlanRecordKind(IntEnum):
+    UNSPECIFIED = 0
+    CACHE_PLAN = 1
+    SWAP_PLAN = 2
+
+
+@dataclass
+class PlanRecord:
+    seq: int
+    kind: PlanRecordKind
+    plan: Union[CachePlan, SwapPlan]
+
+
+class _Backoff:
+    """Yield for the first few polls, then sleep with exponentially growing (capped) intervals."""
+
+    def __init__(self) -> None:
+        self.polls = 0
+
+    def wait(self) -> None:
+        self.polls += 1
+        time.sleep(0 if self.polls <= 16 else min(_BACKOFF_MAX_S, 1e-5 * 2 ** (self.polls - 16)))
+
+
+def _align(value: int) -> int:
+    return (value + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Only the creating writer should own the segment; a tracked attach would unlink it when the reader exits.
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None  # type: ignore[assignment]
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register  # type: ignore[assignment]
+
+
+class _RingView:
+    def __init__(self, shm: shared_memory.SharedMemory) -> None:
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, slot_count, slot_size, max_readers, _, _ = _HEADER.unpack_from(self.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            raise ValueError(f"shared memory segment {shm.name!r} is not a v{RING_VERSION} plan ring")
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.max_readers = max_readers
+        self.slots_offset = _align(_HEADER.size + _CURSOR.size * max_readers)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def payload_capacity(self) -> int:
+        return self.slot_size - _SLOT.size
+
+    def write_seq(self) -> int:
+        return struct.unpack_from("<Q", self.buf, _WRITE_SEQ_OFFSET)[0]
+
+    def cursor(self, reader_id: int) -> tuple[int, int]:
+        return _CURSOR.unpack_from(self.buf, _HEADER.size + _CURSOR.size * reader_id)
+
+    def set_cursor(self, reader_id: int, active: int, read_seq: int) -> None:
+        _CURSOR.pack_into(self.buf, _HEADER.size + _CURSOR.size * reader_id, active, read_seq)
+
+    def set_read_seq(self, reader_id: int, read_seq: int) -> None:
+        # Leaves `active` alone so a concurrent detach by the writer is not undone.
+        struct.pack_into("<Q", self.buf, _HEADER.size + _CURSOR.size * reader_id + 8, read_seq)
+
+    def slot_offset(self, seq: int) -> int:
+        return self.slots_offset + ((seq - 1) % self.slot_count) * self.slot_size
+
+    def close(self) -> None:
+        self.buf = None  # type: ignore[assignment]
+        self.shm.close()
+
+
+class PlanRingWriter:
+    """Single producer for a shared-memory ring of serialized CachePlan/SwapPlan records.
+
+    Every registered reader sees every record. The writer blocks (up to `timeout`) rather than
+    overwrite a slot that the slowest active reader has not consumed yet. A reader process that dies
+    without `close()` leaves its cursor active; `detach_reader` drops it, and with `reader_timeout`
+    the writer does so itself for any reader that blocks it without advancing for that many seconds.
+    A detached reader that resumes gets an error on its next poll until it calls `reattach()`.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        *,
+        slot_count: int = 64,
+        slot_size: int = 1 << 20,
+        max_readers: int = 8,
+        reader_timeout: Optional[float] = None,
+    ) -> None:
+        if slot_count <= 0 or max_readers <= 0:
+            raise ValueError("slot_count and max_readers must be positive")
+        slot_size = _align(max(slot_size, _SLOT.size + 1))
+        slots_offset = _align(_HEADER.size + _CURSOR.size * max_readers)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=slots_offset + slot_count * slot_size)
+        shm.buf[:slots_offset] = bytes(slots_offset)
+        _HEADER.pack_into(shm.buf, 0, RING_MAGIC, RING_VERSION, slot_count, slot_size, max_readers, 0, 0)
+        self._view = _RingView(shm)
+        self.reader_timeout = reader_timeout
+        self.detached = 0
+        self._progress: dict[int, tuple[int, float]] = {}
+
+    @property
+    def name(self) -> str:
+        return self._view.name
+
+    @property
+    def seq(self) -> int:
+        return self._view.write_seq()
+
+    def detach_reader(self, reader_id: int) -> None:
+        """Mark `reader_id`'s cursor inactive so it no longer holds back the writer."""
+
+        _, read_seq = self._view.cursor(reader_id)
+        self._view.set_cursor(reader_id, 0, read_seq)
+        self._progress.pop(reader_id, None)
+        self.detached += 1
+
+    def publish(self, plan: Union[CachePlan, SwapPlan], *, timeout: Optional[float] = None) -> int:
+        """Serialize and publish `plan`, returning its sequence number."""
+
+        if isinstance(plan, CachePlan):
+            kind = PlanRecordKind.CACHE_PLAN
+        elif isinstance(plan, SwapPlan):
+            kind = PlanRecordKind.SWAP_PLAN
+        else:
+            raise TypeError(f"unsupported plan type {type(plan).__name__}")
+        return self.publish_bytes(json.dumps(plan.to_dict(), separators=(",", ":")).encode(), kind, timeout=timeout)
+
+    def publish_bytes(self, payload: bytes, kind: PlanRecordKind, *, timeout: Optional[float] = None) -> int:
+        view = self._view
+        if len(payload) > view.payload_capacity:
+            raise ValueError(f"record of {len(payload)} bytes exceeds slot payload capacity {view.payload_capacity}")
+        seq = view.write_seq() + 1
+        self._wait_for_space(seq, timeout)
+        offset = view.slot_offset(seq)
+        buf = view.buf
+        _SLOT.pack_into(buf, offset, 0, int(kind), len(payload))
+        start = offset + _SLOT.size
+        buf[start : start + len(payload)] = payload
+        struct.pack_into("<Q", buf, offset, seq)
+        struct.pack_into("<Q", buf, _WRITE_SEQ_OFFSET, seq)
+        return seq
+
+    def reader_seqs(self) -> dict[int, int]:
+        """Map of active reader_id -> last consumed sequence number."""
+
+        cursors = map(self._view.cursor, range(self._view.max_readers))
+        return {rid: read_seq for rid, (active, read_seq) in enumerate(cursors) if active}
+
+    def min_reader_seq(self) -> Optional[int]:
+        seqs = self.reader_seqs()
+        return min(seqs.values()) if seqs else None
+
+    def _wait_for_space(self, seq: int, timeout: Optional[float]) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        backoff = _Backoff()
+        while True:
+            seqs = self.reader_seqs()
+            blocking = {rid: read_seq for rid, read_seq in seqs.items() if seq - read_seq > self._view.slot_count}
+            if not blocking:
+                return
+            now = time.monotonic()
+            if self.reader_timeout is not None and self._expire_stalled(blocking, now):
+                continue
+            if deadline is not None and now >= deadline:
+                raise TimeoutError(f"plan ring full: slowest reader at seq {min(blocking.values())}, publishing {seq}")
+            backoff.wait()
+
+    def _expire_stalled(self, blocking: dict[int, int], now: float) -> bool:
+        expired = False
+        for rid, read_seq in blocking.items():
+            last_seq, since = self._progress.get(rid, (read_seq, now))
+            if last_seq != read_seq:
+                since = now
+            self._progress[rid] = (read_seq, since)
+            if now - since >= self.reader_timeout:
+                self.detach_reader(rid)
+                expired = True
+        return expired
+
+    def close(self, *, unlink: bool = True) -> None:
+        shm = self._view.shm
+        self._view.close()
+        if unlink:
+            shm.unlink()
+
+    def __enter__(self) -> "PlanRingWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PlanRingReader:
+    """One consumer of a PlanRingWriter ring, identified by a caller-assigned `reader_id` slot."""
+
+    def __init__(self, name: str, reader_id: int, *, from_start: bool = False) -> None:
+        self._view = _RingView(_attach(name))
+        if not 0 <= reader_id < self._view.max_readers:
+            self._view.close()
+            raise ValueError(f"reader_id must be in [0, {self._view.max_readers})")
+        active, _ = self._view.cursor(reader_id)
+        if active:
+            self._view.close()
+            raise RuntimeError(f"reader slot {reader_id} is already in use")
+        self.reader_id = reader_id
+        self._read_seq = 0 if from_start else self._view.write_seq()
+        self._view.set_cursor(reader_id, 1, self._read_seq)
+
+    @property
+    def seq(self) -> int:
+        return self._read_seq
+
+    @property
+    def lag(self) -> int:
+        return self._view.write_seq() - self._read_seq
+
+    def poll_bytes(self) -> Optional[tuple[int, PlanRecordKind, bytes]]:
+        view = self._view
+        active, _ = view.cursor(self.reader_id)
+        if not active:
+            raise RuntimeError(f"plan ring reader {self.reader_id} was detached by the writer; call reattach()")
+        seq = self._read_seq + 1
+        if seq > view.write_seq():
+            return None
+        offset = view.slot_offset(seq)
+        slot_seq, kind, length = _SLOT.unpack_from(view.buf, offset)
+        if slot_seq != seq:
+            raise RuntimeError(f"plan ring overrun: expected seq {seq}, slot holds {slot_seq}")
+        if length > view.slot_size - _SLOT.size:
+            raise RuntimeError(f"plan ring overrun: seq {seq} claims {length} bytes in a {view.slot_size}-byte slot")
+        start = offset + _SLOT.size
+        payload = bytes(view.buf[start : start + length])
+        # A writer that no longer waits for this reader may reuse the slot while we copy.
+        slot_seq, _, _ = _SLOT.unpack_from(view.buf, offset)
+        if slot_seq != seq:
+            raise RuntimeError(f"plan ring overrun: seq {seq} was overwritten by {slot_seq} during the read")
+        self._read_seq = seq
+        view.set_read_seq(self.reader_id, seq)
+        return seq, PlanRecordKind(kind), payload
+
+    def reattach(self) -> None:
+        """Re-register a detached reader at the current write position, skipping the records it missed."""
+
+        self._read_seq = self._view.write_seq()
+        self._view.set_cursor(self.reader_id, 1, self._read_seq)
+
+    def poll(self) -> Optional[PlanRecord]:
+        """Return the next record without blocking, or None if the reader is caught up."""
+
+        raw = self.poll_bytes()
+        if raw is None:
+            return None
+        seq, kind, payload = raw
+        data = json.loads(payload)
+        plan = _cache_plan_from_dict(data) if kind == PlanRecordKind.CACHE_PLAN else _swap_plan_from_dict(data)
+        return PlanRecord(seq=seq, kind=kind, plan=plan)
+
+    def read(self, *, timeout: Optional[float] = None) -> Optional[PlanRecord]:
+        """Block until the next record arrives; returns None when `timeout` elapses first."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        backoff = _Backoff()
+        while True:
+            record = self.poll()
+            if record is not None:
+                return record
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            backoff.wait()
+
+    def close(self) -> None:
+        self._view.set_cursor(self.reader_id, 0, self._read_seq)
+        self._view.close()
+
+    def __enter__(self) -> "PlanRingReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = [
+    "RING_MAGIC",
+    "RING_VERSION",
+    "PlanRecordKind",
+    "PlanRecord",
+    "PlanRingWriter",
+    "PlanRingReader",
+]
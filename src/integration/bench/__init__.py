@@ -0,0 +1 @@
+"""Reproducible micro-benchmarks for the integration seams."""
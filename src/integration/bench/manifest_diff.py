@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from bstack_apis import FileChunk, TransferKind, TransferOp, WeightManifest
+from integration.weight_swapper.frames import bucket_ops, diff_manifests, manifest_frame, to_weight_manifest
+
+
+def synthetic_manifests(shards: int, *, changed_fraction: float = 0.01, seed: int = 0) -> tuple[dict, dict, list[dict]]:
+    """Raw hotweights-style prev/next manifests with one shard per tensor, and buckets for the changed shards."""
+
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1 << 16, 1 << 24, shards)
+    hashes = [f"{h:064x}" for h in rng.integers(0, 2**63, shards)]
+    changed = rng.random(shards) < changed_fraction
+
+    def manifest(version: str, root: str, digest: list[str]) -> dict:
+        tensors = [
+            {"name": f"t{i}", "shards": [{"uri": f"file://{root}/shard_{i:07d}.bin", "bytes": int(sizes[i]), "hash": digest[i]}]}
+            for i in range(shards)
+        ]
+        return {"model_id": "bench", "version": version, "tensors": tensors}
+
+    next_hashes = [h[::-1] if c else h for h, c in zip(hashes, changed)]
+    items = [
+        {"uri": f"file:///ckpt/next/shard_{i:07d}.bin", "nbytes": int(sizes[i]), "offset": 0, "tensor": f"t{i}", "shard_rank": 0}
+        for i in np.flatnonzero(changed)
+    ]
+    buckets = [{"bucket_id": b, "items": items[b * 64 : (b + 1) * 64]} for b in range(-(-len(items) // 64))]
+    return manifest("prev", "/ckpt/prev", hashes), manifest("next", "/ckpt/next", next_hashes), buckets
+
+
+def loop_manifest(manifest: dict) -> WeightManifest:
+    files = []
+    for tensor in manifest.get("tensors", []):
+        for shard in tensor.get("shards", []):
+            uri = str(shard.get("uri", ""))
+            path = uri[len("file://") :] if uri.startswith("file://") else uri
+            files.append(FileChunk(path=path, offset=0, length=int(shard.get("bytes", 0)), sha256=str(shard.get("hash", ""))))
+    return WeightManifest(model_id=manifest.get("model_id", "model"), version=manifest.get("version", "0"), files=files)
+
+
+def loop_ops(buckets: list[dict]) -> list[TransferOp]:
+    ops = []
+    for bucket in buckets:
+        bucket_id = int(bucket.get("bucket_id", 0))
+        for item in bucket.get("items", []):
+            offset = int(item.get("offset", 0))
+            note = f"tensor={item.get('tensor', 'tensor')} shard={int(item.get('shard_rank', 0))} bucket={bucket_id} offset={offset}"
+            ops.append(
+                TransferOp(
+                    kind=TransferKind.STORAGE2H,
+                    src=str(item.get("uri", "")),
+                    dst=f"device://bucket/{bucket_id}",
+                    length=int(item.get("nbytes", 0)),
+                    src_offset=offset,
+                    dst_offset=offset,
+                    kv_refs=[],
+                    note=note,
+                )
+            )
+    return ops
+
+
+def loop_diff(prev: WeightManifest, next_: WeightManifest, prev_root: str, next_root: str) -> tuple[int, int]:
+    """(added + changed, removed) shard counts, keyed on the path relative to each root."""
+
+    old = {f.path[len(prev_root) :]: f.sha256 for f in prev.files}
+    seen = set()
+    differ = 0
+    for f in next_.files:
+        rel = f.path[len(next_root) :]
+        seen.add(rel)
+        differ += old.get(rel) != f.sha256
+    return differ, sum(1 for rel in old if rel not in seen)
+
+
+def _timed(fn, *args, **kwargs):
+    # Start every section from a collected heap, so garbage left by one section is not collected
+    # on the next one's clock.
+    gc.collect()
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def frame_diff(prev_raw: dict, next_raw: dict, prev_root: str, next_root: str):
+    """The whole frame path from raw manifests: both manifest_frame builds plus diff_manifests."""
+
+    return diff_manifests(manifest_frame(prev_raw, root=prev_root), manifest_frame(next_raw, root=next_root))
+
+
+def _section(loop_s: float, new_s: float) -> dict[str, float]:
+    # vs_loop > 1 means the library path is slower than the plain loop.
+    return {"loop_s": loop_s, "s": new_s, "vs_loop": new_s / loop_s}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time manifest conversion, prev/next diffing and swap op construction against plain loops")
+    parser.add_argument("--shards", type=int, default=1_000_000, help="Shards per manifest")
+    parser.add_argument("--changed-fraction", type=float, default=0.05, help="Fraction of shards whose sha256 changes")
+    args = parser.parse_args(argv)
+
+    prev_raw, next_raw, buckets = synthetic_manifests(args.shards, changed_fraction=args.changed_fraction)
+    loop_prev, loop_convert_s = _timed(loop_manifest, prev_raw)
+    loop_next = loop_manifest(next_raw)
+    lib_prev, convert_s = _timed(to_weight_manifest, prev_raw)
+    assert lib_prev == loop_prev
+
+    # The loop diff starts from the WeightManifests that build_swap_plan needs for the plan anyway;
+    # the frame diff starts from the raw manifests, so its clock includes building both frames.
+    (loop_changed, loop_removed), loop_diff_s = _timed(loop_diff, loop_prev, loop_next, "/ckpt/prev/", "/ckpt/next/")
+    diff, diff_s = _timed(frame_diff, prev_raw, next_raw, "/ckpt/prev", "/ckpt/next")
+    assert int((diff["status"] != "removed").sum()) == loop_changed
+    assert int((diff["status"] == "removed").sum()) == loop_removed
+
+    ops_loop, loop_ops_s = _timed(loop_ops, buckets)
+    ops, ops_s = _timed(bucket_ops, buckets)
+    assert ops == ops_loop
+
+    report = {
+        "shards": args.shards,
+        "changed": loop_changed,
+        "convert": _section(loop_convert_s, convert_s),
+        "diff": _section(loop_diff_s, diff_s),
+        "ops": {"count": len(ops), **_section(loop_ops_s, ops_s)},
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
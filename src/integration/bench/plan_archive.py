@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from bstack_apis import CachePlan, KvPageRef, PlanArchiveReader, PlanArchiveWriter, TransferKind, TransferOp, cache_plan
+from integration.workloads import WorkloadSpec, generate_requests, iter_windows
+
+PAGE_BYTES = 256 * 1024
+
+
+def window_plans(windows: int, requests_per_window: int, *, seed: int = 0) -> list[tuple[int, CachePlan]]:
+    """(window start ms, CachePlan) pairs shaped like the BCache adapter's output: one op per request."""
+
+    spec = WorkloadSpec(
+        requests=windows * requests_per_window,
+        duration_ms=windows * 100.0,
+        context_tokens_median=512,
+        page_tokens=64,
+        layers=8,
+        seed=seed,
+    )
+    plans = []
+    for start_ms, req in iter_windows(generate_requests(spec), 100.0):
+        ops = []
+        for tenant, layer, start, end in zip(req["tenant"].tolist(), req["layer"].tolist(), req["start_pid"].tolist(), req["end_pid"].tolist()):
+            tier_src, tier_dst = (2, 1) if tenant % 3 else (1, 0)
+            ops.append(
+                TransferOp(
+                    kind=TransferKind.D2H if tier_src > tier_dst else TransferKind.H2D,
+                    src=f"tier://node-0/tier{tier_src}",
+                    dst=f"tier://node-0/tier{tier_dst}",
+                    length=(end - start + 1) * PAGE_BYTES,
+                    src_offset=start * PAGE_BYTES,
+                    dst_offset=start * PAGE_BYTES,
+                    kv_refs=[KvPageRef(tensor="kv", page=p, head=0, layer=layer) for p in range(start, end + 1)],
+                    note=f"cluster={tenant} fanout=1 overlap=1",
+                )
+            )
+        prefetch = [KvPageRef(tensor="kv", page=int(p), head=0, layer=int(layer)) for p, layer in zip(req["start_pid"][:64], req["layer"][:64])]
+        plans.append((start_ms, cache_plan(f"window-{len(plans):06d}", ops, prefetch=prefetch)))
+    return plans
+
+
+def _archive(plans: list[tuple[int, CachePlan]], codec: str, lookups: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with PlanArchiveWriter(tmp, codec=codec, max_file_bytes=16 << 20) as writer:
+            for ts_ms, plan in plans:
+                writer.append(plan, ts_ms=ts_ms)
+        write_s = time.perf_counter() - start
+        stored = sum(p.stat().st_size for p in Path(tmp).glob("*.bpa"))
+
+        start = time.perf_counter()
+        reader = PlanArchiveReader(tmp)
+        open_s = time.perf_counter() - start
+        ids = random.Random(0).choices(reader.plan_ids(), k=lookups)
+        start = time.perf_counter()
+        for plan_id in ids:
+            reader.get(plan_id)
+        get_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for plan_id in ids:
+            reader.columns(plan_id)
+        columns_s = time.perf_counter() - start
+        start = time.perf_counter()
+        scanned = sum(len(plan.ops) for _, plan in reader.iter_range(plans[0][0], plans[len(plans) // 4][0]))
+        scan_s = time.perf_counter() - start
+        assert reader.get(plans[-1][1].plan_id) == plans[-1][1]
+        return {
+            "bytes": float(stored),
+            "files": float(writer.files),
+            "write_plans_per_s": len(plans) / write_s,
+            "open_s": open_s,
+            "get_plans_per_s": lookups / get_s,
+            "columns_plans_per_s": lookups / columns_s,
+            "range_ops_per_s": scanned / scan_s if scan_s else 0.0,
+        }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the compressed columnar plan archive against indented JSON")
+    parser.add_argument("--windows", type=int, default=50)
+    parser.add_argument("--requests-per-window", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=50, help="Random get(plan_id) calls")
+    parser.add_argument("--codecs", default="zlib,lzma")
+    args = parser.parse_args(argv)
+
+    plans = window_plans(args.windows, args.requests_per_window)
+    start = time.perf_counter()
+    json_bytes = sum(len(plan.to_json(indent=2).encode()) for _, plan in plans)
+    json_s = time.perf_counter() - start
+    report: dict[str, object] = {
+        "windows": len(plans),
+        "ops": sum(len(plan.ops) for _, plan in plans),
+        "kv_refs": sum(len(op.kv_refs) for _, plan in plans for op in plan.ops),
+        "json": {"bytes": float(json_bytes), "write_plans_per_s": len(plans) / json_s},
+    }
+    for codec in args.codecs.split(","):
+        stats = _archive(plans, codec, args.lookups)
+        stats["ratio_vs_json"] = json_bytes / stats["bytes"]
+        stats["write_json_mb_per_s"] = json_bytes / 1e6 * stats["write_plans_per_s"] / len(plans)
+        report[codec] = stats
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
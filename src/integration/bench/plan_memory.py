@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import resource
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+MODES = ("full", "compact", "lean")
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(mode: str, request_count: int) -> dict[str, float]:
+    """Build one window in `mode` and report what the held CachePlanResult costs."""
+
+    from integration.kv_data_plane import build_cache_plan, load_runtime_config, synthetic_window_inputs
+
+    cfg = load_runtime_config()
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    inputs = synthetic_window_inputs(cfg, request_count=request_count)
+    result = build_cache_plan(now_ms=1_000_000, cfg=cfg, inputs=inputs, lean=mode == "lean", compact_frames=mode == "compact")
+    del inputs
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frames = [result.plan_df, result.evict_df, result.admission_df, result.tiers_df, result.layer_lat_df]
+    return {
+        "ops": float(len(result.plan.ops)),
+        "retained_mb": (current - baseline) / 1e6,
+        "peak_mb": (peak - baseline) / 1e6,
+        "frames_mb": sum(df.memory_usage(deep=True).sum() for df in frames if df is not None) / 1e6,
+        "rss_delta_mb": (_rss_bytes() - rss_before) / 1e6,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memory held by a CachePlanResult in full, compact-frame and lean modes")
+    parser.add_argument("--requests", type=int, default=100_000, help="Synthetic requests in the window")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+
+    report = {}
+    # One fresh interpreter per mode so RSS is not inherited from an earlier run.
+    ctx = multiprocessing.get_context("spawn")
+    for mode in args.modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            report[mode] = pool.submit(measure, mode, args.requests).result()
+    if "full" in report:
+        for mode, row in report.items():
+            row["retained_vs_full"] = row["retained_mb"] / report["full"]["retained_mb"] if report["full"]["retained_mb"] else 1.0
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
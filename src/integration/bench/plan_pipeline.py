@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from typing import Optional
+
+from integration.kv_data_plane import PipelinedPlanner, PlanWindow, load_runtime_config, run_serial, synthetic_window_inputs
+from integration.kv_data_plane.pipeline import directory_sink
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sustained windows/s of the serial vs pipelined cache planning loop")
+    parser.add_argument("--windows", type=int, default=32, help="Windows to plan")
+    parser.add_argument("--requests", type=int, default=5000, help="Synthetic requests per window")
+    parser.add_argument("--workers", type=int, default=2, help="Convert/serialize workers")
+    parser.add_argument("--queue-depth", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    cfg = load_runtime_config()
+    windows = [PlanWindow(f"cache-{i}", 1_000_000 + i * cfg.window_ms, synthetic_window_inputs(cfg, request_count=args.requests)) for i in range(args.windows)]
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        report["serial"] = run_serial(windows, directory_sink(f"{tmp}/serial"), cfg=cfg).to_dict()
+        for name, use_processes in (("threads", False), ("processes", True)):
+            planner = PipelinedPlanner(
+                directory_sink(f"{tmp}/{name}"), cfg=cfg, workers=args.workers, queue_depth=args.queue_depth, use_processes=use_processes
+            )
+            report[name] = planner.run(windows).to_dict()
+    for row in report.values():
+        row["speedup"] = row["windows_per_s"] / report["serial"]["windows_per_s"]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from bstack_apis import TRANSFER_KINDS, PlanColumns
+from integration.plan_sim import SimConfig, simulate_transfers
+
+
+def synthetic_columns(ops: int, *, seed: int = 0) -> PlanColumns:
+    rng = np.random.default_rng(seed)
+    return PlanColumns(
+        kind=rng.integers(0, len(TRANSFER_KINDS), ops).astype(np.uint8),
+        length=rng.integers(4 * 1024, 4 * 1024 * 1024, ops, dtype=np.int64),
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized IR transfer simulator")
+    parser.add_argument("--ops", type=int, default=1_000_000, help="Synthetic ops to simulate")
+    parser.add_argument("--streams", type=int, default=4, help="Streams per transfer kind")
+    parser.add_argument("--deadline-ms", type=float, default=1000.0, help="Uniform per-op deadline")
+    args = parser.parse_args(argv)
+
+    cols = synthetic_columns(args.ops)
+    report = {}
+    for overlap in (True, False):
+        start = time.perf_counter()
+        result = simulate_transfers(cols, SimConfig(streams=args.streams, overlap=overlap), deadline_ns=int(args.deadline_ms * 1e6))
+        elapsed = time.perf_counter() - start
+        report["overlap" if overlap else "serial"] = {"sim_s": elapsed, "ops_per_s": args.ops / elapsed, **result.summary()}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Optional
+
+from integration.runtime_waves import run_wave_benchmark
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bstack-runtime wave submission throughput")
+    parser.add_argument("--waves", type=int, default=4096, help="Waves to submit after warmup")
+    parser.add_argument("--tile", type=int, default=64, help="bm = bn = bk tile edge")
+    parser.add_argument("--pool-size", type=int, default=16, help="Preallocated host buffer sets")
+    parser.add_argument("--max-inflight", type=int, default=8, help="Maximum waves outstanding on the runtime")
+    args = parser.parse_args(argv)
+
+    report = run_wave_benchmark(
+        waves=args.waves,
+        bm=args.tile,
+        bn=args.tile,
+        bk=args.tile,
+        pool_size=args.pool_size,
+        max_inflight=args.max_inflight,
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from integration.workloads import CheckpointSpec, WorkloadSpec, generate_checkpoint_pair, generate_requests
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the synthetic request and checkpoint generators")
+    parser.add_argument("--requests", type=int, default=1_000_000, help="Requests to generate")
+    parser.add_argument("--shards", type=int, default=100_000, help="Checkpoint shards per tree (0 skips checkpoints)")
+    parser.add_argument("--shard-kb", type=int, default=64, help="Sparse shard size in KiB")
+    parser.add_argument("--changed-fraction", type=float, default=0.01, help="Fraction of checkpoint bytes changed")
+    parser.add_argument("--root", type=Path, default=None, help="Where to write checkpoints (default: a temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    requests = generate_requests(WorkloadSpec(requests=args.requests, seed=args.seed))
+    elapsed = time.perf_counter() - start
+    report: dict[str, dict[str, float]] = {
+        "requests": {
+            "rows": float(len(requests)),
+            "gen_s": elapsed,
+            "rows_per_s": len(requests) / elapsed,
+            "frame_mb": requests.memory_usage(deep=True).sum() / 1e6,
+            "distinct_prefixes": float(requests["prefix_id"].nunique()),
+        }
+    }
+    if args.shards > 0:
+        spec = CheckpointSpec(shards=args.shards, shard_bytes=args.shard_kb * 1024, changed_fraction=args.changed_fraction, seed=args.seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            pair = generate_checkpoint_pair(args.root or tmp, spec)
+            elapsed = time.perf_counter() - start
+        report["checkpoints"] = {"gen_s": elapsed, "files_per_s": 2 * args.shards / elapsed, **pair.summary()}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
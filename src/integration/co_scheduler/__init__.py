@@ -0,0 +1,5 @@
+"""Bandwidth co-scheduling of BCache prefetch and hotweights swap traffic on shared links."""
+
+from .scheduler import DEFAULT_LINK_GBPS, DEFAULT_ROUTES, CoSchedule, CoScheduleConfig, co_schedule
+
+__all__ = ["CoSchedule", "CoScheduleConfig", "DEFAULT_LINK_GBPS", "DEFAULT_ROUTES", "co_schedule"]
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from bstack_apis import CachePlan, SwapPlan, TransferKind, TransferOp
+
+# Links each transfer kind crosses. Storage reads land in host memory over the same PCIe fabric
+# that carries tier-to-tier KV movement, which is where prefetch and swap traffic collide.
+DEFAULT_ROUTES: dict[TransferKind, tuple[str, ...]] = {
+    TransferKind.H2D: ("pcie",),
+    TransferKind.D2H: ("pcie",),
+    TransferKind.P2P: ("nvlink",),
+    TransferKind.STORAGE2H: ("storage", "pcie"),
+}
+
+# GB/s (bytes per nanosecond).
+DEFAULT_LINK_GBPS: dict[str, float] = {"storage": 7.0, "pcie": 25.0, "nvlink": 50.0}
+
+PLANS = ("cache", "swap")
+
+
+@dataclass
+class CoScheduleConfig:
+    link_gbps: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_LINK_GBPS))
+    routes: Mapping[TransferKind, tuple[str, ...]] = field(default_factory=lambda: dict(DEFAULT_ROUTES))
+    prefetch_share: float = 0.3
+    slice_us: float = 100.0
+    deadline_margin: float = 0.95
+    max_slices: int = 1_000_000
+
+
+@dataclass
+class CoSchedule:
+    """Merged time-sliced schedule of a CachePlan and a SwapPlan on shared links.
+
+    `ops` has one row per op of either plan with its start/finish slice; `slices` records the bytes
+    each plan moved on each link per slice (idle slices omitted); `report` compares the co-scheduled
+    outcome with each plan running alone and with an uncoordinated 50/50 split.
+    """
+
+    slice_ns: int
+    ops: pd.DataFrame
+    slices: pd.DataFrame
+    report: dict[str, dict[str, float]]
+
+
+class _Cursor:
+    """In-order progress of one plan's ops, each op consuming the same bytes on every link of its route."""
+
+    def __init__(self, ops: Sequence[TransferOp], routes: Sequence[tuple[int, ...]], n_links: int) -> None:
+        self.lengths = [int(op.length) for op in ops]
+        self.routes = list(routes)
+        self.ptr = 0
+        self.remaining = self.lengths[0] if self.lengths else 0
+        self.link_remaining = [0] * n_links
+        for length, route in zip(self.lengths, self.routes):
+            for link in route:
+                self.link_remaining[link] += length
+        self.start_slice = [-1] * len(self.lengths)
+        self.finish_slice = [-1] * len(self.lengths)
+
+    @property
+    def done(self) -> bool:
+        return self.ptr >= len(self.lengths)
+
+    def advance(self, budget: list[int], slice_idx: int) -> list[int]:
+        """Consume from `budget` (mutated in place) and return bytes moved per link."""
+
+        moved = [0] * len(budget)
+        while not self.done:
+            route = self.routes[self.ptr]
+            take = min([self.remaining] + [budget[link] for link in route])
+            if take <= 0 and self.remaining > 0:
+                break
+            if self.start_slice[self.ptr] < 0:
+                self.start_slice[self.ptr] = slice_idx
+            for link in route:
+                budget[link] -= take
+                moved[link] += take
+                self.link_remaining[link] -= take
+            self.remaining -= take
+            if self.remaining > 0:
+                break
+            self.finish_slice[self.ptr] = slice_idx
+            self.ptr += 1
+            self.remaining = self.lengths[self.ptr] if not self.done else 0
+        return moved
+
+
+# A policy maps (slice, capacity per link, cursors) to the first-pass budget per plan and link.
+_Policy = Callable[[int, list[int], dict[str, _Cursor]], dict[str, list[int]]]
+
+
+def co_schedule(cache: CachePlan, swap: SwapPlan, config: Optional[CoScheduleConfig] = None) -> CoSchedule:
+    """Interleave prefetch and swap traffic so the swap meets its window without starving prefetch.
+
+    Per slice and link, swap receives just the rate it needs to finish its remaining bytes by
+    `deadline_margin` of the SwapWindow (capped at `1 - prefetch_share` of the link), prefetch gets
+    the rest, and whatever either plan cannot use is handed to the other.
+    """
+
+    config = config or CoScheduleConfig()
+    if not 0.0 <= config.prefetch_share <= 1.0:
+        raise ValueError("prefetch_share must be within [0, 1]")
+    links = sorted(config.link_gbps)
+    slice_ns = max(int(round(config.slice_us * 1e3)), 1)
+    capacity = [int(float(config.link_gbps[name]) * slice_ns) for name in links]
+    if min(capacity, default=0) <= 0:
+        raise ValueError("every link needs a positive capacity per slice")
+    window_ns = int(swap.window.t_deadline_ns) - int(swap.window.t_start_ns)
+    deadline_slice = max(int(window_ns * config.deadline_margin) // slice_ns, 1)
+    plans = {"cache": cache.ops, "swap": swap.ops}
+    routes = {name: [_route(op, config, links) for op in ops] for name, ops in plans.items()}
+
+    def paced(slice_idx: int, cap: list[int], cursors: dict[str, _Cursor]) -> dict[str, list[int]]:
+        slices_left = max(deadline_slice - slice_idx, 1)
+        swap_budget = []
+        for link, link_cap in enumerate(cap):
+            need = -(-cursors["swap"].link_remaining[link] // slices_left)
+            swap_budget.append(min(need, int(link_cap * (1.0 - config.prefetch_share))))
+        return {"swap": swap_budget, "cache": [c - s for c, s in zip(cap, swap_budget)]}
+
+    def fair(slice_idx: int, cap: list[int], cursors: dict[str, _Cursor]) -> dict[str, list[int]]:
+        return {"cache": [c // 2 for c in cap], "swap": [c - c // 2 for c in cap]}
+
+    def alone(slice_idx: int, cap: list[int], cursors: dict[str, _Cursor]) -> dict[str, list[int]]:
+        return {name: list(cap) for name in cursors}
+
+    scheduled, slice_rows = _run(plans, routes, capacity, paced, config.max_slices, record=True)
+    uncoordinated, _ = _run(plans, routes, capacity, fair, config.max_slices)
+    isolated = {name: _run({name: plans[name]}, {name: routes[name]}, capacity, alone, config.max_slices)[0][name] for name in PLANS}
+
+    op_frames = []
+    for name in PLANS:
+        cursor = scheduled[name]
+        frame = pd.DataFrame(
+            {
+                "plan": name,
+                "op_index": range(len(cursor.lengths)),
+                "kind": [TransferKind(op.kind).name for op in plans[name]],
+                "length": cursor.lengths,
+                "start_slice": cursor.start_slice,
+                "finish_slice": cursor.finish_slice,
+            }
+        )
+        op_frames.append(frame)
+    ops_df = pd.concat(op_frames, ignore_index=True)
+    ops_df["start_ns"] = ops_df["start_slice"] * slice_ns
+    ops_df["finish_ns"] = (ops_df["finish_slice"] + 1) * slice_ns
+    ops_df = ops_df.sort_values(["start_slice", "plan", "op_index"], kind="stable").reset_index(drop=True)
+
+    slices_df = pd.DataFrame(slice_rows, columns=["slice", "link", "capacity_bytes", "cache_bytes", "swap_bytes"])
+    slices_df["link"] = [links[i] for i in slices_df["link"]]
+
+    report: dict[str, dict[str, float]] = {}
+    for name in PLANS:
+        report[name] = {
+            "ops": float(len(plans[name])),
+            "isolated_makespan_ms": _makespan_ms(isolated[name], slice_ns),
+            "uncoordinated_makespan_ms": _makespan_ms(uncoordinated[name], slice_ns),
+            "scheduled_makespan_ms": _makespan_ms(scheduled[name], slice_ns),
+            "isolated_avg_finish_ms": _avg_finish_ms(isolated[name], slice_ns),
+            "uncoordinated_avg_finish_ms": _avg_finish_ms(uncoordinated[name], slice_ns),
+            "scheduled_avg_finish_ms": _avg_finish_ms(scheduled[name], slice_ns),
+        }
+    for name in PLANS:
+        isolated_ms = report[name]["isolated_makespan_ms"]
+        report[name]["slowdown"] = report[name]["scheduled_makespan_ms"] / isolated_ms if isolated_ms else 1.0
+    report["swap"]["deadline_ms"] = window_ns / 1e6
+    report["swap"]["deadline_met"] = float(scheduled["swap"].done and report["swap"]["scheduled_makespan_ms"] <= window_ns / 1e6)
+    report["swap"]["uncoordinated_deadline_met"] = float(
+        uncoordinated["swap"].done and report["swap"]["uncoordinated_makespan_ms"] <= window_ns / 1e6
+    )
+    return CoSchedule(slice_ns=slice_ns, ops=ops_df, slices=slices_df, report=report)
+
+
+def _route(op: TransferOp, config: CoScheduleConfig, links: list[str]) -> tuple[int, ...]:
+    route = config.routes.get(TransferKind(op.kind), ())
+    missing = [link for link in route if link not in config.link_gbps]
+    if missing or not route:
+        raise ValueError(f"no capacity configured for {TransferKind(op.kind).name} route {route}")
+    return tuple(links.index(link) for link in route)
+
+
+def _run(
+    plans: Mapping[str, Sequence[TransferOp]],
+    routes: Mapping[str, Sequence[tuple[int, ...]]],
+    capacity: list[int],
+    policy: _Policy,
+    max_slices: int,
+    *,
+    record: bool = False,
+) -> tuple[dict[str, _Cursor], list[tuple[int, int, int, int, int]]]:
+    cursors = {name: _Cursor(plans[name], routes[name], len(capacity)) for name in plans}
+    rows: list[tuple[int, int, int, int, int]] = []
+    slice_idx = 0
+    while slice_idx < max_slices and not all(c.done for c in cursors.values()):
+        budgets = policy(slice_idx, capacity, cursors)
+        moved = {name: cursor.advance(budgets[name], slice_idx) for name, cursor in cursors.items()}
+        # Work conservation: leftover of either plan's share goes to whoever can still use it.
+        leftover = [cap - sum(m[link] for m in moved.values()) for link, cap in enumerate(capacity)]
+        for name, cursor in cursors.items():
+            extra = cursor.advance(leftover, slice_idx)
+            moved[name] = [a + b for a, b in zip(moved[name], extra)]
+        if record:
+            for link, cap in enumerate(capacity):
+                cache_bytes = moved.get("cache", [0] * len(capacity))[link]
+                swap_bytes = moved.get("swap", [0] * len(capacity))[link]
+                if cache_bytes or swap_bytes:
+                    rows.append((slice_idx, link, cap, cache_bytes, swap_bytes))
+        slice_idx += 1
+    return cursors, rows
+
+
+def _makespan_ms(cursor: _Cursor, slice_ns: int) -> float:
+    if not cursor.finish_slice:
+        return 0.0
+    if not cursor.done:
+        return float("inf")
+    return (max(cursor.finish_slice) + 1) * slice_ns / 1e6
+
+
+def _avg_finish_ms(cursor: _Cursor, slice_ns: int) -> float:
+    if not cursor.finish_slice:
+        return 0.0
+    if not cursor.done:
+        return float("inf")
+    return (sum(cursor.finish_slice) / len(cursor.finish_slice) + 1) * slice_ns / 1e6
+
+
+__all__ = ["CoSchedule", "CoScheduleConfig", "DEFAULT_LINK_GBPS", "DEFAULT_ROUTES", "co_schedule"]
@@ -11,13 +11,13 @@ add_third_party_to_path()
 
 from integration.data_pipeline import sample_feature_plan
 from integration.kv_data_plane import build_cache_plan, simulate_cache_plan
+from integration.runtime_waves import run_wave_benchmark
 from integration.weight_swapper import build_swap_plan, bucket_summary
 
 try:
-    from bwrt.runtime import BwRuntime, WaveSpec
+    from bwrt.runtime import BwRuntime
 except Exception:  # pragma: no cover - optional bstack-runtime build
     BwRuntime = None  # type: ignore
-    WaveSpec = None  # type: ignore
 
 
 def prepare_demo_checkpoints(demo_root: Path) -> tuple[Path, Path]:
@@ -44,6 +44,7 @@ def main(argv: Optional[list[str]] = None) -> int:
     parser.add_argument("--output", type=Path, default=resolve("out"), help="Output directory for generated plans")
     parser.add_argument("--request-count", type=int, default=200, help="Synthetic requests to generate for the cache plan")
     parser.add_argument("--bucket-mb", type=int, default=32, help="Bucket size passed to hotweights planner")
+    parser.add_argument("--waves", type=int, default=256, help="Waves submitted by the optional bstack-runtime benchmark")
     args = parser.parse_args(argv)
 
     out_dir: Path = args.output
@@ -71,21 +72,12 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     if BwRuntime is not None:
         try:
-            print("[bonus] Attempting bstack-runtime submission (optional) ...")
-            import array
-
-            rt = BwRuntime()
-            # Small 2x2 GEMM-style wave on CPU backend using host arrays
-            spec = WaveSpec(bm=2, bn=2, bk=2, swap_begin=0, swap_end=3)
-            A = array.array('f', [1, 2, 3, 4])
-            B = array.array('f', [5, 6, 7, 8])
-            C = array.array('f', [0, 0, 0, 0])
-            a_ptr, _ = A.buffer_info()
-            b_ptr, _ = B.buffer_info()
-            c_ptr, _ = C.buffer_info()
-            evt = rt.submit_wave(spec, a_ptr, b_ptr, c_ptr)
-            rt.wait(evt, timeout_ms=0)
-            print("  bstack-runtime submission succeeded; C=", list(C))
+            print("[bonus] Benchmarking bstack-runtime wave submission (optional) ...")
+            report = run_wave_benchmark(BwRuntime(), waves=args.waves, swap_plan=swap_result.plan)
+            print(
+                f"  waves/s={report['waves_per_s']:.1f} p50_us={report['p50_us']:.1f} "
+                f"p99_us={report['p99_us']:.1f} swap_waves=[{int(report['swap_begin'])}, {int(report['swap_end'])})"
+            )
         except Exception as exc:  # pragma: no cover - depends on local build
             print(f"  bstack-runtime unavailable: {exc}")
     else:
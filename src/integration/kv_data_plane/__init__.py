@@ -1,5 +1,77 @@
-"""BCache planner integration producing CachePlan objects."""
+"""BCache planner integration producing CachePlan objects.
 
-from .runner import build_cache_plan, simulate_cache_plan
+The heat store, residency tracker, plan memo and window controller need only NumPy/pandas. Names
+from `runner` and `pipeline` import bodocache, so they are loaded on first access.
+"""
 
-__all__ = ["build_cache_plan", "simulate_cache_plan"]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .adaptive import AdaptiveCachePlanner, AdaptiveWindowConfig, WindowController, WindowDecision
+from .heat import HeatStore
+from .memo import PlanMemo
+from .residency import PageSet, ResidencyReport, ResidencyTracker
+
+if TYPE_CHECKING:
+    from .pipeline import PipelinedPlanner, PipelineStats, PlanWindow, run_serial
+    from .runner import (
+        CachePlanResult,
+        WindowInputs,
+        build_cache_plan,
+        compact_frame,
+        load_runtime_config,
+        plan_window_frames,
+        simulate_cache_plan,
+        synthetic_window_inputs,
+    )
+
+_PLANNER_EXPORTS = {
+    "PipelinedPlanner": "pipeline",
+    "PipelineStats": "pipeline",
+    "PlanWindow": "pipeline",
+    "run_serial": "pipeline",
+    "CachePlanResult": "runner",
+    "WindowInputs": "runner",
+    "build_cache_plan": "runner",
+    "compact_frame": "runner",
+    "load_runtime_config": "runner",
+    "plan_window_frames": "runner",
+    "simulate_cache_plan": "runner",
+    "synthetic_window_inputs": "runner",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _PLANNER_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "AdaptiveCachePlanner",
+    "AdaptiveWindowConfig",
+    "CachePlanResult",
+    "HeatStore",
+    "PageSet",
+    "PipelineStats",
+    "PipelinedPlanner",
+    "PlanWindow",
+    "PlanMemo",
+    "ResidencyReport",
+    "ResidencyTracker",
+    "WindowController",
+    "WindowDecision",
+    "WindowInputs",
+    "build_cache_plan",
+    "compact_frame",
+    "load_runtime_config",
+    "plan_window_frames",
+    "run_serial",
+    "simulate_cache_plan",
+    "synthetic_window_inputs",
+]
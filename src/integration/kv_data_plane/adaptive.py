@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import copy
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+import pandas as pd
+
+from .memo import PlanMemo
+
+if TYPE_CHECKING:
+    from bodocache.config import RuntimeConfig
+
+    from .runner import CachePlanResult, WindowInputs
+
+# WindowController is pure feedback logic; only AdaptiveCachePlanner needs the BCache planner, so
+# `.runner` (and with it bodocache) is imported where the planner is used.
+
+
+@dataclass
+class AdaptiveWindowConfig:
+    latency_slo_ms: float = 10.0
+    timeliness_target: float = 0.95
+    timeliness_margin: float = 0.02
+    min_window_ms: float = 5.0
+    max_window_ms: float = 200.0
+    min_batch: int = 32
+    max_batch: int = 100_000
+    max_window_utilization: float = 0.8
+    gain: float = 0.5
+    window_step: float = 1.25
+    smoothing: float = 0.3
+
+
+@dataclass
+class WindowDecision:
+    window: int
+    window_ms: float
+    batch: int
+    plan_ms: float
+    timeliness: float
+    next_window_ms: float
+    next_batch: int
+    reason: str
+
+
+class WindowController:
+    """Feedback controller for the planner's window length and per-window request batch.
+
+    Batch size tracks the planning-latency SLO: the smoothed per-request planning cost gives the
+    batch that would take exactly `latency_slo_ms`, and each window closes `gain` of the gap.
+    Window length follows prefetch timeliness: it shrinks by `window_step` while timeliness is
+    below target, grows once timeliness clears target + margin, and never drops below the time
+    the next batch is expected to take to plan at `max_window_utilization`.
+    """
+
+    def __init__(self, config: Optional[AdaptiveWindowConfig] = None, *, window_ms: float = 20.0, batch: int = 200) -> None:
+        self.config = config or AdaptiveWindowConfig()
+        self.window_ms = float(window_ms)
+        self.batch = int(batch)
+        self.decisions: list[WindowDecision] = []
+        self._cost_ms: Optional[float] = None
+        self._timeliness: Optional[float] = None
+
+    def observe(self, plan_ms: float, timeliness: float) -> WindowDecision:
+        cfg = self.config
+        cost = plan_ms / max(self.batch, 1)
+        self._cost_ms = cost if self._cost_ms is None else (1 - cfg.smoothing) * self._cost_ms + cfg.smoothing * cost
+        self._timeliness = timeliness if self._timeliness is None else (1 - cfg.smoothing) * self._timeliness + cfg.smoothing * timeliness
+
+        reasons = []
+        desired = cfg.latency_slo_ms / self._cost_ms if self._cost_ms > 0 else cfg.max_batch
+        ceiling = cfg.max_window_utilization * cfg.max_window_ms / self._cost_ms if self._cost_ms > 0 else cfg.max_batch
+        next_batch = self.batch + cfg.gain * (min(desired, ceiling) - self.batch)
+        next_batch = int(round(min(max(next_batch, cfg.min_batch), cfg.max_batch)))
+        if next_batch < self.batch:
+            reasons.append("latency_over_slo" if plan_ms > cfg.latency_slo_ms else "batch_down")
+        elif next_batch > self.batch:
+            reasons.append("batch_up")
+
+        next_window = self.window_ms
+        if timeliness < cfg.timeliness_target:
+            next_window /= cfg.window_step
+            reasons.append("stale_prefetch")
+        elif timeliness >= cfg.timeliness_target + cfg.timeliness_margin:
+            next_window *= cfg.window_step
+            reasons.append("window_up")
+        floor = max(cfg.min_window_ms, self._cost_ms * next_batch / cfg.max_window_utilization)
+        if next_window < floor:
+            reasons.append("plan_overrun_guard")
+        next_window = min(max(next_window, floor), cfg.max_window_ms)
+
+        decision = WindowDecision(
+            window=len(self.decisions),
+            window_ms=self.window_ms,
+            batch=self.batch,
+            plan_ms=plan_ms,
+            timeliness=timeliness,
+            next_window_ms=next_window,
+            next_batch=next_batch,
+            reason=",".join(reasons) or "hold",
+        )
+        self.decisions.append(decision)
+        self.window_ms, self.batch = next_window, next_batch
+        return decision
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "window_ms": self.window_ms,
+            "batch": float(self.batch),
+            "plan_cost_ms_per_request": float(self._cost_ms or 0.0),
+            "timeliness_ewma": float(self._timeliness if self._timeliness is not None else 0.0),
+            "windows": float(len(self.decisions)),
+            "adjustments": float(sum(d.reason != "hold" for d in self.decisions)),
+        }
+
+    def decisions_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(d) for d in self.decisions])
+
+
+InputSource = Callable[["RuntimeConfig", int], "WindowInputs"]
+
+
+def _synthetic_source(cfg: RuntimeConfig, batch: int) -> WindowInputs:
+    from .runner import synthetic_window_inputs
+
+    return synthetic_window_inputs(cfg, request_count=batch)
+
+
+class AdaptiveCachePlanner:
+    """Runs build_cache_plan window after window, letting a WindowController pick window_ms and batch."""
+
+    def __init__(
+        self,
+        controller: Optional[WindowController] = None,
+        *,
+        cfg: Optional[RuntimeConfig] = None,
+        source: InputSource = _synthetic_source,
+        memo: Optional[PlanMemo[CachePlanResult]] = None,
+        streams_per_tier: int = 4,
+    ) -> None:
+        from .runner import load_runtime_config
+
+        self.cfg = cfg if cfg is not None else load_runtime_config()
+        self.controller = controller or WindowController(window_ms=float(self.cfg.window_ms))
+        self.source = source
+        self.memo = memo
+        self.streams_per_tier = streams_per_tier
+
+    def step(self, *, now_ms: Optional[int] = None) -> tuple[CachePlanResult, WindowDecision]:
+        from .runner import build_cache_plan, simulate_cache_plan
+
+        cfg = copy.copy(self.cfg)
+        cfg.window_ms = int(round(self.controller.window_ms))
+        inputs = self.source(cfg, self.controller.batch)
+        start = time.perf_counter()
+        result = build_cache_plan(now_ms=now_ms, cfg=cfg, inputs=inputs, memo=self.memo)
+        plan_ms = (time.perf_counter() - start) * 1e3
+        metrics = simulate_cache_plan(result, streams_per_tier=self.streams_per_tier)
+        return result, self.controller.observe(plan_ms, metrics["prefetch_timeliness"])
+
+
+__all__ = ["AdaptiveCachePlanner", "AdaptiveWindowConfig", "WindowController", "WindowDecision"]
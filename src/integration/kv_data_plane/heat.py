@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+HEAT_KEYS = ("tenant", "pcluster", "layer", "page_id")
+HEAT_VALUE = "decay_hits"
+
+_U64 = np.uint64
+_GOLDEN = _U64(0x9E3779B97F4A7C15)
+
+
+def _hash_keys(keys: np.ndarray) -> np.ndarray:
+    """splitmix64-style hash of each row of an (n, 4) int64 key matrix."""
+
+    h = np.full(keys.shape[0], _GOLDEN, dtype=_U64)
+    for col in keys.T.astype(_U64):
+        h ^= col + _GOLDEN + (h << _U64(6)) + (h >> _U64(2))
+        h ^= h >> _U64(30)
+        h *= _U64(0xBF58476D1CE4E5B9)
+        h ^= h >> _U64(27)
+        h *= _U64(0x94D049BB133111EB)
+        h ^= h >> _U64(31)
+    return h
+
+
+def request_page_keys(req: pd.DataFrame) -> np.ndarray:
+    """Expand each request's [start_pid, end_pid] page range into (tenant, pcluster, layer, page_id) rows."""
+
+    start = req["start_pid"].to_numpy(np.int64)
+    end = req["end_pid"].to_numpy(np.int64) if "end_pid" in req else start
+    counts = np.maximum(end - start + 1, 1)
+    owner = np.repeat(np.arange(len(req)), counts)
+    offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    pcluster = req["pcluster"].to_numpy(np.int64) if "pcluster" in req else np.zeros(len(req), dtype=np.int64)
+    return np.column_stack(
+        [
+            req["tenant"].to_numpy(np.int64)[owner],
+            pcluster[owner],
+            req["layer"].to_numpy(np.int64)[owner],
+            start[owner] + offset,
+        ]
+    )
+
+
+class HeatStore:
+    """Exponentially decayed hit counts per (tenant, pcluster, layer, page_id), kept across windows.
+
+    Each row stores its heat as of the last update that touched it and is decayed lazily with
+    half-life `half_life_ms` when read, so an update costs O(batch) regardless of how many keys
+    are tracked. Rows live in flat NumPy arrays addressed by an open-addressing hash index; with a
+    `path` the arrays are memory-mapped `.npy` files in that directory and an existing store there
+    is reopened (warm restart). `compact_every` > 0 drops rows colder than `min_heat` every that
+    many updates.
+    """
+
+    def __init__(
+        self,
+        *,
+        half_life_ms: float = 5_000.0,
+        capacity: int = 1 << 16,
+        path: Optional[Union[str, Path]] = None,
+        compact_every: int = 0,
+        min_heat: float = 1e-3,
+    ) -> None:
+        if half_life_ms <= 0:
+            raise ValueError("half_life_ms must be positive")
+        self.half_life_ms = float(half_life_ms)
+        self.compact_every = compact_every
+        self.min_heat = min_heat
+        self.path = Path(path) if path is not None else None
+        self.size = 0
+        self.updates = 0
+        self.compactions = 0
+        self.dropped = 0
+        self.now_ms = 0
+        meta_path = self.path / "meta.json" if self.path is not None else None
+        if meta_path is not None and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            self.half_life_ms = float(meta["half_life_ms"])
+            self.size, self.updates, self.now_ms = int(meta["size"]), int(meta["updates"]), int(meta["now_ms"])
+            self._keys = np.load(self.path / "keys.npy", mmap_mode="r+")
+            self._heat = np.load(self.path / "heat.npy", mmap_mode="r+")
+            self._last = np.load(self.path / "last_ms.npy", mmap_mode="r+")
+        else:
+            if self.path is not None:
+                self.path.mkdir(parents=True, exist_ok=True)
+            capacity = max(int(capacity), 16)
+            self._keys = self._alloc("keys", (capacity, len(HEAT_KEYS)), np.int64)
+            self._heat = self._alloc("heat", (capacity,), np.float64)
+            self._last = self._alloc("last_ms", (capacity,), np.int64)
+        self._rebuild_index()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return int(self._heat.shape[0])
+
+    def update(self, keys: Union[np.ndarray, pd.DataFrame], hits: Optional[np.ndarray] = None, *, now_ms: int) -> None:
+        """Decay the touched rows to `now_ms` and add `hits` (one per key row by default)."""
+
+        keys = self._key_matrix(keys)
+        if keys.shape[0] == 0:
+            return
+        weights = np.ones(keys.shape[0]) if hits is None else np.asarray(hits, dtype=np.float64)
+        hashes, first, inverse = np.unique(_hash_keys(keys), return_index=True, return_inverse=True)
+        unique = keys[first]
+        if not (unique[inverse] == keys).all():
+            # 64-bit hash collision inside the batch: group on the keys themselves.
+            unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+            hashes = _hash_keys(unique)
+        added = np.bincount(inverse.ravel(), weights=weights, minlength=unique.shape[0])
+        rows = self._find(unique, hashes)
+        new = rows < 0
+        if new.any():
+            rows[new] = self._append(unique[new], hashes[new], now_ms)
+        self._heat[rows] = self._heat[rows] * self._decay(rows, now_ms) + added
+        self._last[rows] = now_ms
+        self.now_ms = max(self.now_ms, int(now_ms))
+        self.updates += 1
+        if self.compact_every > 0 and self.updates % self.compact_every == 0:
+            self.compact(now_ms=now_ms)
+
+    def observe_requests(self, req: pd.DataFrame, *, now_ms: int) -> None:
+        """Count one hit per page each request in `req` touches."""
+
+        self.update(request_page_keys(req), now_ms=now_ms)
+
+    def heat_at(self, keys: Union[np.ndarray, pd.DataFrame], *, now_ms: int) -> np.ndarray:
+        keys = self._key_matrix(keys)
+        rows = self._find(keys, _hash_keys(keys))
+        out = np.zeros(keys.shape[0])
+        known = rows >= 0
+        out[known] = self._heat[rows[known]] * self._decay(rows[known], now_ms)
+        return out
+
+    def heat_frame(self, *, now_ms: int, req: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Heat in the frame layout `run_window` consumes: key columns plus `decay_hits`.
+
+        With `req`, covers the distinct pages those requests touch (zero heat if unseen);
+        otherwise every tracked row.
+        """
+
+        if req is not None:
+            keys = np.unique(request_page_keys(req), axis=0)
+            values = self.heat_at(keys, now_ms=now_ms)
+        else:
+            rows = np.arange(self.size)
+            keys = np.asarray(self._keys[: self.size])
+            values = self._heat[: self.size] * self._decay(rows, now_ms)
+        frame = pd.DataFrame(keys, columns=list(HEAT_KEYS))
+        frame[HEAT_VALUE] = values
+        return frame
+
+    def top_k(self, k: int, *, now_ms: int) -> pd.DataFrame:
+        """The `k` hottest rows at `now_ms`, hottest first."""
+
+        values = self._heat[: self.size] * self._decay(np.arange(self.size), now_ms)
+        k = min(int(k), self.size)
+        if k <= 0:
+            return pd.DataFrame(columns=[*HEAT_KEYS, HEAT_VALUE])
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind="stable")]
+        frame = pd.DataFrame(np.asarray(self._keys[top]), columns=list(HEAT_KEYS))
+        frame[HEAT_VALUE] = values[top]
+        return frame
+
+    def compact(self, *, now_ms: int, min_heat: Optional[float] = None) -> int:
+        """Drop rows whose decayed heat is below `min_heat`; returns the number removed."""
+
+        threshold = self.min_heat if min_heat is None else min_heat
+        values = self._heat[: self.size] * self._decay(np.arange(self.size), now_ms)
+        keep = np.flatnonzero(values >= threshold)
+        removed = self.size - keep.shape[0]
+        if removed:
+            # Rebase survivors to now_ms so the stored values stay in a comparable range.
+            self._keys[: keep.shape[0]] = self._keys[keep]
+            self._heat[: keep.shape[0]] = values[keep]
+            self._last[: keep.shape[0]] = now_ms
+            self.size = keep.shape[0]
+            self._rebuild_index()
+        self.compactions += 1
+        self.dropped += removed
+        return removed
+
+    def flush(self) -> None:
+        """Persist the memory-mapped arrays and metadata; a no-op without `path`."""
+
+        if self.path is None:
+            return
+        for array in (self._keys, self._heat, self._last):
+            array.flush()
+        meta = {"half_life_ms": self.half_life_ms, "size": self.size, "updates": self.updates, "now_ms": self.now_ms}
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": float(self.size),
+            "capacity": float(self.capacity),
+            "load_factor": self.size / self._table.shape[0],
+            "updates": float(self.updates),
+            "compactions": float(self.compactions),
+            "dropped": float(self.dropped),
+        }
+
+    def _alloc(self, name: str, shape: tuple[int, ...], dtype: type) -> np.ndarray:
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        return np.lib.format.open_memmap(self.path / f"{name}.npy", mode="w+", dtype=dtype, shape=shape)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        resized = []
+        for name, array in (("keys", self._keys), ("heat", self._heat), ("last_ms", self._last)):
+            if self.path is None:
+                fresh = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+                fresh[: self.size] = array[: self.size]
+            else:
+                tmp = self.path / f"{name}.grow.npy"
+                fresh = np.lib.format.open_memmap(tmp, mode="w+", dtype=array.dtype, shape=(capacity, *array.shape[1:]))
+                fresh[: self.size] = array[: self.size]
+                fresh.flush()
+                del array
+                os.replace(tmp, self.path / f"{name}.npy")
+            resized.append(fresh)
+        self._keys, self._heat, self._last = resized
+
+    def _append(self, keys: np.ndarray, hashes: np.ndarray, now_ms: int) -> np.ndarray:
+        count = keys.shape[0]
+        if self.size + count > self.capacity:
+            self._grow(self.size + count)
+        rows = np.arange(self.size, self.size + count)
+        self._keys[rows] = keys
+        self._heat[rows] = 0.0
+        self._last[rows] = now_ms
+        self.size += count
+        if 2 * self.size > self._table.shape[0]:
+            self._rebuild_index()
+        else:
+            self._insert(rows, hashes)
+        return rows
+
+    def _decay(self, rows: np.ndarray, now_ms: int) -> np.ndarray:
+        age = np.maximum(now_ms - self._last[rows], 0)
+        return np.exp2(-age / self.half_life_ms)
+
+    def _key_matrix(self, keys: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        if isinstance(keys, pd.DataFrame):
+            keys = keys[list(HEAT_KEYS)].to_numpy(np.int64)
+        keys = np.asarray(keys, dtype=np.int64)
+        if keys.ndim != 2 or keys.shape[1] != len(HEAT_KEYS):
+            raise ValueError(f"keys must have {len(HEAT_KEYS)} columns {HEAT_KEYS}")
+        return keys
+
+    def _rebuild_index(self) -> None:
+        slots = 1 << max(int(2 * max(self.size, 8) - 1).bit_length(), 4)
+        self._table = np.full(slots, -1, dtype=np.int64)
+        if self.size:
+            self._insert(np.arange(self.size), _hash_keys(np.asarray(self._keys[: self.size])))
+
+    def _find(self, keys: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """Row of each key, or -1; linear probing advances every unresolved key in lockstep."""
+
+        mask = _U64(self._table.shape[0] - 1)
+        slot = (hashes & mask).astype(np.int64)
+        rows = np.full(keys.shape[0], -1, dtype=np.int64)
+        pending = np.arange(keys.shape[0])
+        while pending.size:
+            cand = self._table[slot[pending]]
+            occupied = cand >= 0
+            match = occupied.copy()
+            match[occupied] = (self._keys[cand[occupied]] == keys[pending[occupied]]).all(axis=1)
+            rows[pending[match]] = cand[match]
+            pending = pending[occupied & ~match]
+            slot[pending] = (slot[pending] + 1) & (self._table.shape[0] - 1)
+        return rows
+
+    def _insert(self, rows: np.ndarray, hashes: np.ndarray) -> None:
+        """Place absent keys; when several claim the same free slot one wins and the rest probe on."""
+
+        size = self._table.shape[0]
+        slot = (hashes & _U64(size - 1)).astype(np.int64)
+        pending = np.arange(rows.shape[0])
+        while pending.size:
+            free = pending[self._table[slot[pending]] < 0]
+            _, first = np.unique(slot[free], return_index=True)
+            winners = free[first]
+            self._table[slot[winners]] = rows[winners]
+            placed = np.zeros(rows.shape[0], dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            slot[pending] = (slot[pending] + 1) & (size - 1)
+
+
+__all__ = ["HEAT_KEYS", "HEAT_VALUE", "HeatStore", "request_page_keys"]
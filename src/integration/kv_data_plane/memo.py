@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Iterable, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+T = TypeVar("T")
+
+
+def frame_digest(df: pd.DataFrame, h: Any) -> None:
+    """Feed a row-order- and column-order-independent digest of `df` into `h`."""
+
+    columns = sorted(map(str, df.columns))
+    normalized = df.set_axis(list(map(str, df.columns)), axis=1)[columns]
+    h.update(repr([(col, str(dtype)) for col, dtype in normalized.dtypes.items()]).encode())
+    if df.empty:
+        return
+    rows = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+    h.update(np.sort(rows).tobytes())
+
+
+def plan_key(frames: Iterable[pd.DataFrame], config: Hashable) -> str:
+    """Content address of a planning window: its normalized input frames plus the planner config."""
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(config).encode())
+    for df in frames:
+        h.update(b"\x00frame")
+        frame_digest(df, h)
+    return h.hexdigest()
+
+
+class PlanMemo(Generic[T]):
+    """Thread-safe LRU of planning results keyed by `plan_key`, with hit/miss/eviction counters."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, T] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[T]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: T) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": float(len(self._entries)),
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "evictions": float(self.evictions),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+__all__ = ["PlanMemo", "frame_digest", "plan_key"]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+from bstack.paths import add_third_party_to_path
+
+add_third_party_to_path()
+
+from bodocache.config import RuntimeConfig
+
+from .runner import WindowInputs, _convert_to_cache_plan, load_runtime_config, plan_window_frames
+
+Sink = Callable[[str, str], None]
+
+
+@dataclass
+class PlanWindow:
+    window_id: str
+    now_ms: int
+    inputs: WindowInputs
+
+
+@dataclass
+class PipelineStats:
+    planned: int = 0
+    emitted: int = 0
+    skipped_stale: int = 0
+    dropped: int = 0
+    max_queue_depth: int = 0
+    plan_s: float = 0.0
+    wall_s: float = 0.0
+    emitted_ids: list[str] = field(default_factory=list)
+
+    @property
+    def windows_per_s(self) -> float:
+        return self.emitted / self.wall_s if self.wall_s else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "planned": float(self.planned),
+            "emitted": float(self.emitted),
+            "skipped_stale": float(self.skipped_stale),
+            "dropped": float(self.dropped),
+            "max_queue_depth": float(self.max_queue_depth),
+            "plan_s": self.plan_s,
+            "wall_s": self.wall_s,
+            "windows_per_s": self.windows_per_s,
+        }
+
+
+def render_plan(plan_id: str, plan_df: pd.DataFrame, evict_df: pd.DataFrame, admission_df: pd.DataFrame, indent: int = 2) -> str:
+    """Convert planner frames to a CachePlan and serialize it; the unit of work handed to emit workers."""
+
+    return _convert_to_cache_plan(plan_id, plan_df, evict_df, admission_df).to_json(indent=indent)
+
+
+def directory_sink(output_dir: Path | str) -> Sink:
+    """Sink writing each plan to `<output_dir>/<plan_id>.json`."""
+
+    root = Path(output_dir)
+    root.mkdir(parents=True, exist_ok=True)
+
+    def write(plan_id: str, payload: str) -> None:
+        (root / f"{plan_id}.json").write_text(payload)
+
+    return write
+
+
+def run_serial(windows: Iterable[PlanWindow], sink: Sink, *, cfg: Optional[RuntimeConfig] = None, indent: int = 2) -> PipelineStats:
+    """Reference loop: plan, convert, serialize and write each window in turn."""
+
+    cfg = cfg if cfg is not None else load_runtime_config()
+    stats = PipelineStats()
+    start = time.perf_counter()
+    for window in windows:
+        t0 = time.perf_counter()
+        frames = plan_window_frames(window.inputs, cfg, now_ms=window.now_ms)
+        stats.plan_s += time.perf_counter() - t0
+        stats.planned += 1
+        sink(window.window_id, render_plan(window.window_id, *frames, indent=indent))
+        stats.emitted += 1
+        stats.emitted_ids.append(window.window_id)
+    stats.wall_s = time.perf_counter() - start
+    return stats
+
+
+class PipelinedPlanner:
+    """Plans window N+1 while workers convert and serialize window N.
+
+    The calling thread runs the BCache planner; finished frames go to a pool of `workers` threads
+    (or processes with `use_processes=True`) that build and serialize the CachePlan, and an emitter
+    thread hands payloads to `sink` in window order, so the output matches `run_serial` exactly.
+    At most `queue_depth` windows are in flight after planning. When the queue is full the planner
+    blocks (backpressure) unless `drop_stale` is set, in which case the oldest queued window is
+    dropped instead. With `max_lag_ms`, a window whose `now_ms` trails `clock()` by more than that
+    is skipped before planning.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        *,
+        cfg: Optional[RuntimeConfig] = None,
+        workers: int = 2,
+        queue_depth: int = 4,
+        use_processes: bool = False,
+        drop_stale: bool = False,
+        max_lag_ms: Optional[float] = None,
+        clock: Callable[[], float] = lambda: time.time() * 1000,
+        indent: int = 2,
+    ) -> None:
+        if queue_depth <= 0:
+            raise ValueError("queue_depth must be positive")
+        self.sink = sink
+        self.cfg = cfg if cfg is not None else load_runtime_config()
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.use_processes = use_processes
+        self.drop_stale = drop_stale
+        self.max_lag_ms = max_lag_ms
+        self.clock = clock
+        self.indent = indent
+
+    def run(self, windows: Iterable[PlanWindow]) -> PipelineStats:
+        stats = PipelineStats()
+        pending: queue.Queue[Optional[tuple[str, Future]]] = queue.Queue(maxsize=self.queue_depth)
+        errors: list[BaseException] = []
+        pool: Executor = ProcessPoolExecutor(self.workers) if self.use_processes else ThreadPoolExecutor(self.workers)
+        emitter = threading.Thread(target=self._emit, args=(pending, stats, errors), name="plan-emitter", daemon=True)
+        start = time.perf_counter()
+        emitter.start()
+        try:
+            for window in windows:
+                if errors:
+                    break
+                if self.max_lag_ms is not None and self.clock() - window.now_ms > self.max_lag_ms:
+                    stats.skipped_stale += 1
+                    continue
+                t0 = time.perf_counter()
+                frames = plan_window_frames(window.inputs, self.cfg, now_ms=window.now_ms)
+                stats.plan_s += time.perf_counter() - t0
+                stats.planned += 1
+                item = (window.window_id, pool.submit(render_plan, window.window_id, *frames, self.indent))
+                if self.drop_stale:
+                    while True:
+                        try:
+                            pending.put_nowait(item)
+                            break
+                        except queue.Full:
+                            self._drop_oldest(pending, stats)
+                else:
+                    pending.put(item)
+                stats.max_queue_depth = max(stats.max_queue_depth, pending.qsize())
+        finally:
+            pending.put(None)
+            emitter.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+        stats.wall_s = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        return stats
+
+    @staticmethod
+    def _drop_oldest(pending: queue.Queue, stats: PipelineStats) -> None:
+        try:
+            _, future = pending.get_nowait()
+        except queue.Empty:
+            return
+        future.cancel()
+        stats.dropped += 1
+
+    def _emit(self, pending: queue.Queue, stats: PipelineStats, errors: list[BaseException]) -> None:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if errors:
+                continue
+            plan_id, future = item
+            try:
+                self.sink(plan_id, future.result())
+            except BaseException as exc:  # surfaced from run() on the planning thread
+                errors.append(exc)
+                continue
+            stats.emitted += 1
+            stats.emitted_ids.append(plan_id)
+
+
+__all__ = ["PipelineStats", "PipelinedPlanner", "PlanWindow", "directory_sink", "render_plan", "run_serial"]
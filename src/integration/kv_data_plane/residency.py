@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from bstack_apis import CachePlan
+
+_TIER_URI = re.compile(r"^tier://(?P<node>[^/]+)/tier(?P<tier>\d+)$")
+
+_CHUNK_BITS = 16
+_WORDS_PER_CHUNK = (1 << _CHUNK_BITS) // 64
+_ONE = np.uint64(1)
+
+
+class PageSet:
+    """Roaring-style page set: pages split by their high bits into 65536-page bitmap containers."""
+
+    def __init__(self) -> None:
+        self._chunks: dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(sum(np.unpackbits(words.view(np.uint8)).sum() for words in self._chunks.values()))
+
+    def add(self, pages: Iterable[int] | np.ndarray) -> None:
+        for high, low in self._split(pages):
+            words = self._chunks.get(high)
+            if words is None:
+                words = self._chunks[high] = np.zeros(_WORDS_PER_CHUNK, dtype=np.uint64)
+            np.bitwise_or.at(words, low >> 6, _ONE << (low & 63).astype(np.uint64))
+
+    def discard(self, pages: Iterable[int] | np.ndarray) -> None:
+        for high, low in self._split(pages):
+            words = self._chunks.get(high)
+            if words is None:
+                continue
+            np.bitwise_and.at(words, low >> 6, ~(_ONE << (low & 63).astype(np.uint64)))
+            if not words.any():
+                del self._chunks[high]
+
+    def contains(self, pages: Iterable[int] | np.ndarray) -> np.ndarray:
+        pages = np.asarray(pages, dtype=np.int64)
+        out = np.zeros(pages.shape[0], dtype=bool)
+        high = pages >> _CHUNK_BITS
+        for chunk in np.unique(high):
+            words = self._chunks.get(int(chunk))
+            if words is None:
+                continue
+            idx = np.flatnonzero(high == chunk)
+            low = pages[idx] & ((1 << _CHUNK_BITS) - 1)
+            out[idx] = ((words[low >> 6] >> (low & 63).astype(np.uint64)) & _ONE).astype(bool)
+        return out
+
+    def to_array(self) -> np.ndarray:
+        parts = []
+        for high in sorted(self._chunks):
+            bits = np.unpackbits(self._chunks[high].view(np.uint8), bitorder="little")
+            parts.append((high << _CHUNK_BITS) + np.flatnonzero(bits))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def _split(pages: Iterable[int] | np.ndarray) -> Iterable[tuple[int, np.ndarray]]:
+        pages = np.asarray(pages, dtype=np.int64)
+        if pages.size and pages.min() < 0:
+            raise ValueError("page ids must be non-negative")
+        high = pages >> _CHUNK_BITS
+        for chunk in np.unique(high):
+            yield int(chunk), pages[high == chunk] & ((1 << _CHUNK_BITS) - 1)
+
+
+@dataclass
+class ResidencyReport:
+    requests: int
+    filtered_requests: int
+    pages: int
+    resident_pages: int
+    avoided_bytes: int
+
+    def to_dict(self) -> dict[str, float]:
+        return {name: float(value) for name, value in self.__dict__.items()}
+
+
+class ResidencyTracker:
+    """Which KV pages each (node, tier, layer) holds, as implied by the CachePlans applied so far.
+
+    Ops are applied in plan order: an op's kv_refs leave the tier of its `tier://<node>/tier<N>`
+    source and land in the tier of its destination. The plan's `prefetch` (admission) refs carry no
+    tier, so they only become resident through the op that moves them; an admitted page no op moves
+    is not recorded. Evict refs carry no node or tier either, so they clear the page from every
+    tier: a stale "resident" bit would suppress a transfer the planner actually needs, a missing
+    one only costs a redundant transfer. `prefetch_tier` is the tier `filter_requests` checks by
+    default.
+    """
+
+    def __init__(self, *, node: str = "node-0", prefetch_tier: int = 0, page_bytes: int = 256 * 1024) -> None:
+        self.node = node
+        self.prefetch_tier = prefetch_tier
+        self.page_bytes = page_bytes
+        self.sets: dict[tuple[str, int, int], PageSet] = defaultdict(PageSet)
+        self.plans_applied = 0
+        self.avoided_bytes = 0
+        self.filtered_requests = 0
+
+    def resident_pages(self, node: str, tier: int, layer: int) -> np.ndarray:
+        key = (node, tier, layer)
+        return self.sets[key].to_array() if key in self.sets else np.zeros(0, dtype=np.int64)
+
+    def apply(self, plan: CachePlan) -> None:
+        evicted: dict[int, list[int]] = defaultdict(list)
+        for ref in plan.evict:
+            evicted[int(ref.layer)].append(int(ref.page))
+        for (node, tier, layer), pages in list(self.sets.items()):
+            if layer in evicted:
+                pages.discard(evicted[layer])
+
+        for op in plan.ops:
+            dst = _TIER_URI.match(op.dst)
+            src = _TIER_URI.match(op.src)
+            if (dst is None and src is None) or not op.kv_refs:
+                continue
+            by_layer: dict[int, list[int]] = defaultdict(list)
+            for ref in op.kv_refs:
+                by_layer[int(ref.layer)].append(int(ref.page))
+            for layer, pages in by_layer.items():
+                if src is not None:
+                    key = (src["node"], int(src["tier"]), layer)
+                    if key in self.sets:
+                        self.sets[key].discard(pages)
+                if dst is not None:
+                    self.sets[(dst["node"], int(dst["tier"]), layer)].add(pages)
+        self.plans_applied += 1
+
+    def filter_requests(self, req: pd.DataFrame, *, tier: Optional[int] = None) -> tuple[pd.DataFrame, ResidencyReport]:
+        """Drop requests whose whole [start_pid, end_pid] range is already resident in `tier`.
+
+        `tier` defaults to `prefetch_tier`; requests without a `node` column are taken to be on
+        `node`. Returns the remaining requests and what was avoided.
+        """
+
+        tier = self.prefetch_tier if tier is None else tier
+        n = len(req)
+        start = req["start_pid"].to_numpy(np.int64)
+        end = req["end_pid"].to_numpy(np.int64) if "end_pid" in req else start
+        counts = np.maximum(end - start + 1, 1)
+        owner = np.repeat(np.arange(n), counts)
+        pages = start[owner] + (np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts))
+        layers = req["layer"].to_numpy(np.int64)[owner]
+        nodes = req["node"].astype(str).to_numpy()[owner] if "node" in req else np.full(owner.shape[0], self.node)
+
+        resident = np.zeros(pages.shape[0], dtype=bool)
+        frame = pd.DataFrame({"node": nodes, "layer": layers})
+        for (node, layer), idx in frame.groupby(["node", "layer"], sort=False).indices.items():
+            key = (str(node), tier, int(layer))
+            if key in self.sets:
+                resident[idx] = self.sets[key].contains(pages[idx])
+
+        missing = np.bincount(owner, weights=(~resident).astype(np.float64), minlength=n)
+        covered = missing == 0
+        report = ResidencyReport(
+            requests=n,
+            filtered_requests=int(covered.sum()),
+            pages=int(pages.shape[0]),
+            resident_pages=int(resident.sum()),
+            avoided_bytes=int(counts[covered].sum()) * self.page_bytes,
+        )
+        self.filtered_requests += report.filtered_requests
+        self.avoided_bytes += report.avoided_bytes
+        return req.loc[~covered], report
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "plans_applied": float(self.plans_applied),
+            "tracked_sets": float(len(self.sets)),
+            "resident_pages": float(sum(len(pages) for pages in self.sets.values())),
+            "filtered_requests": float(self.filtered_requests),
+            "avoided_bytes": float(self.avoided_bytes),
+        }
+
+
+__all__ = ["PageSet", "ResidencyReport", "ResidencyTracker"]
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import os
+import sys
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Dict, Optional
 
 import pandas as pd
@@ -24,44 +25,132 @@ from bodocache.sim.utils import (
 )
 from bodocache.agent.sim_node import simulate_plan_streams, summarize_metrics
 
+from .heat import HeatStore
+from .memo import PlanMemo, plan_key
+from .residency import ResidencyReport, ResidencyTracker
+
 
 @dataclass
 class CachePlanResult:
+    """A CachePlan plus the planner frames behind it; the frames are None for lean results."""
+
     plan: CachePlan
-    plan_df: pd.DataFrame
-    evict_df: pd.DataFrame
-    admission_df: pd.DataFrame
-    tiers_df: pd.DataFrame
-    layer_lat_df: pd.DataFrame
+    plan_df: Optional[pd.DataFrame]
+    evict_df: Optional[pd.DataFrame]
+    admission_df: Optional[pd.DataFrame]
+    tiers_df: Optional[pd.DataFrame]
+    layer_lat_df: Optional[pd.DataFrame]
     cfg: RuntimeConfig
+    memo_hit: bool = False
+    residency: Optional[ResidencyReport] = None
 
+    @property
+    def lean(self) -> bool:
+        return self.plan_df is None
 
-def build_cache_plan(*, now_ms: Optional[int] = None, window_id: Optional[str] = None, request_count: int = 200) -> CachePlanResult:
-    """Generate a CachePlan using the synthetic BCache workload."""
+    def without_frames(self) -> "CachePlanResult":
+        return replace(self, plan_df=None, evict_df=None, admission_df=None, tiers_df=None, layer_lat_df=None)
 
-    os.environ.setdefault("BODOCACHE_PURE_PY", "1")
+    def compacted(self) -> "CachePlanResult":
+        if self.lean:
+            return self
+        return replace(
+            self,
+            plan_df=compact_frame(self.plan_df),
+            evict_df=compact_frame(self.evict_df),
+            admission_df=compact_frame(self.admission_df),
+            tiers_df=compact_frame(self.tiers_df),
+            layer_lat_df=compact_frame(self.layer_lat_df),
+        )
+
+
+@dataclass
+class WindowInputs:
+    req: pd.DataFrame
+    heat: pd.DataFrame
+    tiers: pd.DataFrame
+    tenant_caps: pd.DataFrame
+    layer_lat: pd.DataFrame
+
+    def frames(self) -> tuple[pd.DataFrame, ...]:
+        return (self.req, self.heat, self.tiers, self.tenant_caps, self.layer_lat)
+
+
+def compact_frame(df: pd.DataFrame, *, category_ratio: float = 0.5) -> pd.DataFrame:
+    """Copy of `df` with integers downcast to the narrowest signed dtype, floats to float32 where
+    lossless, and string/object columns with at most `category_ratio` distinct values per row as categoricals."""
+
+    columns = {}
+    for name, column in df.items():
+        if pd.api.types.is_bool_dtype(column):
+            pass
+        elif pd.api.types.is_integer_dtype(column):
+            column = pd.to_numeric(column, downcast="integer")
+        elif pd.api.types.is_float_dtype(column):
+            narrow = column.astype("float32")
+            if narrow.astype(column.dtype).equals(column):
+                column = narrow
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+            if len(column) and column.nunique(dropna=False) <= category_ratio * len(column):
+                column = column.astype("category")
+        columns[name] = column
+    return pd.DataFrame(columns, index=df.index)
 
-    cfg = load_config_typed(runtime_path=str(resolve("third_party", "BCache", "configs", "runtime.yaml")))
-    req = synthetic_requests(n_req=request_count)
+
+def load_runtime_config() -> RuntimeConfig:
+    return load_config_typed(runtime_path=str(resolve("third_party", "BCache", "configs", "runtime.yaml")))
+
+
+def assign_prefix_clusters(req: pd.DataFrame, cfg: RuntimeConfig) -> pd.DataFrame:
+    """Attach the `pcluster` column: MinHash prefix clusters with fan-out enabled, one cluster per request otherwise."""
 
     if cfg.ab_flags.enable_prefix_fanout:
-        req = assign_pclusters_minhash(req, num_hashes=32, bands=8, k=4)
+        return assign_pclusters_minhash(req, num_hashes=32, bands=8, k=4)
+    req = req.copy()
+    req["pcluster"] = req["req_id"].astype(int)
+    return req
+
+
+def synthetic_window_inputs(
+    cfg: RuntimeConfig,
+    *,
+    request_count: int = 200,
+    heat_store: Optional[HeatStore] = None,
+    now_ms: Optional[int] = None,
+) -> WindowInputs:
+    """Draw one window of the synthetic BCache workload.
+
+    With a `heat_store`, the window's page hits are folded into it at `now_ms` and the heat frame
+    comes from its decayed history instead of `synthetic_heat`.
+    """
+
+    req = assign_prefix_clusters(synthetic_requests(n_req=request_count), cfg)
+    if heat_store is not None:
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        heat_store.observe_requests(req, now_ms=now_ms)
+        heat = heat_store.heat_frame(now_ms=now_ms, req=req)
     else:
-        req = req.copy()
-        req["pcluster"] = req["req_id"].astype(int)
+        heat = synthetic_heat(req)
+    return WindowInputs(
+        req=req,
+        heat=heat,
+        tiers=synthetic_tier_caps(),
+        tenant_caps=synthetic_tenant_caps(req["tenant"], cfg.tenant_credits_bytes),
+        layer_lat=synthetic_layer_lat(),
+    )
 
-    heat = synthetic_heat(req)
-    tiers = synthetic_tier_caps()
-    lats = synthetic_layer_lat()
-    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
-    tenant_caps = synthetic_tenant_caps(req["tenant"], cfg.tenant_credits_bytes)
-
-    plan_df, evict_df, admission_df = run_window(
-        req,
-        heat,
-        tiers,
-        tenant_caps,
-        lats,
+
+def plan_window_frames(inputs: WindowInputs, cfg: RuntimeConfig, *, now_ms: int) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Run the BCache window planner, returning (plan_df, evict_df, admission_df)."""
+
+    return run_window(
+        inputs.req,
+        inputs.heat,
+        inputs.tiers,
+        inputs.tenant_caps,
+        inputs.layer_lat,
         now_ms=now_ms,
         pmin=cfg.thresholds.pmin,
         umin=cfg.thresholds.umin,
@@ -75,27 +164,111 @@ def build_cache_plan(*, now_ms: Optional[int] = None, window_id: Optional[str] =
         enforce_tier_caps=cfg.ab_flags.enforce_tier_caps,
     )
 
+
+def planner_fingerprint(cfg: RuntimeConfig) -> tuple:
+    """The RuntimeConfig fields that influence `plan_window_frames`, used in memo keys."""
+
+    return (
+        cfg.thresholds.pmin,
+        cfg.thresholds.umin,
+        cfg.min_io_bytes,
+        cfg.popularity.alpha,
+        cfg.popularity.beta,
+        cfg.window_ms,
+        cfg.max_ops_per_tier,
+        cfg.ab_flags.enable_admission,
+        cfg.ab_flags.enable_eviction,
+        cfg.ab_flags.enforce_tier_caps,
+    )
+
+
+def build_cache_plan(
+    *,
+    now_ms: Optional[int] = None,
+    window_id: Optional[str] = None,
+    request_count: int = 200,
+    cfg: Optional[RuntimeConfig] = None,
+    inputs: Optional[WindowInputs] = None,
+    memo: Optional[PlanMemo[CachePlanResult]] = None,
+    heat_store: Optional[HeatStore] = None,
+    residency: Optional[ResidencyTracker] = None,
+    lean: bool = False,
+    compact_frames: bool = False,
+) -> CachePlanResult:
+    """Generate a CachePlan using the synthetic BCache workload.
+
+    Pass `inputs` to plan a specific window instead of a fresh synthetic one. With a `memo`, a window
+    whose normalized inputs and planner config were seen before reuses the earlier plan under a new
+    plan_id without running the planner; the planning clock `now_ms` is not part of the key, while
+    `lean` and `compact_frames` are, so a hit always carries the frames its call asked for. Every
+    call returns its own copy of the ops and KvPageRefs (see `_copy_plan`), so mutating a returned
+    plan never alters the memoized one or another caller's. A
+    `heat_store` carries page popularity across synthetic windows (ignored when `inputs` is given).
+    With a `residency` tracker, requests already resident in the prefetch tier are dropped before
+    planning and the resulting plan is applied to the tracker.
+
+    `lean=True` keeps only the IR: the planner frames are released as soon as the CachePlan is
+    built and the result carries None in their place (it can no longer be simulated).
+    `compact_frames=True` retains the frames with narrowed dtypes (see `compact_frame`).
+    """
+
+    os.environ.setdefault("BODOCACHE_PURE_PY", "1")
+
+    cfg = cfg if cfg is not None else load_runtime_config()
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    if inputs is None:
+        inputs = synthetic_window_inputs(cfg, request_count=request_count, heat_store=heat_store, now_ms=now_ms)
     plan_id = window_id or f"cache-{now_ms}"
+    report = None
+    if residency is not None:
+        kept, report = residency.filter_requests(inputs.req)
+        inputs = replace(inputs, req=kept)
+
+    key = None
+    if memo is not None:
+        key = plan_key(inputs.frames(), (planner_fingerprint(cfg), lean, compact_frames))
+        cached = memo.get(key)
+        if cached is not None:
+            hit = replace(cached, plan=_copy_plan(plan_id, cached.plan), memo_hit=True, residency=report)
+            if residency is not None:
+                residency.apply(hit.plan)
+            return hit
+
+    plan_df, evict_df, admission_df = plan_window_frames(inputs, cfg, now_ms=now_ms)
+    tiers_df, layer_lat_df = inputs.tiers, inputs.layer_lat
     api_plan = _convert_to_cache_plan(plan_id, plan_df, evict_df, admission_df)
-    return CachePlanResult(
+    if lean:
+        plan_df = evict_df = admission_df = tiers_df = layer_lat_df = None
+    result = CachePlanResult(
         plan=api_plan,
         plan_df=plan_df,
         evict_df=evict_df,
         admission_df=admission_df,
-        tiers_df=tiers,
-        layer_lat_df=lats,
+        tiers_df=tiers_df,
+        layer_lat_df=layer_lat_df,
         cfg=cfg,
+        residency=report,
     )
+    if compact_frames:
+        result = result.compacted()
+    if memo is not None and key is not None:
+        memo.put(key, result)
+        result = replace(result, plan=_copy_plan(plan_id, api_plan))
+    if residency is not None:
+        residency.apply(api_plan)
+    return result
 
 
-def simulate_cache_plan(result: CachePlanResult) -> Dict[str, float]:
+def simulate_cache_plan(result: CachePlanResult, *, streams_per_tier: int = 4) -> Dict[str, float]:
     """Feed the plan to the built-in multistream simulator to obtain metrics."""
 
+    if result.lean:
+        raise ValueError("simulate_cache_plan needs the planner frames; this result was built with lean=True")
     exec_df = simulate_plan_streams(
         result.plan_df,
         result.tiers_df,
         window_ms=int(result.cfg.window_ms),
-        streams_per_tier=4,
+        streams_per_tier=streams_per_tier,
         use_overlap=result.cfg.ab_flags.enable_overlap,
         layer_lat_df=result.layer_lat_df,
     )
@@ -107,21 +280,45 @@ def simulate_cache_plan(result: CachePlanResult) -> Dict[str, float]:
     }
 
 
-def _convert_to_cache_plan(plan_id: str, plan_df: pd.DataFrame, evict_df: pd.DataFrame, admission_df: pd.DataFrame) -> CachePlan:
+def _copy_plan(plan_id: str, plan: CachePlan) -> CachePlan:
+    """Copy of `plan` under `plan_id` with fresh TransferOps and KvPageRefs.
+
+    Memo entries are shared across calls (and threads), so results are copied rather than frozen:
+    the IR dataclasses stay mutable for the executors.
+    """
+
+    def ref(r: KvPageRef) -> KvPageRef:
+        return KvPageRef(r.tensor, r.page, r.head, r.layer)
+
+    ops = [
+        TransferOp(op.kind, op.src, op.dst, op.length, op.src_offset, op.dst_offset, [ref(r) for r in op.kv_refs], op.note)
+        for op in plan.ops
+    ]
+    return cache_plan(plan_id, ops, prefetch=[ref(r) for r in plan.prefetch], evict=[ref(r) for r in plan.evict])
+
+
+def _convert_to_cache_plan(
+    plan_id: str,
+    plan_df: pd.DataFrame,
+    evict_df: pd.DataFrame,
+    admission_df: pd.DataFrame,
+) -> CachePlan:
+    def ref(page: int, layer: int) -> KvPageRef:
+        return KvPageRef(tensor="kv", page=page, head=0, layer=layer)
+
     ops = []
     for row in plan_df.itertuples(index=False):
         tier_src = int(getattr(row, "tier_src", 0))
         tier_dst = int(getattr(row, "tier_dst", 0))
         kind = _infer_kind(tier_src, tier_dst)
-        src = f"tier://{getattr(row, 'node', 'node-0')}/tier{tier_src}"
-        dst = f"tier://{getattr(row, 'node', 'node-0')}/tier{tier_dst}"
+        # Interned: a window has a handful of distinct endpoints shared by thousands of ops.
+        src = sys.intern(f"tier://{getattr(row, 'node', 'node-0')}/tier{tier_src}")
+        dst = sys.intern(f"tier://{getattr(row, 'node', 'node-0')}/tier{tier_dst}")
         start_pid = int(getattr(row, "start_pid", 0))
         end_pid = int(getattr(row, "end_pid", start_pid))
         page_bytes = int(getattr(row, "page_bytes", 256 * 1024))
-        kv_refs = [
-            KvPageRef(tensor="kv", page=pid, head=0, layer=int(getattr(row, "layer", 0)))
-            for pid in range(start_pid, end_pid + 1)
-        ]
+        layer = int(getattr(row, "layer", 0))
+        kv_refs = [ref(pid, layer) for pid in range(start_pid, end_pid + 1)]
         note = f"cluster={getattr(row, 'pcluster', 0)} fanout={getattr(row, 'fanout', 1)} overlap={getattr(row, 'overlap', 1)}"
         ops.append(
             TransferOp(
@@ -136,14 +333,8 @@ def _convert_to_cache_plan(plan_id: str, plan_df: pd.DataFrame, evict_df: pd.Dat
             )
         )
 
-    prefetch = [
-        KvPageRef(tensor="kv", page=int(getattr(row, "page_id", 0)), head=0, layer=int(getattr(row, "layer", 0)))
-        for row in admission_df.itertuples(index=False)
-    ]
-    evict = [
-        KvPageRef(tensor="kv", page=int(getattr(row, "page_id", 0)), head=0, layer=int(getattr(row, "layer", 0)))
-        for row in evict_df.itertuples(index=False)
-    ]
+    prefetch = [ref(int(getattr(row, "page_id", 0)), int(getattr(row, "layer", 0))) for row in admission_df.itertuples(index=False)]
+    evict = [ref(int(getattr(row, "page_id", 0)), int(getattr(row, "layer", 0))) for row in evict_df.itertuples(index=False)]
 
     return cache_plan(plan_id, ops, prefetch=prefetch, evict=evict)
 
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from bstack.paths import add_third_party_to_path
+
+add_third_party_to_path()
+
+from bodocache.config import RuntimeConfig
+from bodocache.sim.utils import (
+    synthetic_heat,
+    synthetic_layer_lat,
+    synthetic_requests,
+    synthetic_tenant_caps,
+    synthetic_tier_caps,
+)
+
+from .memo import plan_key
+from .runner import WindowInputs, assign_prefix_clusters, build_cache_plan, load_runtime_config, simulate_cache_plan
+
+# Sweep parameter name -> RuntimeConfig attribute path. Any other dotted name is applied verbatim;
+# `streams_per_tier` is a simulator setting rather than a planner one.
+PARAM_PATHS: dict[str, str] = {
+    "min_io_bytes": "min_io_bytes",
+    "window_ms": "window_ms",
+    "max_ops_per_tier": "max_ops_per_tier",
+    "alpha": "popularity.alpha",
+    "beta": "popularity.beta",
+    "pmin": "thresholds.pmin",
+    "umin": "thresholds.umin",
+    "enable_admission": "ab_flags.enable_admission",
+    "enable_eviction": "ab_flags.enable_eviction",
+    "enforce_tier_caps": "ab_flags.enforce_tier_caps",
+    "enable_overlap": "ab_flags.enable_overlap",
+    "enable_prefix_fanout": "ab_flags.enable_prefix_fanout",
+}
+SIM_PARAMS = ("streams_per_tier",)
+
+
+@dataclass
+class SweepWorkload:
+    """Fixed request stream shared by every trial; trials plan its first `request_count` rows."""
+
+    requests: pd.DataFrame
+    tiers: pd.DataFrame
+    layer_lat: pd.DataFrame
+    now_ms: int
+
+    @classmethod
+    def synthetic(cls, request_count: int, *, now_ms: int = 1_000_000) -> "SweepWorkload":
+        return cls(
+            requests=synthetic_requests(n_req=request_count),
+            tiers=synthetic_tier_caps(),
+            layer_lat=synthetic_layer_lat(),
+            now_ms=now_ms,
+        )
+
+    def fingerprint(self) -> str:
+        return plan_key([self.requests, self.tiers, self.layer_lat], self.now_ms)
+
+    def inputs(self, cfg: RuntimeConfig, request_count: int) -> WindowInputs:
+        req = assign_prefix_clusters(self.requests.head(request_count), cfg)
+        return WindowInputs(
+            req=req,
+            heat=synthetic_heat(req),
+            tiers=self.tiers,
+            tenant_caps=synthetic_tenant_caps(req["tenant"], cfg.tenant_credits_bytes),
+            layer_lat=self.layer_lat,
+        )
+
+
+@dataclass
+class SweepResult:
+    trials: pd.DataFrame
+    frontier: pd.DataFrame
+
+
+def apply_overrides(cfg: RuntimeConfig, params: Mapping[str, Any]) -> RuntimeConfig:
+    """Return a copy of `cfg` with planner parameters from `params` applied."""
+
+    out = copy.deepcopy(cfg)
+    for name, value in params.items():
+        if name in SIM_PARAMS:
+            continue
+        *parents, leaf = PARAM_PATHS.get(name, name).split(".")
+        target = out
+        for part in parents:
+            target = getattr(target, part)
+        if not hasattr(target, leaf):
+            raise AttributeError(f"RuntimeConfig has no parameter {name!r}")
+        setattr(target, leaf, value)
+    return out
+
+
+def grid(space: Mapping[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def config_digest(cfg: RuntimeConfig) -> str:
+    """Digest of every field of `cfg` (its repr), so trials over different base configs never share an id."""
+
+    return hashlib.blake2b(repr(cfg).encode(), digest_size=8).hexdigest()
+
+
+def trial_id(params: Mapping[str, Any], request_count: int, workload_key: str = "", config_key: str = "") -> str:
+    payload = json.dumps(
+        {"params": params, "request_count": request_count, "workload": workload_key, "config": config_key},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def pareto_frontier(
+    df: pd.DataFrame,
+    *,
+    minimize: Sequence[str] = ("avg_finish_ms", "ops"),
+    maximize: Sequence[str] = ("prefetch_timeliness",),
+) -> pd.DataFrame:
+    """Rows of `df` not dominated on the given objectives."""
+
+    if df.empty:
+        return df
+    costs = np.column_stack([df[c].to_numpy(float) for c in minimize] + [-df[c].to_numpy(float) for c in maximize])
+    no_worse = (costs[:, None, :] <= costs[None, :, :]).all(axis=2)
+    better = (costs[:, None, :] < costs[None, :, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    return df.loc[~dominated]
+
+
+def default_objective(row: Mapping[str, float]) -> tuple[float, float, float]:
+    """Sort key for successive halving: timeliness first, then finish time, then op count."""
+
+    return (-float(row["prefetch_timeliness"]), float(row["avg_finish_ms"]), float(row["ops"]))
+
+
+_WORKLOAD: Optional[SweepWorkload] = None
+_WORKLOAD_KEY = ""
+_BASE_CFG: Optional[RuntimeConfig] = None
+_CONFIG_KEY = ""
+
+
+def _init_worker(workload: SweepWorkload, workload_key: str, base_cfg: RuntimeConfig, config_key: str) -> None:
+    global _WORKLOAD, _WORKLOAD_KEY, _BASE_CFG, _CONFIG_KEY
+    _WORKLOAD, _WORKLOAD_KEY, _BASE_CFG, _CONFIG_KEY = workload, workload_key, base_cfg, config_key
+
+
+def _run_trial(params: dict[str, Any], request_count: int) -> dict[str, Any]:
+    assert _WORKLOAD is not None and _BASE_CFG is not None, "worker not initialised"
+    cfg = apply_overrides(_BASE_CFG, params)
+    start = time.perf_counter()
+    result = build_cache_plan(now_ms=_WORKLOAD.now_ms, window_id="sweep", cfg=cfg, inputs=_WORKLOAD.inputs(cfg, request_count))
+    plan_ms = (time.perf_counter() - start) * 1e3
+    metrics = simulate_cache_plan(result, streams_per_tier=int(params.get("streams_per_tier", 4)))
+    return {"trial_id": trial_id(params, request_count, _WORKLOAD_KEY, _CONFIG_KEY), "request_count": request_count, **params, **metrics, "plan_ms": plan_ms}
+
+
+class _TrialRunner:
+    """Fans trials over a process pool (or runs them inline with max_workers=0), appending rows to a JSONL log."""
+
+    def __init__(self, workload: SweepWorkload, base_cfg: RuntimeConfig, max_workers: Optional[int], results_path: Optional[Path]) -> None:
+        self.results_path = results_path
+        self.workload_key = workload.fingerprint()
+        self.config_key = config_digest(base_cfg)
+        self.rows: dict[str, dict[str, Any]] = {}
+        if results_path is not None and results_path.exists():
+            self._load(results_path)
+        self._inline = max_workers == 0
+        if self._inline:
+            _init_worker(workload, self.workload_key, base_cfg, self.config_key)
+            self._pool = None
+        else:
+            initargs = (workload, self.workload_key, base_cfg, self.config_key)
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs)
+
+    def _load(self, results_path: Path) -> None:
+        # A run killed mid-write leaves a truncated last line; drop undecodable rows so their trials
+        # re-run, and rewrite the log so later appends do not land on the partial line.
+        lines = [line for line in results_path.read_text().splitlines() if line.strip()]
+        kept = []
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.rows[row["trial_id"]] = row
+            kept.append(line)
+        if len(kept) != len(lines):
+            results_path.write_text("".join(line + "\n" for line in kept))
+
+    def run(self, trials: Iterable[dict[str, Any]], request_count: int) -> list[dict[str, Any]]:
+        trials = list(trials)
+        ids = [trial_id(params, request_count, self.workload_key, self.config_key) for params in trials]
+        pending = [params for params, tid in zip(trials, ids) if tid not in self.rows]
+        if self._pool is None:
+            for params in pending:
+                self._record(_run_trial(params, request_count))
+        else:
+            futures = [self._pool.submit(_run_trial, params, request_count) for params in pending]
+            for future in as_completed(futures):
+                self._record(future.result())
+        return [self.rows[tid] for tid in ids]
+
+    def _record(self, row: dict[str, Any]) -> None:
+        self.rows[row["trial_id"]] = row
+        if self.results_path is not None:
+            with self.results_path.open("a") as fh:
+                fh.write(json.dumps(row, default=str) + "\n")
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def run_sweep(
+    space: Mapping[str, Sequence[Any]],
+    *,
+    strategy: str = "grid",
+    request_count: int = 2000,
+    n_trials: Optional[int] = None,
+    eta: int = 3,
+    rounds: int = 3,
+    max_workers: Optional[int] = None,
+    results_path: Optional[Path | str] = None,
+    seed: int = 0,
+    workload: Optional[SweepWorkload] = None,
+    base_cfg: Optional[RuntimeConfig] = None,
+    objective: Callable[[Mapping[str, float]], Any] = default_objective,
+) -> SweepResult:
+    """Evaluate planner configurations over a fixed workload.
+
+    `strategy` is "grid" (every combination), "random" (`n_trials` sampled combinations) or "halving"
+    (successive halving: all candidates at `request_count / eta**(rounds-1)` requests, keeping the best
+    1/eta by `objective` each round while the request budget grows by `eta`). With `results_path` every
+    finished trial is appended as a JSONL row, and trials already logged for the same workload and `base_cfg`
+    are not rerun.
+    """
+
+    if strategy not in ("grid", "random", "halving"):
+        raise ValueError(f"unknown strategy {strategy!r}")
+    base_cfg = base_cfg if base_cfg is not None else load_runtime_config()
+    workload = workload if workload is not None else SweepWorkload.synthetic(request_count)
+    candidates = grid(space)
+    if strategy == "random" or (strategy == "halving" and n_trials is not None):
+        rng = np.random.default_rng(seed)
+        count = min(n_trials or len(candidates), len(candidates))
+        candidates = [candidates[i] for i in sorted(rng.choice(len(candidates), size=count, replace=False))]
+
+    path = Path(results_path) if results_path is not None else None
+    runner = _TrialRunner(workload, base_cfg, max_workers, path)
+    try:
+        if strategy != "halving":
+            rows = runner.run(candidates, request_count)
+        else:
+            rows = []
+            for round_idx in range(rounds):
+                budget = max(int(request_count / eta ** (rounds - 1 - round_idx)), 1)
+                scored = runner.run(candidates, budget)
+                for row in scored:
+                    rows.append({**row, "round": round_idx})
+                if round_idx < rounds - 1:
+                    keep = max(len(candidates) // eta, 1)
+                    ranked = sorted(range(len(scored)), key=lambda i: objective(scored[i]))
+                    candidates = [candidates[i] for i in ranked[:keep]]
+    finally:
+        runner.close()
+
+    trials = pd.DataFrame(rows)
+    final = trials if strategy != "halving" else trials[trials["round"] == trials["round"].max()]
+    return SweepResult(trials=trials, frontier=pareto_frontier(final).sort_values("avg_finish_ms").reset_index(drop=True))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sweep BCache planner parameters over a fixed synthetic workload")
+    parser.add_argument("space", type=Path, help='JSON file mapping parameter -> list of values, e.g. {"window_ms": [10, 20]}')
+    parser.add_argument("--strategy", choices=("grid", "random", "halving"), default="grid")
+    parser.add_argument("--request-count", type=int, default=2000, help="Requests per trial (final round for halving)")
+    parser.add_argument("--trials", type=int, default=None, help="Sampled candidates for random/halving")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (0 = run inline)")
+    parser.add_argument("--results", type=Path, default=None, help="JSONL log; existing rows are reused on resume")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = run_sweep(
+        json.loads(args.space.read_text()),
+        strategy=args.strategy,
+        request_count=args.request_count,
+        n_trials=args.trials,
+        max_workers=args.workers,
+        results_path=args.results,
+        seed=args.seed,
+    )
+    print(f"trials={len(result.trials)} frontier={len(result.frontier)}")
+    print(result.frontier.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""gRPC PlanService wrapping the BCache and hotweights planners, plus a stand-in executor."""
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import grpc
+import numpy as np
+
+from bstack_apis import cache_plan_from_proto
+
+from .server import CHANNEL_OPTIONS, DEFAULT_ADDRESS, DEFAULT_REQUEST_COUNT, load_grpc_stubs, serve
+
+
+@dataclass
+class DeliveryStats:
+    batches: int = 0
+    plans: int = 0
+    ops: int = 0
+    elapsed_s: float = 0.0
+    delivery_us: list[float] = field(default_factory=list)
+
+    @property
+    def plans_per_s(self) -> float:
+        return self.plans / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        out = {
+            "batches": float(self.batches),
+            "plans": float(self.plans),
+            "ops": float(self.ops),
+            "elapsed_s": self.elapsed_s,
+            "plans_per_s": self.plans_per_s,
+        }
+        latencies = np.asarray(self.delivery_us, dtype=np.float64)
+        for q in (50, 95, 99):
+            out[f"p{q}_delivery_us"] = float(np.percentile(latencies, q)) if latencies.size else 0.0
+        return out
+
+
+class StandInExecutor:
+    """PlanService client that decodes plans as an executor would and records delivery latency.
+
+    One channel is held for the executor's lifetime, so every call reuses the same HTTP/2 connection.
+    Delivery latency is receipt time minus the server's `emitted_ns`, which assumes a shared host clock.
+    """
+
+    def __init__(self, target: str = DEFAULT_ADDRESS) -> None:
+        self._pb2, pb2_grpc = load_grpc_stubs()
+        self.channel = grpc.insecure_channel(target, options=CHANNEL_OPTIONS)
+        self.stub = pb2_grpc.PlanServiceStub(self.channel)
+
+    def wait_ready(self, timeout: float = 10.0) -> None:
+        grpc.channel_ready_future(self.channel).result(timeout=timeout)
+
+    def _consume(self, batch: Any, stats: DeliveryStats) -> None:
+        stats.delivery_us.append((time.time_ns() - int(batch.emitted_ns)) / 1e3)
+        stats.batches += 1
+        for msg in batch.plans:
+            stats.ops += len(cache_plan_from_proto(msg).ops)
+            stats.plans += 1
+
+    def stream(self, *, windows: int, batch_size: int = 8, request_count: int = DEFAULT_REQUEST_COUNT) -> DeliveryStats:
+        request = self._pb2.CachePlanStreamRequest(windows=windows, batch_size=batch_size, request_count=request_count)
+        stats = DeliveryStats()
+        start = time.perf_counter()
+        for batch in self.stub.StreamCachePlans(request):
+            self._consume(batch, stats)
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def submit(self, *, calls: int, windows: int = 1, request_count: int = DEFAULT_REQUEST_COUNT) -> DeliveryStats:
+        stats = DeliveryStats()
+        start = time.perf_counter()
+        for _ in range(calls):
+            request = self._pb2.CachePlanRequest(request_count=request_count, windows=windows)
+            self._consume(self.stub.SubmitCachePlan(request), stats)
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def close(self) -> None:
+        self.channel.close()
+
+    def __enter__(self) -> "StandInExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure PlanService delivery latency with a stand-in executor")
+    parser.add_argument("--target", default=DEFAULT_ADDRESS, help="PlanService host:port")
+    parser.add_argument("--serve", action="store_true", help="Start an in-process PlanService on --target first")
+    parser.add_argument("--windows", type=int, default=256, help="Windows to stream")
+    parser.add_argument("--batch-size", type=int, default=8, help="Windows per streamed message")
+    parser.add_argument("--request-count", type=int, default=DEFAULT_REQUEST_COUNT, help="Synthetic requests per window")
+    args = parser.parse_args(argv)
+
+    server = serve(args.target)[0] if args.serve else None
+    try:
+        with StandInExecutor(args.target) as executor:
+            executor.wait_ready()
+            report = {
+                "unary": executor.submit(calls=max(args.windows // args.batch_size, 1), request_count=args.request_count).to_dict(),
+                "stream": executor.stream(windows=args.windows, batch_size=args.batch_size, request_count=args.request_count).to_dict(),
+            }
+    finally:
+        if server is not None:
+            server.stop(grace=None)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
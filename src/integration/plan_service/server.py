@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from concurrent import futures
+from typing import Any, Callable, Iterator, Optional
+
+import grpc
+
+from bstack.paths import add_third_party_to_path
+from bstack_apis import CachePlan, SwapPlan, cache_plan_to_proto, swap_plan_to_proto
+from bstack_apis.python.pb import load_pb2
+
+add_third_party_to_path()
+
+CachePlanner = Callable[[str, int, int], CachePlan]
+SwapPlanner = Callable[..., SwapPlan]
+
+DEFAULT_ADDRESS = "127.0.0.1:50151"
+DEFAULT_REQUEST_COUNT = 200
+
+# Shared by server and clients: keep idle HTTP/2 connections alive instead of reconnecting per window.
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 10_000),
+    ("grpc.keepalive_timeout_ms", 5_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_send_message_length", 64 * 1024 * 1024),
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+]
+
+
+def load_grpc_stubs() -> tuple[Any, Any]:
+    pb2 = load_pb2()
+    try:
+        from bstack_apis.python import plan_pb2_grpc
+    except ImportError as exc:
+        raise RuntimeError("gRPC stubs missing; run `make codegen` (requires grpcio-tools)") from exc
+    return pb2, plan_pb2_grpc
+
+
+def _default_cache_planner(plan_id: str, now_ms: int, request_count: int) -> CachePlan:
+    from integration.kv_data_plane import build_cache_plan
+
+    return build_cache_plan(now_ms=now_ms, window_id=plan_id, request_count=request_count).plan
+
+
+def _default_swap_planner(**kwargs: Any) -> SwapPlan:
+    from integration.weight_swapper import build_swap_plan
+
+    return build_swap_plan(**kwargs).plan
+
+
+class PlanServicer:
+    """PlanService implementation; planners are injectable so the service can be load tested in isolation."""
+
+    def __init__(self, cache_planner: Optional[CachePlanner] = None, swap_planner: Optional[SwapPlanner] = None) -> None:
+        self._pb2, _ = load_grpc_stubs()
+        self._cache_planner = cache_planner or _default_cache_planner
+        self._swap_planner = swap_planner or _default_swap_planner
+        self._window_seq = itertools.count()
+        self._batch_seq = itertools.count(1)
+
+    def _plan_batch(self, window_id: str, now_ms: int, request_count: int, windows: int) -> Any:
+        windows = max(windows, 1)
+        plans = []
+        for _ in range(windows):
+            plan_id = window_id if window_id and windows == 1 else f"{window_id or 'cache'}-{next(self._window_seq)}"
+            now = now_ms or int(time.time() * 1000)
+            plans.append(cache_plan_to_proto(self._cache_planner(plan_id, now, request_count)))
+        return self._pb2.CachePlanBatch(plans=plans, batch_seq=next(self._batch_seq), emitted_ns=time.time_ns())
+
+    def SubmitCachePlan(self, request: Any, context: grpc.ServicerContext) -> Any:
+        return self._plan_batch(
+            request.window_id,
+            int(request.now_ms),
+            int(request.request_count) or DEFAULT_REQUEST_COUNT,
+            int(request.windows),
+        )
+
+    def StreamCachePlans(self, request: Any, context: grpc.ServicerContext) -> Iterator[Any]:
+        batch_size = max(int(request.batch_size), 1)
+        request_count = int(request.request_count) or DEFAULT_REQUEST_COUNT
+        remaining = int(request.windows)
+        unbounded = remaining == 0
+        while context.is_active() and (unbounded or remaining > 0):
+            count = batch_size if unbounded else min(batch_size, remaining)
+            yield self._plan_batch("", 0, request_count, count)
+            remaining -= count
+
+    def SubmitSwapPlan(self, request: Any, context: grpc.ServicerContext) -> Any:
+        plan = self._swap_planner(
+            prev_checkpoint=request.prev_checkpoint,
+            next_checkpoint=request.next_checkpoint,
+            model_id=request.model_id or "demo",
+            prev_version=request.prev_version or "prev",
+            next_version=request.next_version or "next",
+            bucket_mb=int(request.bucket_mb) or 32,
+            deadline_ns=int(request.deadline_ns) or None,
+        )
+        return self._pb2.SwapPlanReply(plan=swap_plan_to_proto(plan), emitted_ns=time.time_ns())
+
+
+def serve(
+    address: str = DEFAULT_ADDRESS,
+    *,
+    max_workers: int = 4,
+    cache_planner: Optional[CachePlanner] = None,
+    swap_planner: Optional[SwapPlanner] = None,
+) -> tuple[grpc.Server, int]:
+    """Start a PlanService server and return it together with the bound port."""
+
+    _, pb2_grpc = load_grpc_stubs()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), options=CHANNEL_OPTIONS)
+    pb2_grpc.add_PlanServiceServicer_to_server(PlanServicer(cache_planner, swap_planner), server)
+    port = server.add_insecure_port(address)
+    if port == 0:
+        raise RuntimeError(f"could not bind PlanService to {address}")
+    server.start()
+    return server, port
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the local PlanService")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="host:port to listen on")
+    parser.add_argument("--max-workers", type=int, default=4, help="gRPC handler threads")
+    args = parser.parse_args(argv)
+
+    server, port = serve(args.address, max_workers=args.max_workers)
+    print(f"PlanService listening on port {port}")
+    server.wait_for_termination()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+"""Vectorized transfer simulation over the shared plan IR."""
+
+from .transfer_sim import DEFAULT_BANDWIDTH_GBPS, SimConfig, SimResult, endpoint_tier, simulate_transfers
+
+__all__ = ["DEFAULT_BANDWIDTH_GBPS", "SimConfig", "SimResult", "endpoint_tier", "simulate_transfers"]
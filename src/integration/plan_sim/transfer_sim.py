@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable, Mapping, Optional, Union
+
+import numpy as np
+
+from bstack_apis import TRANSFER_KINDS, CachePlan, PlanColumns, SwapPlan, TransferKind, TransferOp, kind_code, plan_columns
+
+PlanLike = Union[CachePlan, SwapPlan, PlanColumns, Iterable[TransferOp]]
+
+# GB/s (1 GB = 1e9 bytes, so the value is also bytes per nanosecond).
+DEFAULT_BANDWIDTH_GBPS: dict[TransferKind, float] = {
+    TransferKind.H2D: 25.0,
+    TransferKind.D2H: 25.0,
+    TransferKind.P2P: 50.0,
+    TransferKind.STORAGE2H: 7.0,
+}
+
+
+@dataclass
+class SimConfig:
+    """Link model for simulate_transfers.
+
+    Each TransferKind is one link whose bandwidth is split evenly over `streams` concurrent streams.
+    Ops are dealt round-robin onto streams in plan order and run FIFO per stream, paying
+    `op_overhead_us` of setup each. With `overlap=False` the links run one after another, in order
+    of each kind's first appearance in the plan, instead of concurrently.
+    """
+
+    bandwidth_gbps: Mapping[TransferKind, float] = field(default_factory=lambda: dict(DEFAULT_BANDWIDTH_GBPS))
+    streams: Union[int, Mapping[TransferKind, int]] = 4
+    overlap: bool = True
+    op_overhead_us: float = 2.0
+
+    def bandwidth_array(self) -> np.ndarray:
+        out = np.empty(len(TRANSFER_KINDS), dtype=np.float64)
+        for kind in TRANSFER_KINDS:
+            bw = float(self.bandwidth_gbps.get(kind, DEFAULT_BANDWIDTH_GBPS[kind]))
+            if bw <= 0:
+                raise ValueError(f"bandwidth for {kind.name} must be positive")
+            out[kind_code(kind)] = bw
+        return out
+
+    def streams_array(self) -> np.ndarray:
+        out = np.empty(len(TRANSFER_KINDS), dtype=np.int64)
+        for kind in TRANSFER_KINDS:
+            streams = self.streams if isinstance(self.streams, int) else self.streams.get(kind, 1)
+            if streams <= 0:
+                raise ValueError(f"stream count for {kind.name} must be positive")
+            out[kind_code(kind)] = streams
+        return out
+
+
+@dataclass
+class SimResult:
+    start_ns: np.ndarray
+    finish_ns: np.ndarray
+    deadline_ns: Optional[np.ndarray]
+    makespan_ns: int
+    utilization: dict[str, float]
+    bytes_by_kind: dict[str, int]
+    tier_utilization: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def late(self) -> np.ndarray:
+        if self.deadline_ns is None:
+            return np.zeros(self.finish_ns.shape, dtype=bool)
+        return self.finish_ns > self.deadline_ns
+
+    @property
+    def deadline_misses(self) -> int:
+        return int(self.late.sum())
+
+    def summary(self) -> dict[str, float]:
+        """Headline metrics.
+
+        `ops` and `avg_finish_ms` mean what they do in `simulate_cache_plan`. `prefetch_timeliness`
+        (the on-time fraction) is only present when the ops have deadlines, which a CachePlan does not
+        unless `deadline_ns` is passed, so this is not a drop-in for the BCache simulator's metrics.
+        """
+
+        ops = int(self.finish_ns.shape[0])
+        out = {
+            "ops": float(ops),
+            "avg_finish_ms": float(self.finish_ns.mean() / 1e6) if ops else 0.0,
+            "deadline_misses": float(self.deadline_misses),
+            "makespan_ms": self.makespan_ns / 1e6,
+        }
+        if self.deadline_ns is not None:
+            out["prefetch_timeliness"] = 1.0 - self.deadline_misses / ops if ops else 1.0
+        out.update({f"util_{name}": value for name, value in self.utilization.items()})
+        out.update({f"tier_util_{tier}": value for tier, value in self.tier_utilization.items()})
+        return out
+
+
+def endpoint_tier(uri: str) -> str:
+    """The storage tier an op endpoint belongs to: `tier://node/tierN` URIs as-is, else the scheme.
+
+    Swap plans name one `file://` path per shard and one `device://bucket/N` per bucket; collapsing
+    those to their scheme keeps one entry per tier rather than per file.
+    """
+
+    if uri.startswith("tier://"):
+        return uri
+    scheme, sep, _ = uri.partition("://")
+    return scheme if sep else uri
+
+
+def _busy_fraction(start: np.ndarray, finish: np.ndarray, makespan: int) -> float:
+    """Fraction of [0, makespan) covered by the union of the [start, finish) intervals."""
+
+    order = np.argsort(start, kind="stable")
+    s, f = start[order], finish[order]
+    reach = np.maximum.accumulate(f)
+    prev = np.concatenate(([np.iinfo(np.int64).min], reach[:-1]))
+    covered = np.maximum(f - np.maximum(s, prev), 0).sum()
+    return float(covered) / makespan if makespan else 0.0
+
+
+def simulate_transfers(
+    plan: PlanLike,
+    config: Optional[SimConfig] = None,
+    *,
+    release_ns: Optional[np.ndarray] = None,
+    deadline_ns: Optional[Union[int, np.ndarray]] = None,
+) -> SimResult:
+    """Simulate a plan (CachePlan, SwapPlan, TransferOp list or PlanColumns) on a per-kind link model.
+
+    Times are nanoseconds relative to the start of the plan. `release_ns` holds the earliest start of
+    each op. Deadlines default to the SwapWindow length for a SwapPlan and to none otherwise.
+
+    `utilization` is per link (TransferKind): busy stream time over makespan times streams.
+    `tier_utilization` is per `endpoint_tier` of the ops' src and dst: the fraction of the makespan
+    during which at least one op reads from or writes to that tier.
+    """
+
+    config = config or SimConfig()
+    cols, window_deadline = _as_columns(plan)
+    n = len(cols)
+    if deadline_ns is None and window_deadline is not None:
+        deadline_ns = window_deadline
+
+    kind = cols.kind.astype(np.int64)
+    per_stream_bw = config.bandwidth_array() / config.streams_array()
+    streams = config.streams_array()
+    overhead_ns = int(round(config.op_overhead_us * 1e3))
+    duration = np.ceil(cols.length / per_stream_bw[kind]).astype(np.int64) + overhead_ns
+    release = np.zeros(n, dtype=np.int64) if release_ns is None else np.broadcast_to(np.asarray(release_ns, dtype=np.int64), (n,))
+
+    finish = np.zeros(n, dtype=np.int64)
+    phase_end = 0
+    utilization: dict[str, float] = {}
+    bytes_by_kind: dict[str, int] = {}
+    busy: dict[str, int] = {}
+    present, first_seen = np.unique(kind, return_index=True)
+    for code in present[np.argsort(first_seen)]:
+        idx = np.flatnonzero(kind == code)
+        lane = np.arange(idx.shape[0]) % streams[code]
+        lane_order = np.argsort(lane, kind="stable")
+        ordered = idx[lane_order]
+        kind_release = np.maximum(release[ordered], phase_end)
+        finish[ordered] = _fifo_finish(lane[lane_order], duration[ordered], kind_release)
+        if not config.overlap:
+            phase_end = int(finish[idx].max())
+        name = TRANSFER_KINDS[code].name
+        busy[name] = int(duration[idx].sum())
+        bytes_by_kind[name] = int(cols.length[idx].sum())
+
+    makespan = int(finish.max()) if n else 0
+    for code, kind_enum in enumerate(TRANSFER_KINDS):
+        name = kind_enum.name
+        if name in busy:
+            utilization[name] = busy[name] / (makespan * int(streams[code])) if makespan else 0.0
+
+    start = finish - duration
+    tier_utilization: dict[str, float] = {}
+    if n and cols.src.shape[0] == n and cols.dst.shape[0] == n:
+        src_tier = np.asarray([endpoint_tier(v) for v in cols.src_values], dtype=object)[cols.src]
+        dst_tier = np.asarray([endpoint_tier(v) for v in cols.dst_values], dtype=object)[cols.dst]
+        for tier in sorted(set(map(endpoint_tier, cols.src_values)) | set(map(endpoint_tier, cols.dst_values))):
+            idx = np.flatnonzero((src_tier == tier) | (dst_tier == tier))
+            if idx.size:
+                tier_utilization[tier] = _busy_fraction(start[idx], finish[idx], makespan)
+
+    deadlines = None
+    if deadline_ns is not None:
+        deadlines = np.broadcast_to(np.asarray(deadline_ns, dtype=np.int64), (n,))
+    return SimResult(
+        start_ns=start,
+        finish_ns=finish,
+        deadline_ns=deadlines,
+        makespan_ns=makespan,
+        utilization=utilization,
+        bytes_by_kind=bytes_by_kind,
+        tier_utilization=tier_utilization,
+    )
+
+
+def _as_columns(plan: PlanLike) -> tuple[PlanColumns, Optional[int]]:
+    if isinstance(plan, SwapPlan):
+        return plan_columns(plan.ops), int(plan.window.t_deadline_ns) - int(plan.window.t_start_ns)
+    if isinstance(plan, CachePlan):
+        return plan_columns(plan.ops), None
+    return plan_columns(plan), None
+
+
+def _fifo_finish(group: np.ndarray, duration: np.ndarray, release: np.ndarray) -> np.ndarray:
+    """Finish times of FIFO queues laid out contiguously by `group`.
+
+    Within a queue finish_i = max(release_i, finish_{i-1}) + d_i, which unrolls to
+    C_i + max_{j<=i}(release_j - C_{j-1}) with C the in-queue cumulative duration; the running max
+    is taken per queue by lifting each queue above the previous one before a global accumulate.
+    """
+
+    n = duration.shape[0]
+    if n == 0:
+        return duration.copy()
+    # Work relative to the earliest release so absolute (epoch-ns) release times cannot overflow
+    # the lifted running max below.
+    base = int(release.min())
+    release = release - base
+    csum = np.cumsum(duration)
+    is_head = np.empty(n, dtype=bool)
+    is_head[0] = True
+    np.not_equal(group[1:], group[:-1], out=is_head[1:])
+    head_pos = np.maximum.accumulate(np.where(is_head, np.arange(n), 0))
+    inclusive = csum - (csum - duration)[head_pos]
+    slack = release - (inclusive - duration)
+    queue = np.cumsum(is_head) - 1
+    lo = int(slack.min())
+    span = int(slack.max()) - lo + 1
+    lifted = (slack - lo) + queue * span
+    running = np.maximum.accumulate(lifted) - queue * span + lo
+    return inclusive + running + base
+
+
+__all__ = ["DEFAULT_BANDWIDTH_GBPS", "SimConfig", "SimResult", "endpoint_tier", "simulate_transfers"]
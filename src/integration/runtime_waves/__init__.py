@@ -0,0 +1,21 @@
+"""bstack-runtime wave submission layer with pooled host buffers."""
+
+from .submitter import (
+    WaveBufferPool,
+    WaveBuffers,
+    WaveStats,
+    WaveSubmitter,
+    aligned_empty,
+    run_wave_benchmark,
+    swap_range_for_window,
+)
+
+__all__ = [
+    "WaveBufferPool",
+    "WaveBuffers",
+    "WaveStats",
+    "WaveSubmitter",
+    "aligned_empty",
+    "run_wave_benchmark",
+    "swap_range_for_window",
+]
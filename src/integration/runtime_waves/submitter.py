@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional, Sequence
+
+import numpy as np
+
+from bstack.paths import add_third_party_to_path
+from bstack_apis import SwapPlan, SwapWindow
+
+add_third_party_to_path()
+
+try:
+    from bwrt.runtime import BwRuntime, WaveSpec
+except Exception:  # pragma: no cover - optional bstack-runtime build
+    BwRuntime = None  # type: ignore
+    WaveSpec = None  # type: ignore
+
+
+DEFAULT_ALIGNMENT = 64
+
+
+def aligned_empty(shape: Sequence[int] | int, dtype: Any = np.float32, *, alignment: int = DEFAULT_ALIGNMENT) -> np.ndarray:
+    """Allocate an uninitialised array whose data pointer is `alignment`-byte aligned."""
+
+    if alignment <= 0 or alignment & (alignment - 1):
+        raise ValueError(f"alignment must be a positive power of two, got {alignment}")
+    dtype = np.dtype(dtype)
+    shape = (shape,) if isinstance(shape, int) else tuple(shape)
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    raw = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = (-raw.ctypes.data) % alignment
+    return raw[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+@dataclass
+class WaveBuffers:
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+
+    @property
+    def pointers(self) -> tuple[int, int, int]:
+        return self.a.ctypes.data, self.b.ctypes.data, self.c.ctypes.data
+
+
+class WaveBufferPool:
+    """Fixed set of preallocated A/B/C host buffers handed to the runtime by pointer."""
+
+    def __init__(
+        self,
+        size: int,
+        *,
+        bm: int,
+        bn: int,
+        bk: int,
+        dtype: Any = np.float32,
+        alignment: int = DEFAULT_ALIGNMENT,
+    ) -> None:
+        if size <= 0:
+            raise ValueError("pool size must be positive")
+        self.bm, self.bn, self.bk = bm, bn, bk
+        self._free: Deque[WaveBuffers] = deque()
+        for _ in range(size):
+            a = aligned_empty((bm, bk), dtype, alignment=alignment)
+            b = aligned_empty((bk, bn), dtype, alignment=alignment)
+            c = aligned_empty((bm, bn), dtype, alignment=alignment)
+            a.fill(1)
+            b.fill(1)
+            c.fill(0)
+            self._free.append(WaveBuffers(a=a, b=b, c=c))
+        self.size = size
+
+    @property
+    def available(self) -> int:
+        return len(self._free)
+
+    def acquire(self) -> WaveBuffers:
+        if not self._free:
+            raise RuntimeError("wave buffer pool exhausted; retire in-flight waves first")
+        return self._free.popleft()
+
+    def release(self, buffers: WaveBuffers) -> None:
+        if len(self._free) >= self.size:
+            raise RuntimeError("buffer released more times than acquired")
+        self._free.append(buffers)
+
+
+@dataclass
+class WaveStats:
+    waves: int
+    elapsed_s: float
+    latencies_us: np.ndarray
+
+    @property
+    def waves_per_s(self) -> float:
+        return self.waves / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def percentiles(self, qs: Sequence[float] = (50, 95, 99)) -> dict[str, float]:
+        if self.latencies_us.size == 0:
+            return {f"p{q:g}_us": 0.0 for q in qs}
+        values = np.percentile(self.latencies_us, qs)
+        return {f"p{q:g}_us": float(v) for q, v in zip(qs, values)}
+
+    def to_dict(self) -> dict[str, float]:
+        out = {"waves": float(self.waves), "elapsed_s": self.elapsed_s, "waves_per_s": self.waves_per_s}
+        out.update(self.percentiles())
+        return out
+
+
+def swap_range_for_window(window: SwapWindow, *, t0_ns: int, wave_ns: float, total_waves: int) -> tuple[int, int]:
+    """Map an absolute SwapWindow onto the [swap_begin, swap_end) wave indices of a run starting at `t0_ns`."""
+
+    if wave_ns <= 0:
+        raise ValueError("wave_ns must be positive")
+    begin = math.floor((int(window.t_start_ns) - t0_ns) / wave_ns)
+    end = math.ceil((int(window.t_deadline_ns) - t0_ns) / wave_ns)
+    begin = min(max(begin, 0), total_waves)
+    end = min(max(end, begin), total_waves)
+    return begin, end
+
+
+class WaveSubmitter:
+    """Keep up to `max_inflight` waves queued on a BwRuntime, recycling pool buffers as they retire."""
+
+    def __init__(
+        self,
+        runtime: Any,
+        pool: WaveBufferPool,
+        *,
+        max_inflight: int = 8,
+        timeout_ms: int = 0,
+        spec_factory: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        if max_inflight <= 0:
+            raise ValueError("max_inflight must be positive")
+        if max_inflight > pool.size:
+            raise ValueError(f"max_inflight={max_inflight} exceeds pool size {pool.size}")
+        spec_factory = spec_factory if spec_factory is not None else WaveSpec
+        if spec_factory is None:
+            raise RuntimeError("bstack-runtime Python bindings not installed; pass spec_factory explicitly")
+        self.runtime = runtime
+        self.pool = pool
+        self.max_inflight = max_inflight
+        self.timeout_ms = timeout_ms
+        self._spec_factory = spec_factory
+
+    def run(self, waves: int, *, swap_range: tuple[int, int] = (0, 0)) -> WaveStats:
+        spec = self._spec_factory(
+            bm=self.pool.bm,
+            bn=self.pool.bn,
+            bk=self.pool.bk,
+            swap_begin=int(swap_range[0]),
+            swap_end=int(swap_range[1]),
+        )
+        latencies = np.empty(waves, dtype=np.float64)
+        inflight: Deque[tuple[Any, WaveBuffers, int]] = deque()
+        done = 0
+        start = time.perf_counter_ns()
+        for _ in range(waves):
+            if len(inflight) >= self.max_inflight:
+                latencies[done] = self._retire(inflight.popleft())
+                done += 1
+            buffers = self.pool.acquire()
+            submitted = time.perf_counter_ns()
+            event = self.runtime.submit_wave(spec, *buffers.pointers)
+            inflight.append((event, buffers, submitted))
+        while inflight:
+            latencies[done] = self._retire(inflight.popleft())
+            done += 1
+        elapsed_s = (time.perf_counter_ns() - start) / 1e9
+        return WaveStats(waves=waves, elapsed_s=elapsed_s, latencies_us=latencies[:done])
+
+    def _retire(self, entry: tuple[Any, WaveBuffers, int]) -> float:
+        event, buffers, submitted = entry
+        self.runtime.wait(event, timeout_ms=self.timeout_ms)
+        latency_us = (time.perf_counter_ns() - submitted) / 1e3
+        self.pool.release(buffers)
+        return latency_us
+
+
+def run_wave_benchmark(
+    runtime: Any = None,
+    *,
+    waves: int = 1024,
+    bm: int = 64,
+    bn: int = 64,
+    bk: int = 64,
+    pool_size: int = 16,
+    max_inflight: int = 8,
+    warmup: int = 8,
+    swap_plan: Optional[SwapPlan] = None,
+    t0_ns: Optional[int] = None,
+    wave_ns: Optional[float] = None,
+    spec_factory: Optional[Callable[..., Any]] = None,
+) -> dict[str, float]:
+    """Measure sustained wave throughput and latency percentiles on a BwRuntime (CPU fallback by default).
+
+    With a `swap_plan`, the plan's wall-clock window is mapped onto the measured run: wave 0 starts
+    at `t0_ns` (default: `time.time_ns()` when the measured run begins) and each wave spans `wave_ns`
+    (default: the mean wave time of the pipelined warmup). Pass both for a reproducible range.
+    """
+
+    if runtime is None:
+        if BwRuntime is None:
+            raise RuntimeError("bstack-runtime Python bindings not installed")
+        runtime = BwRuntime()
+    pool = WaveBufferPool(pool_size, bm=bm, bn=bn, bk=bk)
+    submitter = WaveSubmitter(runtime, pool, max_inflight=max_inflight, spec_factory=spec_factory)
+
+    warmup_ns = 0.0
+    if warmup > 0:
+        probe = submitter.run(warmup)
+        warmup_ns = probe.elapsed_s * 1e9 / warmup
+
+    swap_range = (0, 0)
+    if swap_plan is not None:
+        if wave_ns is None:
+            if warmup_ns <= 0:
+                raise ValueError("wave_ns is required when there is no warmup to measure it")
+            wave_ns = warmup_ns
+        t0_ns = time.time_ns() if t0_ns is None else t0_ns
+        swap_range = swap_range_for_window(swap_plan.window, t0_ns=t0_ns, wave_ns=wave_ns, total_waves=waves)
+
+    stats = submitter.run(waves, swap_range=swap_range)
+    report = stats.to_dict()
+    report.update({"warmup_wave_us": warmup_ns / 1e3, "swap_begin": float(swap_range[0]), "swap_end": float(swap_range[1])})
+    return report
@@ -1,5 +1,41 @@
-"""hotweights swap plan adapter."""
+"""hotweights swap plan adapter.
 
-from .runner import build_swap_plan, bucket_summary
+The manifest frames and the host staging cache need only NumPy/pandas. Names from `runner` import
+hotweights, so they are loaded on first access.
+"""
 
-__all__ = ["build_swap_plan", "bucket_summary"]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .frames import bucket_ops, diff_manifests, manifest_frame, rollback_items, swap_ops, to_weight_manifest
+from .staging import STAGING_SCHEME, HostStagingCache
+
+if TYPE_CHECKING:
+    from .runner import SwapPlanResult, bucket_summary, build_swap_plan
+
+_RUNNER_EXPORTS = ("SwapPlanResult", "bucket_summary", "build_swap_plan")
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _RUNNER_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(".runner", __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "HostStagingCache",
+    "STAGING_SCHEME",
+    "SwapPlanResult",
+    "bucket_ops",
+    "bucket_summary",
+    "build_swap_plan",
+    "diff_manifests",
+    "manifest_frame",
+    "rollback_items",
+    "swap_ops",
+    "to_weight_manifest",
+]
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import os
+from itertools import repeat
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from bstack_apis import FileChunk, TransferKind, TransferOp, WeightManifest
+
+MANIFEST_COLUMNS = ("tensor", "path", "offset", "length", "sha256")
+ITEM_COLUMNS = ("bucket_id", "uri", "nbytes", "offset", "tensor", "shard_rank")
+
+
+def _strip_scheme(uri: str) -> str:
+    return uri[7:] if uri.startswith("file://") else uri
+
+
+def _manifest_columns(manifest: dict) -> dict[str, list]:
+    shards = [(tensor.get("name", ""), shard) for tensor in manifest.get("tensors", []) for shard in tensor.get("shards", [])]
+    return {
+        "tensor": [name for name, _ in shards],
+        "shard_rank": [int(shard.get("rank", 0)) for _, shard in shards],
+        "path": [_strip_scheme(str(shard.get("uri", ""))) for _, shard in shards],
+        "length": [int(shard.get("bytes", 0)) for _, shard in shards],
+        "sha256": [str(shard.get("hash", "")) for _, shard in shards],
+    }
+
+
+def _root_prefixes(root: Union[str, os.PathLike]) -> list[str]:
+    """`root` as given, absolute and with symlinks resolved, each with a trailing separator.
+
+    Manifest URIs carry whichever form the manifest builder saw (hotweights joins onto the
+    checkpoint_dir it was handed), so a relative or symlinked root must match all three.
+    """
+
+    root = os.fspath(root)
+    prefixes = [os.path.join(form, "") for form in (root, os.path.abspath(root), os.path.realpath(root))]
+    return list(dict.fromkeys(prefixes))
+
+
+def _relative(path: str, prefixes: list[str]) -> str:
+    for prefix in prefixes:
+        if path.startswith(prefix):
+            return path[len(prefix) :]
+    return path
+
+
+def _with_rel_path(frame: pd.DataFrame, root: Optional[Union[str, os.PathLike]]) -> pd.DataFrame:
+    if root is not None:
+        prefixes = _root_prefixes(root)
+        frame["rel_path"] = [_relative(p, prefixes) for p in frame["path"].tolist()]
+    return frame
+
+
+def manifest_frame(manifest: dict, *, root: Optional[Union[str, os.PathLike]] = None) -> pd.DataFrame:
+    """One row per shard of a hotweights manifest dict, in manifest order.
+
+    `path` has any `file://` scheme stripped; with `root`, `rel_path` holds the path relative to it,
+    which is the key `diff_manifests` uses to line up two checkpoint directories. `shard_rank` is
+    the shard's `rank` (0 when the manifest has none).
+    """
+
+    cols = _manifest_columns(manifest)
+    frame = pd.DataFrame(
+        {
+            "tensor": cols["tensor"],
+            "path": cols["path"],
+            "offset": np.zeros(len(cols["path"]), dtype=np.int64),
+            "length": np.asarray(cols["length"], dtype=np.int64),
+            "sha256": cols["sha256"],
+            "shard_rank": np.asarray(cols["shard_rank"], dtype=np.int64),
+        }
+    )
+    return _with_rel_path(frame, root)
+
+
+def to_weight_manifest(manifest: dict) -> WeightManifest:
+    """The WeightManifest for a hotweights manifest dict.
+
+    One comprehension straight into FileChunks: going through per-field column lists first
+    allocates four extra lists of the same length, which costs more than it saves.
+    """
+
+    files = [
+        FileChunk(_strip_scheme(str(shard.get("uri", ""))), 0, int(shard.get("bytes", 0)), str(shard.get("hash", "")))
+        for tensor in manifest.get("tensors", [])
+        for shard in tensor.get("shards", [])
+    ]
+    return WeightManifest(model_id=manifest.get("model_id", "model"), version=manifest.get("version", "0"), files=files)
+
+
+def _lookup(keys: np.ndarray, table_keys: np.ndarray) -> np.ndarray:
+    """Row of each key in `table_keys` (last occurrence wins), or -1.
+
+    A plain dict over the key strings beats pandas' object hashtables here: str objects cache their
+    hash, so each key is hashed once no matter how many lookups touch it.
+    """
+
+    index = dict(zip(table_keys.tolist(), range(table_keys.shape[0])))
+    return np.fromiter(map(index.get, keys.tolist(), repeat(-1)), dtype=np.int64, count=keys.shape[0])
+
+
+def diff_manifests(prev: pd.DataFrame, next_: pd.DataFrame, *, key: Optional[str] = None) -> pd.DataFrame:
+    """Classify shards of two manifest frames by (path, sha256).
+
+    `key` names the path column to align on (default `rel_path` when both frames have it, else
+    `path`). Returns next's rows that are `added` (path absent from prev) or `changed` (path present
+    with a different sha256), followed by prev's `removed` rows, with a `status` column. When prev
+    repeats a path only its last row is matched; earlier duplicates come back as `removed`.
+    """
+
+    key = key or ("rel_path" if "rel_path" in prev and "rel_path" in next_ else "path")
+    prev_keys, next_keys = prev[key].to_numpy(object), next_[key].to_numpy(object)
+    prev_rows = _lookup(next_keys, prev_keys)
+    seen = prev_rows >= 0
+    prev_sha = prev["sha256"].to_numpy(object)
+    changed = np.zeros(len(next_), dtype=bool)
+    changed[seen] = prev_sha[prev_rows[seen]] != next_["sha256"].to_numpy(object)[seen]
+    keep = ~seen | changed
+    out = next_[keep].assign(status=np.where(seen[keep], "changed", "added"))
+    matched = np.zeros(len(prev), dtype=bool)
+    matched[prev_rows[seen]] = True
+    removed = prev[~matched].assign(status="removed")
+    return pd.concat([out, removed], ignore_index=True)
+
+
+def rollback_items(prev: pd.DataFrame, next_: pd.DataFrame, *, bucket_bytes: int) -> pd.DataFrame:
+    """Bucket items that put prev's shards back over next: every prev shard next changed or removed.
+
+    Both frames come from `manifest_frame`. Items keep prev's manifest order and shard ranks, and
+    are packed greedily into buckets of at most `bucket_bytes` (a larger shard gets a bucket to itself).
+    """
+
+    diff = diff_manifests(next_, prev)
+    restore = diff[diff["status"] != "removed"]
+    lengths = restore["length"].tolist()
+    bucket_ids, bucket, used = [], 0, 0
+    for n in lengths:
+        if used and used + n > bucket_bytes:
+            bucket, used = bucket + 1, 0
+        bucket_ids.append(bucket)
+        used += n
+    return pd.DataFrame(
+        {
+            "bucket_id": np.asarray(bucket_ids, dtype=np.int64),
+            "uri": ["file://" + os.path.abspath(p) for p in restore["path"].tolist()],
+            "nbytes": np.asarray(lengths, dtype=np.int64),
+            "offset": restore["offset"].to_numpy(np.int64),
+            "tensor": restore["tensor"].tolist(),
+            "shard_rank": restore["shard_rank"].to_numpy(np.int64) if "shard_rank" in restore else np.zeros(len(lengths), dtype=np.int64),
+        }
+    )
+
+
+def bucket_ops(buckets: Iterable[dict]) -> list[TransferOp]:
+    """STORAGE2H ops for hotweights bucket dicts, in bucket then item order.
+
+    Built straight from the dicts: a frame in between costs more than the loop it replaces. Ops in
+    one bucket share their dst string.
+    """
+
+    kind = TransferKind.STORAGE2H
+    ops: list[TransferOp] = []
+    for bucket in buckets:
+        bucket_id = int(bucket.get("bucket_id", 0))
+        dst = f"device://bucket/{bucket_id}"
+        for item in bucket.get("items", []):
+            offset = int(item.get("offset", 0))
+            note = f"tensor={item.get('tensor', 'tensor')} shard={int(item.get('shard_rank', 0))} bucket={bucket_id} offset={offset}"
+            ops.append(TransferOp(kind, str(item.get("uri", "")), dst, int(item.get("nbytes", 0)), offset, offset, [], note))
+    return ops
+
+
+def swap_ops(items: pd.DataFrame) -> list[TransferOp]:
+    """STORAGE2H ops for a bucket item frame (see `rollback_items`); equal src and dst strings are shared between ops."""
+
+    if items.empty:
+        return []
+    uri_codes, uris = pd.factorize(items["uri"].to_numpy(object))
+    src = np.asarray(uris, dtype=object)[uri_codes].tolist()
+    bucket_codes, bucket_ids = pd.factorize(items["bucket_id"].to_numpy())
+    dst = np.array([f"device://bucket/{b}" for b in bucket_ids], dtype=object)[bucket_codes].tolist()
+    bucket, offset, length = items["bucket_id"].tolist(), items["offset"].tolist(), items["nbytes"].tolist()
+    tensor, shard = items["tensor"].tolist(), items["shard_rank"].tolist()
+    kind = TransferKind.STORAGE2H
+    return [
+        TransferOp(kind, s, d, n, off, off, [], f"tensor={t} shard={r} bucket={b} offset={off}")
+        for s, d, n, off, t, r, b in zip(src, dst, length, offset, tensor, shard, bucket)
+    ]
+
+
+__all__ = [
+    "ITEM_COLUMNS",
+    "MANIFEST_COLUMNS",
+    "bucket_ops",
+    "diff_manifests",
+    "manifest_frame",
+    "rollback_items",
+    "swap_ops",
+    "to_weight_manifest",
+]
@@ -2,34 +2,46 @@ from __future__ import annotations
 
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Iterable, Optional
 
 from bstack.paths import add_third_party_to_path
-from bstack_apis import (
-    FileChunk,
-    SwapPlan,
-    SwapWindow,
-    TransferKind,
-    TransferOp,
-    WeightManifest,
-    file_chunk,
-    swap_plan,
-)
+from bstack_apis import SwapPlan, SwapWindow, WeightManifest, swap_plan
 
 add_third_party_to_path()
 
 from hotweights.manifest import build_simple_manifest
 from hotweights.core.replicate import create_plan
 
+from .frames import bucket_ops, manifest_frame, rollback_items, swap_ops, to_weight_manifest
+from .staging import HostStagingCache
+
 
 @dataclass
 class SwapPlanResult:
+    """A SwapPlan with the hotweights buckets behind it; `buckets` is empty for lean results.
+
+    The manifests are the same objects the plan references, not copies. `rollback`, when requested,
+    swaps `next_manifest` back to `prev_manifest`; its window is relative (starts at 0, ends at the
+    rollback budget) until `rollback_plan` stamps it at trigger time.
+    """
+
     plan: SwapPlan
     prev_manifest: WeightManifest
     next_manifest: WeightManifest
     buckets: list[dict]
+    bucket_stats: list[dict[str, int]] = field(default_factory=list)
+    rollback: Optional[SwapPlan] = None
+
+    def rollback_plan(self, now_ns: Optional[int] = None) -> SwapPlan:
+        """The rollback plan with its window moved to start at `now_ns` (default: now)."""
+
+        if self.rollback is None:
+            raise ValueError("this result was built without rollback=True")
+        now_ns = now_ns if now_ns is not None else time.time_ns()
+        budget = self.rollback.window.t_deadline_ns - self.rollback.window.t_start_ns
+        return replace(self.rollback, window=SwapWindow(t_start_ns=now_ns, t_deadline_ns=now_ns + budget))
 
 
 def build_swap_plan(
@@ -41,77 +53,66 @@ def build_swap_plan(
     next_version: str = "next",
     bucket_mb: int = 32,
     deadline_ns: Optional[int] = None,
+    lean: bool = False,
+    rollback: bool = False,
+    rollback_budget_ns: int = 5_000_000_000,
+    staging: Optional[HostStagingCache] = None,
 ) -> SwapPlanResult:
-    """Produce a SwapPlan by diffing two checkpoint directories."""
+    """Produce a SwapPlan by diffing two checkpoint directories.
+
+    The forward plan's diff and bucket layout come from hotweights' `create_plan`; this function
+    only converts its buckets into ops (`bucket_ops`). `diff_manifests` is used for the rollback plan,
+    whose buckets hotweights does not produce.
+
+    With `lean=True` the raw bucket dicts are dropped once the ops are built; `bucket_stats` keeps
+    their per-bucket counts either way.
+
+    With `rollback=True` (implied by `staging`) the result also carries the reverse plan, which
+    reloads every prev shard the swap displaces, bucketed by `bucket_mb` like the forward plan. A
+    rollback runs whenever it is triggered, not in the forward window, so its window is the relative
+    [0, rollback_budget_ns]; take it through `SwapPlanResult.rollback_plan` to stamp it with the
+    trigger time. Given a `staging` cache, the displaced chunks are copied into it now and
+    the matching rollback ops read them from host memory (H2D) instead of storage; pass the plan
+    through `staging.resolve` before running it in case chunks were evicted since.
+    """
 
     os.environ.setdefault("HOTWEIGHTS_FORCE_PANDAS", "1")
 
     prev_manifest_raw = build_simple_manifest(model_id=model_id, version=prev_version, checkpoint_dir=str(prev_checkpoint))
     next_manifest_raw = build_simple_manifest(model_id=model_id, version=next_version, checkpoint_dir=str(next_checkpoint))
 
-    prev_manifest = _to_weight_manifest(prev_manifest_raw)
-    next_manifest = _to_weight_manifest(next_manifest_raw)
+    prev_manifest = to_weight_manifest(prev_manifest_raw)
+    next_manifest = to_weight_manifest(next_manifest_raw)
+    restore = None
+    if rollback or staging is not None:
+        restore = rollback_items(
+            manifest_frame(prev_manifest_raw, root=prev_checkpoint),
+            manifest_frame(next_manifest_raw, root=next_checkpoint),
+            bucket_bytes=bucket_mb << 20,
+        )
 
     bucket_plan = create_plan(prev_manifest_raw, next_manifest_raw, bucket_mb=bucket_mb)
     buckets = list(bucket_plan.get("buckets", []))
+    del bucket_plan, prev_manifest_raw, next_manifest_raw
     plan_id = f"swap-{next_manifest.version}"
     start_ns = time.time_ns()
     deadline_ns = deadline_ns if deadline_ns is not None else start_ns + 5_000_000_000  # +5s
 
-    ops: list[TransferOp] = []
-    for bucket in buckets:
-        bucket_id = int(bucket.get("bucket_id", 0))
-        for item in bucket.get("items", []):
-            uri = str(item.get("uri", ""))
-            length = int(item.get("nbytes", 0))
-            offset = int(item.get("offset", 0))
-            tensor = item.get("tensor", "tensor")
-            shard = int(item.get("shard_rank", 0))
-            dst = f"device://bucket/{bucket_id}"
-            note = f"tensor={tensor} shard={shard} bucket={bucket_id} offset={offset}"
-            ops.append(
-                TransferOp(
-                    kind=TransferKind.STORAGE2H,
-                    src=uri,
-                    dst=dst,
-                    length=length,
-                    src_offset=offset,
-                    dst_offset=offset,
-                    kv_refs=[],
-                    note=note,
-                )
-            )
-
-    swap = swap_plan(
-        plan_id,
-        prev_manifest,
-        next_manifest,
-        ops,
-        window=SwapWindow(t_start_ns=start_ns, t_deadline_ns=deadline_ns),
-    )
-
-    return SwapPlanResult(plan=swap, prev_manifest=prev_manifest, next_manifest=next_manifest, buckets=buckets)
-
-
-def _to_weight_manifest(manifest: dict) -> WeightManifest:
-    model_id = manifest.get("model_id", "model")
-    version = manifest.get("version", "0")
-    files: list[FileChunk] = []
-    for tensor in manifest.get("tensors", []):
-        for shard in tensor.get("shards", []):
-            uri = str(shard.get("uri", ""))
-            path = uri
-            if uri.startswith("file://"):
-                path = uri[len("file://") :]
-            files.append(
-                file_chunk(
-                    path=path,
-                    offset=0,
-                    length=int(shard.get("bytes", 0)),
-                    sha256=str(shard.get("hash", "")),
-                )
-            )
-    return WeightManifest(model_id=model_id, version=version, files=files)
+    ops = bucket_ops(buckets)
+
+    window = SwapWindow(t_start_ns=start_ns, t_deadline_ns=deadline_ns)
+    swap = swap_plan(plan_id, prev_manifest, next_manifest, ops, window=window)
+    reverse = None
+    if restore is not None:
+        reverse_ops = swap_ops(restore)
+        if staging is not None:
+            reverse_ops = staging.stage_ops(reverse_ops)
+        reverse = swap_plan(f"rollback-{prev_manifest.version}", next_manifest, prev_manifest, reverse_ops, window=SwapWindow(0, rollback_budget_ns))
+
+    stats = bucket_summary(buckets)
+    if lean:
+        buckets = []
+    return SwapPlanResult(plan=swap, prev_manifest=prev_manifest, next_manifest=next_manifest, buckets=buckets, bucket_stats=stats, rollback=reverse)
 
 
 def bucket_summary(buckets: Iterable[dict]) -> list[dict[str, int]]:
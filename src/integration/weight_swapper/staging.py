@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Optional
+
+from bstack_apis import SwapPlan, TransferKind, TransferOp
+
+STAGING_SCHEME = "host://staging"
+
+
+@dataclass
+class _Entry:
+    buffer: Optional[mmap.mmap]
+    length: int
+    backing: Optional[Path] = None
+
+
+class HostStagingCache:
+    """LRU host-memory cache of checkpoint chunks, bounded by `budget_bytes`.
+
+    Each chunk lives in its own mmap: anonymous by default, or backed by a file under `directory`
+    (e.g. a tmpfs or hugetlbfs mount) so the staged bytes stay outside the Python heap. Keys are
+    (path, offset, length) of the chunk on storage.
+
+    A chunk is pinned while any view returned by `get` (or derived from one) is alive: eviction
+    skips it, and `discard`/`clear` raise BufferError rather than unmapping memory under a reader.
+    """
+
+    def __init__(self, budget_bytes: int, *, directory: Optional[Path | str] = None) -> None:
+        if budget_bytes <= 0:
+            raise ValueError("budget_bytes must be positive")
+        self.budget_bytes = budget_bytes
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[tuple[str, int, int], _Entry] = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.staged = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple[str, int, int]) -> bool:
+        return key in self._entries
+
+    def stage(self, path: str, offset: int, length: int) -> bool:
+        """Copy `length` bytes at `offset` of `path` into the cache, evicting LRU entries to fit.
+
+        Returns False when the chunk alone exceeds the budget, or when the room it needs is held by
+        pinned chunks; nothing is staged or evicted in either case.
+        """
+
+        key = (path, offset, length)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return True
+        if length > self.budget_bytes:
+            return False
+        victims = self._victims(self.used_bytes + length - self.budget_bytes)
+        if victims is None:
+            return False
+        for victim in victims:
+            self._evict(victim)
+        entry = self._allocate(length)
+        if length:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                read = fh.readinto(memoryview(entry.buffer))
+            if read != length:
+                self._release(entry)
+                raise ValueError(f"short read staging {path}: {read} of {length} bytes at offset {offset}")
+        self._entries[key] = entry
+        self.used_bytes += length
+        self.staged += 1
+        return True
+
+    def get(self, path: str, offset: int, length: int) -> Optional[memoryview]:
+        entry = self._entries.get((path, offset, length))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((path, offset, length))
+        self.hits += 1
+        return memoryview(entry.buffer) if entry.buffer is not None else memoryview(b"")
+
+    def discard(self, path: str, offset: int, length: int) -> None:
+        """Drop one chunk; raises BufferError (keeping it) while a view from `get` is alive."""
+
+        key = (path, offset, length)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if not self._release(entry):
+            raise BufferError(f"staged chunk {key} is still referenced by a view from get()")
+        del self._entries[key]
+        self.used_bytes -= entry.length
+
+    def clear(self) -> None:
+        """Drop every unpinned chunk; raises BufferError afterwards if pinned chunks remain."""
+
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if self._release(entry):
+                del self._entries[key]
+                self.used_bytes -= entry.length
+        if self._entries:
+            raise BufferError(f"{len(self._entries)} staged chunks are still referenced by views from get()")
+
+    def stage_ops(self, ops: Iterable[TransferOp]) -> list[TransferOp]:
+        """Stage each STORAGE2H `file://` op's source and return it as an H2D read from the cache.
+
+        Chunks are staged in op order until the next one would push out a chunk staged by this
+        call; the remaining ops keep reading from storage.
+        """
+
+        out: list[TransferOp] = []
+        room = self.budget_bytes
+        for op in ops:
+            if op.kind is TransferKind.STORAGE2H and op.src.startswith("file://") and op.length <= room:
+                path = op.src[len("file://") :]
+                if self.stage(path, op.src_offset, op.length):
+                    room -= op.length
+                    out.append(replace(op, kind=TransferKind.H2D, src=STAGING_SCHEME + path))
+                    continue
+            out.append(op)
+        return out
+
+    def resolve(self, plan: SwapPlan) -> SwapPlan:
+        """`plan` with every staged read whose chunk has since been evicted pointed back at storage."""
+
+        ops = []
+        for op in plan.ops:
+            if op.kind is TransferKind.H2D and op.src.startswith(STAGING_SCHEME):
+                path = op.src[len(STAGING_SCHEME) :]
+                if (path, op.src_offset, op.length) not in self._entries:
+                    op = replace(op, kind=TransferKind.STORAGE2H, src="file://" + path)
+            ops.append(op)
+        return replace(plan, ops=ops)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "entries": float(len(self._entries)),
+            "used_bytes": float(self.used_bytes),
+            "budget_bytes": float(self.budget_bytes),
+            "staged": float(self.staged),
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "evictions": float(self.evictions),
+        }
+
+    def _victims(self, needed: int) -> Optional[list[tuple[str, int, int]]]:
+        """Unpinned keys, oldest first, that free at least `needed` bytes; None if they cannot."""
+
+        victims = []
+        for key, entry in self._entries.items():
+            if needed <= 0:
+                break
+            if not self._pinned(entry):
+                victims.append(key)
+                needed -= entry.length
+        return victims if needed <= 0 else None
+
+    def _evict(self, key: tuple[str, int, int]) -> None:
+        entry = self._entries.pop(key)
+        self._release(entry)
+        self.used_bytes -= entry.length
+        self.evictions += 1
+
+    def _allocate(self, length: int) -> _Entry:
+        if not length:
+            return _Entry(buffer=None, length=0)
+        if self.directory is None:
+            return _Entry(buffer=mmap.mmap(-1, length), length=length)
+        fd, name = tempfile.mkstemp(prefix="stage-", dir=self.directory)
+        try:
+            os.ftruncate(fd, length)
+            buffer = mmap.mmap(fd, length)
+        finally:
+            os.close(fd)
+        return _Entry(buffer=buffer, length=length, backing=Path(name))
+
+    @staticmethod
+    def _pinned(entry: _Entry) -> bool:
+        # A same-size resize is a no-op remap, but mmap refuses it while any buffer export is alive.
+        if entry.buffer is None:
+            return False
+        try:
+            entry.buffer.resize(entry.length)
+        except BufferError:
+            return True
+        return False
+
+    @staticmethod
+    def _release(entry: _Entry) -> bool:
+        """Unmap `entry` and remove its backing file; False (nothing released) while it has views."""
+
+        if entry.buffer is not None:
+            try:
+                entry.buffer.close()
+            except BufferError:
+                return False
+        if entry.backing is not None:
+            entry.backing.unlink(missing_ok=True)
+        return True
+
+
+__all__ = ["HostStagingCache", "STAGING_SCHEME"]
@@ -0,0 +1,21 @@
+"""Seeded, vectorized synthetic workloads at production scale: request streams and checkpoint trees."""
+
+from .synthetic import (
+    CheckpointPair,
+    CheckpointSpec,
+    WorkloadSpec,
+    generate_checkpoint_pair,
+    generate_requests,
+    iter_windows,
+    zipf_weights,
+)
+
+__all__ = [
+    "CheckpointPair",
+    "CheckpointSpec",
+    "WorkloadSpec",
+    "generate_checkpoint_pair",
+    "generate_requests",
+    "iter_windows",
+    "zipf_weights",
+]
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_HEADER_BYTES = 16
+
+
+@dataclass
+class WorkloadSpec:
+    """Shape of a synthetic request stream.
+
+    Each tenant owns every `tenants`-th prefix and draws from its share by Zipf rank with exponent
+    `prefix_zipf`. A prefix owns a slot of `max_context_tokens / page_tokens` consecutive KV pages and
+    a request reads the first `ceil(context_tokens / page_tokens)` of them, so requests on the same
+    prefix overlap on their leading pages. Context lengths are log-normal around
+    `context_tokens_median`. Arrival gaps are gamma-distributed with coefficient of variation
+    `burstiness` (1.0 is Poisson; larger values are burstier).
+    """
+
+    requests: int = 1_000_000
+    duration_ms: float = 60_000.0
+    tenants: int = 8
+    tenant_weights: Optional[Sequence[float]] = None
+    prefixes: int = 10_000
+    prefix_zipf: float = 1.1
+    context_tokens_median: float = 2048.0
+    context_sigma: float = 1.0
+    max_context_tokens: int = 32_768
+    page_tokens: int = 16
+    layers: int = 32
+    nodes: int = 1
+    burstiness: float = 1.0
+    seed: int = 0
+
+
+@dataclass
+class CheckpointSpec:
+    """Shape of a synthetic prev/next checkpoint pair.
+
+    Shards are sparse files of `shard_bytes` under `shards_per_dir`-wide directories. Each carries a
+    16-byte seeded header so no two shards hash alike. `changed_fraction` of all bytes (rounded to
+    whole `change_bytes` spans) differ in the next checkpoint. The spans go to randomly chosen shards,
+    one per shard until every shard has one, then as contiguous runs of several spans per shard.
+    """
+
+    shards: int = 100_000
+    shard_bytes: int = 64 * 1024
+    shards_per_dir: int = 1000
+    changed_fraction: float = 0.01
+    change_bytes: int = 4096
+    seed: int = 0
+
+
+@dataclass
+class CheckpointPair:
+    prev_dir: Path
+    next_dir: Path
+    shards: pd.DataFrame
+
+    def summary(self) -> dict[str, float]:
+        total = int(self.shards["bytes"].sum())
+        changed = int(self.shards["changed_bytes"].sum())
+        return {
+            "shards": float(len(self.shards)),
+            "bytes": float(total),
+            "changed_shards": float(self.shards["changed"].sum()),
+            "changed_bytes": float(changed),
+            "changed_fraction": changed / total if total else 0.0,
+        }
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = np.arange(1, n + 1, dtype=np.float64) ** -exponent
+    return weights / weights.sum()
+
+
+def generate_requests(spec: Optional[WorkloadSpec] = None) -> pd.DataFrame:
+    """Draw `spec.requests` requests, sorted by arrival, in the synthetic_requests column layout.
+
+    Columns: req_id, arrival_ms, tenant, node, layer, prefix_id, context_tokens, start_pid, end_pid.
+    """
+
+    spec = spec or WorkloadSpec()
+    if spec.prefixes < spec.tenants:
+        raise ValueError("need at least one prefix per tenant")
+    rng = np.random.default_rng(spec.seed)
+    n = spec.requests
+
+    tenant_p = np.full(spec.tenants, 1.0 / spec.tenants) if spec.tenant_weights is None else np.asarray(spec.tenant_weights, float)
+    if tenant_p.shape[0] != spec.tenants:
+        raise ValueError("tenant_weights must have one entry per tenant")
+    tenant = _sample(rng, tenant_p / tenant_p.sum(), n)
+
+    # Prefix p belongs to tenant p % tenants; tenant t's Zipf rank r maps to prefix r * tenants + t.
+    per_tenant = spec.prefixes // spec.tenants
+    rank = _sample(rng, zipf_weights(per_tenant, spec.prefix_zipf), n)
+    prefix = rank * spec.tenants + tenant
+
+    slot_pages = -(-spec.max_context_tokens // spec.page_tokens)
+    context = np.exp(rng.normal(np.log(spec.context_tokens_median), spec.context_sigma, n))
+    context = np.clip(np.rint(context), 1, spec.max_context_tokens).astype(np.int64)
+    pages = -(-context // spec.page_tokens)
+    start = prefix * slot_pages
+
+    cv = max(spec.burstiness, 1e-6)
+    gaps = rng.gamma(1.0 / cv**2, cv**2, n)
+    arrival = np.cumsum(gaps)
+    arrival *= spec.duration_ms / arrival[-1] if n else 0.0
+
+    node_names = [f"node-{i}" for i in range(spec.nodes)]
+    return pd.DataFrame(
+        {
+            "req_id": np.arange(n, dtype=np.int64),
+            "arrival_ms": arrival,
+            "tenant": tenant,
+            "node": pd.Categorical.from_codes(rng.integers(0, spec.nodes, n), categories=node_names),
+            "layer": rng.integers(0, spec.layers, n),
+            "prefix_id": prefix,
+            "context_tokens": context,
+            "start_pid": start,
+            "end_pid": start + pages - 1,
+        }
+    )
+
+
+def iter_windows(requests: pd.DataFrame, window_ms: float) -> Iterator[tuple[int, pd.DataFrame]]:
+    """Yield (window start in ms, requests arriving in that window) for an arrival-sorted frame."""
+
+    arrival = requests["arrival_ms"].to_numpy()
+    window = (arrival // window_ms).astype(np.int64)
+    bounds = np.flatnonzero(np.diff(window)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(requests)]):
+        if hi > lo:
+            yield int(window[lo] * window_ms), requests.iloc[lo:hi]
+
+
+def generate_checkpoint_pair(root: Path | str, spec: Optional[CheckpointSpec] = None) -> CheckpointPair:
+    """Write `root/prev` and `root/next` shard trees and return them with a per-shard table."""
+
+    spec = spec or CheckpointSpec()
+    if not 0.0 <= spec.changed_fraction <= 1.0:
+        raise ValueError("changed_fraction must be within [0, 1]")
+    root = Path(root)
+    rng = np.random.default_rng(spec.seed)
+    n = spec.shards
+    if spec.shard_bytes <= _HEADER_BYTES:
+        raise ValueError(f"shard_bytes must exceed the {_HEADER_BYTES}-byte header")
+    span = min(spec.change_bytes, spec.shard_bytes - _HEADER_BYTES)
+
+    header = rng.integers(0, 256, (n, _HEADER_BYTES), dtype=np.uint8)
+    spans = int(round(spec.changed_fraction * n * spec.shard_bytes / span))
+    per_shard = (spec.shard_bytes - _HEADER_BYTES) // span
+    if spans > n * per_shard:
+        raise ValueError(
+            f"changed_fraction {spec.changed_fraction} needs {spans} spans of {span} bytes but {n} shards hold at most {n * per_shard}"
+        )
+    # Spread the spans over as many shards as possible; a shard with k spans rewrites one run of k * span bytes.
+    changed_count = min(spans, n)
+    changed = np.zeros(n, dtype=bool)
+    changed[rng.choice(n, size=changed_count, replace=False)] = True
+    run = np.zeros(n, dtype=np.int64)
+    if changed_count:
+        counts = np.full(changed_count, spans // changed_count, dtype=np.int64)
+        counts[: spans % changed_count] += 1
+        run[changed] = counts * span
+    offset = np.where(changed, _HEADER_BYTES + (rng.random(n) * (spec.shard_bytes - _HEADER_BYTES - run + 1)).astype(np.int64), 0)
+    # Nonzero bytes over the zero-filled sparse body, so every byte in a run really differs.
+    payload = rng.integers(1, 256, int(run.sum()), dtype=np.uint8)
+    payload_start = np.cumsum(run) - run
+
+    rel = [f"dir_{i // spec.shards_per_dir:05d}/shard_{i:06d}.bin" for i in range(n)]
+    prev_dir, next_dir = root / "prev", root / "next"
+    for base in (prev_dir, next_dir):
+        for d in range(-(-n // spec.shards_per_dir)):
+            (base / f"dir_{d:05d}").mkdir(parents=True, exist_ok=True)
+
+    for i, name in enumerate(rel):
+        _write_sparse(prev_dir / name, header[i], spec.shard_bytes)
+        change = (int(offset[i]), payload[payload_start[i] : payload_start[i] + run[i]]) if changed[i] else None
+        _write_sparse(next_dir / name, header[i], spec.shard_bytes, change)
+
+    shards = pd.DataFrame(
+        {
+            "path": rel,
+            "bytes": np.full(n, spec.shard_bytes, dtype=np.int64),
+            "changed": changed,
+            "change_offset": offset,
+            "changed_bytes": run,
+        }
+    )
+    return CheckpointPair(prev_dir=prev_dir, next_dir=next_dir, shards=shards)
+
+
+def _sample(rng: np.random.Generator, p: np.ndarray, n: int) -> np.ndarray:
+    cdf = np.cumsum(p)
+    cdf[-1] = 1.0
+    return np.searchsorted(cdf, rng.random(n), side="right").astype(np.int64)
+
+
+def _write_sparse(path: Path, header: np.ndarray, size: int, change: Optional[tuple[int, np.ndarray]] = None) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, header.tobytes())
+        if change is not None:
+            offset, data = change
+            os.pwrite(fd, data.tobytes(), offset)
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+__all__ = [
+    "CheckpointPair",
+    "CheckpointSpec",
+    "WorkloadSpec",
+    "generate_checkpoint_pair",
+    "generate_requests",
+    "iter_windows",
+    "zipf_weights",
+]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from integration.kv_data_plane.adaptive import AdaptiveWindowConfig, WindowController
+
+
+def _replay(controller: WindowController, cost_ms_per_request: np.ndarray, seed: int = 0) -> None:
+    """Drive the controller with a recorded load trace: planning cost per request, noisy, plus a
+    prefetch timeliness that degrades linearly with window length."""
+
+    rng = np.random.default_rng(seed)
+    for cost in cost_ms_per_request:
+        plan_ms = cost * controller.batch * rng.uniform(0.95, 1.05)
+        timeliness = float(np.clip(1.0 - 0.002 * controller.window_ms, 0.0, 1.0))
+        controller.observe(plan_ms, timeliness)
+
+
+def test_controller_converges_and_recovers_from_load_spike() -> None:
+    config = AdaptiveWindowConfig(latency_slo_ms=10.0, timeliness_target=0.95, min_batch=16, max_batch=50_000)
+    controller = WindowController(config, window_ms=100.0, batch=200)
+    trace = np.concatenate([np.full(40, 0.01), np.full(40, 0.04), np.full(40, 0.01)])
+    _replay(controller, trace)
+    frame = controller.decisions_frame()
+
+    def settled(lo: int, hi: int):
+        return frame.iloc[lo:hi]
+
+    for lo, hi, cost in ((30, 40, 0.01), (70, 80, 0.04), (110, 120, 0.01)):
+        window = settled(lo, hi)
+        assert window["plan_ms"].between(8.0, 12.0).all(), (lo, window["plan_ms"].tolist())
+        assert (window["timeliness"] >= config.timeliness_target).all()
+        assert abs(window["batch"].mean() - 10.0 / cost) / (10.0 / cost) < 0.1
+    spike = frame.iloc[40:45]
+    assert spike["plan_ms"].max() > config.latency_slo_ms
+    assert "latency_over_slo" in ",".join(spike["reason"])
+    assert frame["next_window_ms"].between(config.min_window_ms, config.max_window_ms).all()
+    assert frame["next_batch"].between(config.min_batch, config.max_batch).all()
+    metrics = controller.metrics()
+    assert metrics["windows"] == 120.0 and metrics["adjustments"] > 0
+
+
+def test_window_never_shrinks_below_planning_time() -> None:
+    config = AdaptiveWindowConfig(latency_slo_ms=50.0, timeliness_target=0.999, max_window_utilization=0.5, min_batch=1000)
+    controller = WindowController(config, window_ms=40.0, batch=1000)
+    for _ in range(20):
+        decision = controller.observe(plan_ms=controller.batch * 0.05, timeliness=0.5)
+        assert decision.next_window_ms >= decision.next_batch * 0.05 / 0.5 - 1e-6
+
+
+def test_adaptive_planner_applies_controller_window() -> None:
+    pytest.importorskip("bodocache")
+    from integration.kv_data_plane import AdaptiveCachePlanner, synthetic_window_inputs
+
+    seen = []
+
+    def source(cfg, batch):
+        seen.append((cfg.window_ms, batch))
+        return synthetic_window_inputs(cfg, request_count=batch)
+
+    planner = AdaptiveCachePlanner(WindowController(window_ms=30.0, batch=64), source=source)
+    for step in range(3):
+        result, decision = planner.step(now_ms=1_000 + step * 30)
+        assert decision.window == step
+        assert result.plan.plan_id
+    assert seen[0] == (30, 64)
+    assert seen[1] == (round(planner.controller.decisions[0].next_window_ms), planner.controller.decisions[0].next_batch)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from bstack_apis import TransferKind, TransferOp, cache_plan, swap_plan, swap_window, weight_manifest
+from integration.co_scheduler import DEFAULT_ROUTES, CoScheduleConfig, co_schedule
+
+
+def _plans(deadline_ms: int):
+    cache = cache_plan("c", [TransferOp(kind=TransferKind.H2D, src="tier://n/tier0", dst="tier://n/tier1", length=1 << 20) for _ in range(100)])
+    manifest = weight_manifest("m", "v", [])
+    swap_ops = [TransferOp(kind=TransferKind.STORAGE2H, src="file://w", dst="device://bucket/0", length=16 << 20) for _ in range(20)]
+    swap = swap_plan("s", manifest, manifest, swap_ops, window=swap_window(0, deadline_ms * 1_000_000))
+    return cache, swap
+
+
+def _config(**kwargs) -> CoScheduleConfig:
+    routes = dict(DEFAULT_ROUTES)
+    routes[TransferKind.STORAGE2H] = ("pcie",)
+    return CoScheduleConfig(link_gbps={"pcie": 10.0, "nvlink": 50.0}, routes=routes, **kwargs)
+
+
+def test_prefetch_beats_uncoordinated_split_while_swap_meets_deadline() -> None:
+    cache, swap = _plans(deadline_ms=100)
+    schedule = co_schedule(cache, swap, _config(prefetch_share=0.3))
+    assert schedule.report["swap"]["deadline_met"] == 1.0
+    assert schedule.report["cache"]["scheduled_makespan_ms"] < schedule.report["cache"]["uncoordinated_makespan_ms"]
+    assert set(schedule.ops["plan"]) == {"cache", "swap"}
+    assert (schedule.ops["finish_slice"] >= 0).all()
+    moved = schedule.slices.groupby("link")[["cache_bytes", "swap_bytes"]].sum()
+    assert moved.loc["pcie", "cache_bytes"] == 100 << 20
+    assert moved.loc["pcie", "swap_bytes"] == 20 * (16 << 20)
+    assert ((schedule.slices["cache_bytes"] + schedule.slices["swap_bytes"]) <= schedule.slices["capacity_bytes"]).all()
+
+
+def test_prefetch_share_is_reserved_under_a_tight_deadline() -> None:
+    cache, swap = _plans(deadline_ms=20)
+    schedule = co_schedule(cache, swap, _config(prefetch_share=0.4))
+    first = schedule.slices[schedule.slices["slice"] == 0].iloc[0]
+    assert first["cache_bytes"] >= 0.4 * first["capacity_bytes"] - 1
+    assert schedule.report["swap"]["deadline_met"] == 0.0
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from integration.kv_data_plane import HeatStore
+from integration.kv_data_plane.heat import HEAT_KEYS, request_page_keys
+
+
+def _reference(batches, half_life_ms, now_ms):
+    heat: dict[tuple, float] = {}
+    last: dict[tuple, int] = {}
+    for t, keys in batches:
+        for key in map(tuple, keys):
+            if key in heat:
+                heat[key] *= 2.0 ** (-(t - last[key]) / half_life_ms)
+            heat[key] = heat.get(key, 0.0) + 1.0
+            last[key] = t
+    return {key: value * 2.0 ** (-(now_ms - last[key]) / half_life_ms) for key, value in heat.items()}
+
+
+def test_ewma_updates_match_reference_and_grow_index() -> None:
+    rng = np.random.default_rng(0)
+    store = HeatStore(half_life_ms=100.0, capacity=16)
+    batches = [(t * 50, rng.integers(0, 40, size=(300, 4))) for t in range(6)]
+    for t, keys in batches:
+        store.update(keys, now_ms=t)
+    expected = _reference(batches, 100.0, 400)
+    frame = store.heat_frame(now_ms=400)
+    assert len(frame) == len(expected) == len(store)
+    got = {tuple(row[:4]): row[4] for row in frame[[*HEAT_KEYS, "decay_hits"]].itertuples(index=False)}
+    assert got.keys() == expected.keys()
+    assert np.allclose([got[k] for k in expected], list(expected.values()))
+
+    top = store.top_k(5, now_ms=400)
+    assert top["decay_hits"].is_monotonic_decreasing
+    assert top["decay_hits"].iloc[0] == pytest.approx(max(expected.values()))
+    assert store.heat_at(np.array([[99, 99, 99, 99]]), now_ms=400)[0] == 0.0
+
+
+def test_compaction_drops_cold_keys_and_keeps_lookup() -> None:
+    store = HeatStore(half_life_ms=10.0)
+    store.update(np.array([[0, 0, 0, page] for page in range(100)]), now_ms=0)
+    store.update(np.array([[0, 0, 0, 7], [1, 2, 3, 4]]), now_ms=200)
+    assert store.compact(now_ms=200, min_heat=0.5) == 99
+    assert len(store) == 2
+    assert store.heat_at(np.array([[0, 0, 0, 7], [1, 2, 3, 4], [0, 0, 0, 8]]), now_ms=200).tolist() == pytest.approx([1.0, 1.0, 0.0])
+
+
+def test_mmap_store_survives_restart(tmp_path) -> None:
+    keys = np.array([[1, 1, 0, page] for page in range(5000)])
+    store = HeatStore(half_life_ms=1000.0, capacity=64, path=tmp_path / "heat")
+    store.update(keys, now_ms=0)
+    store.update(keys[:10], now_ms=500)
+    before = store.heat_frame(now_ms=1000)
+    first_heat = store.heat_at(keys[:1], now_ms=1000)[0]
+    store.flush()
+    del store
+
+    reopened = HeatStore(path=tmp_path / "heat")
+    assert reopened.half_life_ms == 1000.0
+    pd.testing.assert_frame_equal(reopened.heat_frame(now_ms=1000), before)
+    reopened.update(keys[:1], now_ms=1000)
+    assert reopened.heat_at(keys[:1], now_ms=1000)[0] == pytest.approx(first_heat + 1.0)
+
+
+def test_request_page_keys_expand_page_ranges() -> None:
+    req = pd.DataFrame({"tenant": [0, 1], "pcluster": [3, 4], "layer": [2, 5], "start_pid": [10, 20], "end_pid": [12, 20]})
+    assert request_page_keys(req).tolist() == [[0, 3, 2, 10], [0, 3, 2, 11], [0, 3, 2, 12], [1, 4, 5, 20]]
+
+
+def test_cache_plan_uses_heat_history() -> None:
+    pytest.importorskip("bodocache")
+    from integration.kv_data_plane import build_cache_plan, load_runtime_config
+
+    cfg = load_runtime_config()
+    store = HeatStore(half_life_ms=1_000.0)
+    build_cache_plan(now_ms=1_000, cfg=cfg, heat_store=store)
+    first = len(store)
+    build_cache_plan(now_ms=1_020, cfg=cfg, heat_store=store)
+    assert store.updates == 2 and len(store) == first
+    assert store.top_k(1, now_ms=1_020)["decay_hits"].iloc[0] > 1.0
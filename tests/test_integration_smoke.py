@@ -9,6 +9,8 @@ def test_integration_modules_importable() -> None:
     for name in (
         "integration.data_pipeline.datajax_bridge",
         "integration.kv_data_plane.runner",
+        "integration.runtime_waves.submitter",
+        "integration.plan_service.server",
         "integration.weight_swapper.runner",
         "integration.examples.run_stack",
     ):
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("bodocache")
+
+from integration.kv_data_plane import PlanMemo, build_cache_plan, compact_frame, load_runtime_config, simulate_cache_plan, synthetic_window_inputs  # noqa: E402
+
+
+def test_compact_frame_narrows_without_changing_values() -> None:
+    df = pd.DataFrame(
+        {
+            "small": np.arange(100, dtype=np.int64),
+            "big": np.arange(100, dtype=np.int64) * 10_000_000_000,
+            "exact": np.linspace(0, 1, 100).astype(np.float32).astype(np.float64),
+            "inexact": np.linspace(0, 1, 100) / 3,
+            "node": ["node-0", "node-1"] * 50,
+            "unique": [f"op-{i}" for i in range(100)],
+            "flag": [True, False] * 50,
+        }
+    )
+    out = compact_frame(df)
+    assert out["small"].dtype == np.int8 and out["big"].dtype == np.int64
+    assert out["exact"].dtype == np.float32 and out["inexact"].dtype == np.float64
+    assert isinstance(out["node"].dtype, pd.CategoricalDtype)
+    assert not isinstance(out["unique"].dtype, pd.CategoricalDtype)
+    assert out["flag"].dtype == bool
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+    assert out.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+
+
+def test_lean_result_keeps_identical_ir_only() -> None:
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=500)
+    full = build_cache_plan(now_ms=1_000, window_id="w", cfg=cfg, inputs=inputs)
+    lean = build_cache_plan(now_ms=1_000, window_id="w", cfg=cfg, inputs=inputs, lean=True)
+    compact = build_cache_plan(now_ms=1_000, window_id="w", cfg=cfg, inputs=inputs, compact_frames=True)
+
+    assert lean.plan.to_dict() == full.plan.to_dict() == compact.plan.to_dict()
+    assert lean.lean and lean.plan_df is None and lean.tiers_df is None
+    with pytest.raises(ValueError):
+        simulate_cache_plan(lean)
+    pd.testing.assert_frame_equal(compact.plan_df.astype(full.plan_df.dtypes.to_dict()), full.plan_df)
+    assert simulate_cache_plan(compact) == pytest.approx(simulate_cache_plan(full))
+
+
+def test_memo_keys_on_retention_mode() -> None:
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=200)
+    memo = PlanMemo()
+    lean = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, memo=memo, lean=True)
+    full = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, memo=memo)
+    assert lean.lean and not full.memo_hit and not full.lean
+    simulate_cache_plan(full)
+    again = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, memo=memo)
+    assert again.memo_hit and not again.lean
+    assert simulate_cache_plan(again) == pytest.approx(simulate_cache_plan(full))
+    assert build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, memo=memo, lean=True).memo_hit
+
+
+def _retained_bytes(**kwargs) -> int:
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=5_000)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, **kwargs)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    assert result.plan.ops
+    return retained
+
+
+def test_lean_result_retains_less_memory() -> None:
+    assert _retained_bytes(lean=True) < _retained_bytes()
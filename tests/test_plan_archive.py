@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from bstack_apis import (
+    FileChunk,
+    KvPageRef,
+    PlanArchiveReader,
+    PlanArchiveWriter,
+    TransferKind,
+    TransferOp,
+    cache_plan,
+    decode_plan,
+    encode_plan,
+    swap_plan,
+    swap_window,
+    weight_manifest,
+)
+
+
+def _cache(plan_id: str, base: int = 0):
+    ops = [
+        TransferOp(
+            kind=TransferKind.H2D if i % 3 else TransferKind.D2H,
+            src="tier://node-0/tier0",
+            dst=f"tier://node-0/tier{1 + i % 2}",
+            length=4 * 262144,
+            src_offset=(base + 4 * i) * 262144,
+            dst_offset=(base + 4 * i) * 262144,
+            kv_refs=[KvPageRef(tensor="kv", page=base + 4 * i + j, head=0, layer=i % 4) for j in range(4)] + [KvPageRef("kv", 7, 1, 0)],
+            note=None if i == 5 else f"cluster={i % 3} fanout=1 overlap=1",
+        )
+        for i in range(50)
+    ]
+    prefetch = [KvPageRef("kv", p, 0, 1) for p in (3, 4, 5, 9)]
+    return cache_plan(plan_id, ops, prefetch=prefetch, evict=[KvPageRef("kv", 100, 0, 2)])
+
+
+def _swap(plan_id: str):
+    prev = weight_manifest("m", "v0", [FileChunk(f"/ckpt/a/s{i}.bin", 0, 1 << 20, f"{i:064x}") for i in range(20)])
+    nxt = weight_manifest("m", "v1", [FileChunk(f"/ckpt/b/s{i}.bin", 0, 1 << 20, f"{i + 1:064x}") for i in range(20)])
+    ops = [TransferOp(TransferKind.STORAGE2H, f"file:///ckpt/b/s{i}.bin", "device://bucket/0", 1 << 20, note=f"tensor=t{i}") for i in range(20)]
+    return swap_plan(plan_id, prev, nxt, ops, window=swap_window(5_000_000_000, 9_000_000_000))
+
+
+def test_encode_round_trips_both_plan_kinds() -> None:
+    for plan in (_cache("w0"), _swap("s0"), cache_plan("empty", [])):
+        kind, payload = encode_plan(plan)
+        assert decode_plan(kind, payload) == plan
+    assert len(encode_plan(_cache("w0"))[1]) < len(_cache("w0").to_json(indent=None)) // 4
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma", "none"])
+def test_archive_rolls_files_and_reads_by_id_and_time(tmp_path: Path, codec: str) -> None:
+    with PlanArchiveWriter(tmp_path, codec=codec, max_file_bytes=2048) as writer:
+        for i in range(12):
+            writer.append(_cache(f"w{i}", base=i * 1000), ts_ms=1000 * i)
+        writer.append(_swap("s0"))
+        with pytest.raises(ValueError):
+            writer.append(_cache("unstamped"))
+    assert len(list(tmp_path.glob("plans-*.bpa"))) > 1
+
+    reader = PlanArchiveReader(tmp_path)
+    assert len(reader) == 13 and "s0" in reader
+    assert reader.get("w7") == _cache("w7", base=7000)
+    assert reader.get("s0") == _swap("s0")
+    assert [e.plan_id for e in reader.between(3000, 6000)] == ["w3", "w4", "w5", "s0"]
+    assert [plan.plan_id for _, plan in reader.iter_range(10_000, 10_001)] == ["w10"]
+    assert reader.columns("w2").nbytes == 50 * 4 * 262144
+
+
+def test_reader_skips_torn_tail_and_refreshes(tmp_path: Path) -> None:
+    writer = PlanArchiveWriter(tmp_path)
+    writer.append(_cache("w0"), ts_ms=0)
+    entry = writer.append(_cache("w1"), ts_ms=1)
+    writer.close()
+    data = entry.path.read_bytes()
+    entry.path.write_bytes(data[:-10])
+
+    reader = PlanArchiveReader(tmp_path)
+    assert reader.plan_ids() == ["w0"]
+    entry.path.write_bytes(data)
+    assert reader.refresh() == 1 and reader.get("w1") == _cache("w1")
+
+    with PlanArchiveWriter(tmp_path) as more:
+        more.append(_cache("w1", base=5), ts_ms=2)
+    assert reader.refresh() == 1
+    assert reader.get("w1") == _cache("w1", base=5)
+    assert len(list(tmp_path.glob("plans-*.bpa"))) == 2
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from integration.kv_data_plane import PlanMemo
+from integration.kv_data_plane.memo import plan_key
+
+
+def test_plan_key_ignores_row_and_column_order() -> None:
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    shuffled = df.iloc[[2, 0, 1]][["b", "a"]].reset_index(drop=True)
+    assert plan_key([df], ("cfg",)) == plan_key([shuffled], ("cfg",))
+    assert plan_key([df], ("cfg",)) != plan_key([df], ("other",))
+    assert plan_key([df], ("cfg",)) != plan_key([df.assign(a=[1, 2, 4])], ("cfg",))
+
+
+def test_memo_lru_evicts_oldest_and_counts() -> None:
+    memo: PlanMemo[int] = PlanMemo(capacity=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1
+    memo.put("c", 3)
+    assert memo.get("b") is None
+    assert memo.stats()["evictions"] == 1.0
+    assert (memo.hits, memo.misses) == (1, 1)
+
+
+def test_build_cache_plan_reuses_memoized_plan_with_fresh_id() -> None:
+    pytest.importorskip("bodocache")
+    from integration.kv_data_plane import WindowInputs, build_cache_plan, load_runtime_config, synthetic_window_inputs
+
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=64)
+    memo = PlanMemo()
+    first = build_cache_plan(cfg=cfg, inputs=inputs, window_id="w1", memo=memo)
+    reordered = WindowInputs(inputs.req.iloc[::-1], inputs.heat, inputs.tiers, inputs.tenant_caps, inputs.layer_lat)
+    second = build_cache_plan(cfg=cfg, inputs=reordered, window_id="w2", memo=memo)
+    assert not first.memo_hit and second.memo_hit
+    assert second.plan.plan_id == "w2" and first.plan.plan_id == "w1"
+    assert second.plan.ops == first.plan.ops
+    assert memo.stats()["hits"] == 1.0
+
+
+def test_memoized_plans_are_copied_per_call() -> None:
+    pytest.importorskip("bodocache")
+    from integration.kv_data_plane import WindowInputs, build_cache_plan, load_runtime_config, synthetic_window_inputs
+
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=64)
+    memo = PlanMemo()
+    first = build_cache_plan(cfg=cfg, inputs=inputs, window_id="w1", memo=memo)
+    expected = build_cache_plan(cfg=cfg, inputs=inputs, window_id="w2").plan.ops
+    first.plan.ops[0].length += 1
+    first.plan.ops[0].kv_refs[0].page = -1
+    second = build_cache_plan(cfg=cfg, inputs=inputs, window_id="w2", memo=memo)
+    assert second.memo_hit and second.plan.ops == expected
+    second.plan.ops.clear()
+    assert build_cache_plan(cfg=cfg, inputs=inputs, window_id="w3", memo=memo).plan.ops == expected
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("bodocache")
+
+from integration.kv_data_plane import PipelinedPlanner, PlanWindow, load_runtime_config, run_serial, synthetic_window_inputs  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def windows() -> list[PlanWindow]:
+    cfg = load_runtime_config()
+    return [PlanWindow(f"w{i}", 1_000 + 20 * i, synthetic_window_inputs(cfg, request_count=300 + 10 * i)) for i in range(8)]
+
+
+def _collect():
+    out: list[tuple[str, str]] = []
+    return out, lambda plan_id, payload: out.append((plan_id, payload))
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_pipelined_output_matches_serial(windows, use_processes) -> None:
+    serial, serial_sink = _collect()
+    run_serial(windows, serial_sink)
+    piped, piped_sink = _collect()
+    stats = PipelinedPlanner(piped_sink, workers=2, queue_depth=2, use_processes=use_processes).run(windows)
+    assert piped == serial
+    assert stats.emitted == stats.planned == len(windows)
+    assert stats.max_queue_depth <= 2
+
+
+def test_backpressure_blocks_planner_on_slow_sink(windows) -> None:
+    release = threading.Event()
+    out, collect = _collect()
+
+    def slow_sink(plan_id: str, payload: str) -> None:
+        release.wait(5)
+        collect(plan_id, payload)
+
+    planner = PipelinedPlanner(slow_sink, workers=1, queue_depth=2)
+    done = threading.Thread(target=lambda: planner.run(windows))
+    done.start()
+    time.sleep(0.5)
+    assert not out and done.is_alive()
+    release.set()
+    done.join(10)
+    assert [plan_id for plan_id, _ in out] == [w.window_id for w in windows]
+
+
+def test_drop_stale_sheds_oldest_queued_windows(windows) -> None:
+    out, collect = _collect()
+
+    def slow_sink(plan_id: str, payload: str) -> None:
+        time.sleep(0.05)
+        collect(plan_id, payload)
+
+    stats = PipelinedPlanner(slow_sink, workers=1, queue_depth=1, drop_stale=True).run(windows)
+    assert stats.dropped > 0 and stats.emitted + stats.dropped == len(windows)
+    assert [plan_id for plan_id, _ in out] == stats.emitted_ids
+    assert stats.emitted_ids[-1] == windows[-1].window_id
+    assert stats.emitted_ids == sorted(stats.emitted_ids, key=lambda w: int(w[1:]))
+
+
+def test_lagging_windows_are_skipped_before_planning(windows) -> None:
+    out, collect = _collect()
+    stats = PipelinedPlanner(collect, max_lag_ms=50, clock=lambda: 1_100.0).run(windows)
+    assert stats.skipped_stale == 3
+    assert [plan_id for plan_id, _ in out] == ["w3", "w4", "w5", "w6", "w7"]
+
+
+def test_sink_errors_surface_on_the_planning_thread(windows) -> None:
+    def broken(plan_id: str, payload: str) -> None:
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        PipelinedPlanner(broken).run(windows)
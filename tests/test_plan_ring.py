@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import struct
+import time
+
+import pytest
+
+from bstack_apis import (
+    CachePlan,
+    PlanRecordKind,
+    PlanRingReader,
+    PlanRingWriter,
+    SwapPlan,
+    TransferKind,
+    TransferOp,
+    cache_plan,
+    swap_plan,
+    swap_window,
+    weight_manifest,
+)
+
+
+def _cache(plan_id: str) -> CachePlan:
+    return cache_plan(plan_id, [TransferOp(kind=TransferKind.H2D, src="tier://n/tier0", dst="tier://n/tier1", length=4096)])
+
+
+def _consume(name: str, reader_id: int, count: int, out: mp.Queue) -> None:
+    with PlanRingReader(name, reader_id, from_start=True) as reader:
+        ids = []
+        while len(ids) < count:
+            record = reader.read(timeout=10)
+            assert record is not None
+            ids.append(record.plan.plan_id)
+    out.put(ids)
+
+
+def test_ring_round_trip_both_plan_kinds() -> None:
+    with PlanRingWriter(slot_count=4, slot_size=4096) as writer:
+        reader = PlanRingReader(writer.name, 0)
+        writer.publish(_cache("w1"))
+        manifest = weight_manifest("m", "v0", [])
+        writer.publish(swap_plan("s1", manifest, manifest, [], window=swap_window(0, 10)))
+        first = reader.read(timeout=1)
+        second = reader.read(timeout=1)
+        assert first is not None and second is not None
+        assert (first.seq, first.kind, first.plan.plan_id) == (1, PlanRecordKind.CACHE_PLAN, "w1")
+        assert first.plan.ops[0].kind == TransferKind.H2D
+        assert isinstance(second.plan, SwapPlan) and second.plan.window.t_deadline_ns == 10
+        assert reader.poll() is None
+        reader.close()
+
+
+def test_ring_applies_backpressure_to_slowest_reader() -> None:
+    with PlanRingWriter(slot_count=2, slot_size=4096) as writer:
+        reader = PlanRingReader(writer.name, 0)
+        writer.publish(_cache("a"))
+        writer.publish(_cache("b"))
+        with pytest.raises(TimeoutError):
+            writer.publish(_cache("c"), timeout=0.01)
+        assert reader.read(timeout=1).plan.plan_id == "a"
+        assert writer.publish(_cache("c"), timeout=0.01) == 3
+        reader.close()
+
+
+def test_writer_detaches_stalled_reader() -> None:
+    with PlanRingWriter(slot_count=2, slot_size=4096, reader_timeout=0.05) as writer:
+        stalled = PlanRingReader(writer.name, 0)
+        live = PlanRingReader(writer.name, 1)
+        for name in "abc":
+            writer.publish(_cache(name), timeout=5)
+            assert live.read(timeout=1).plan.plan_id == name
+        assert writer.detached == 1 and set(writer.reader_seqs()) == {1}
+        writer.publish(_cache("d"), timeout=1)
+        with pytest.raises(RuntimeError, match="detached"):
+            stalled.poll()
+        assert set(writer.reader_seqs()) == {1}
+        stalled.reattach()
+        assert stalled.poll() is None
+        writer.publish(_cache("e"), timeout=1)
+        assert stalled.poll().plan.plan_id == "e"
+        stalled.close()
+        live.close()
+
+
+def test_detach_reader_unblocks_writer() -> None:
+    with PlanRingWriter(slot_count=1, slot_size=4096) as writer:
+        reader = PlanRingReader(writer.name, 0)
+        writer.publish(_cache("a"))
+        with pytest.raises(TimeoutError):
+            writer.publish(_cache("b"), timeout=0.01)
+        writer.detach_reader(0)
+        assert writer.publish(_cache("b"), timeout=0.01) == 2
+        reader.close()
+
+
+def test_reader_rejects_slot_length_past_slot_end() -> None:
+    with PlanRingWriter(slot_count=2, slot_size=4096) as writer:
+        reader = PlanRingReader(writer.name, 0)
+        writer.publish(_cache("a"))
+        offset = writer._view.slot_offset(1)
+        struct.pack_into("<I", writer._view.buf, offset + 12, 4096)
+        with pytest.raises(RuntimeError, match="overrun"):
+            reader.poll()
+        reader.close()
+
+
+def test_ring_rejects_oversized_record() -> None:
+    with PlanRingWriter(slot_count=2, slot_size=64) as writer:
+        with pytest.raises(ValueError):
+            writer.publish(_cache("too-big"))
+
+
+def test_ring_fans_out_to_consumer_processes() -> None:
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    with PlanRingWriter(slot_count=4, slot_size=4096, max_readers=2) as writer:
+        procs = [ctx.Process(target=_consume, args=(writer.name, rid, 10, out)) for rid in range(2)]
+        for proc in procs:
+            proc.start()
+        deadline = time.monotonic() + 30
+        while len(writer.reader_seqs()) < 2:
+            assert time.monotonic() < deadline, "consumers never attached"
+        for i in range(10):
+            writer.publish(_cache(f"w{i}"), timeout=10)
+        results = [out.get(timeout=30) for _ in procs]
+        for proc in procs:
+            proc.join(timeout=30)
+    assert results == [[f"w{i}" for i in range(10)]] * 2
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("grpc")
+
+from bstack_apis import (  # noqa: E402
+    CachePlan,
+    KvPageRef,
+    TransferKind,
+    TransferOp,
+    cache_plan,
+    cache_plan_from_proto,
+    cache_plan_to_proto,
+    file_chunk,
+    swap_plan,
+    swap_plan_from_proto,
+    swap_plan_to_proto,
+    swap_window,
+    weight_manifest,
+)
+from integration.plan_service.server import load_grpc_stubs  # noqa: E402
+
+try:
+    load_grpc_stubs()
+except RuntimeError:  # pragma: no cover - depends on `make codegen`
+    pytest.skip("protobuf bindings not generated", allow_module_level=True)
+
+from integration.plan_service.executor import StandInExecutor  # noqa: E402
+from integration.plan_service.server import serve  # noqa: E402
+
+
+def _planner(plan_id: str, now_ms: int, request_count: int) -> CachePlan:
+    refs = [KvPageRef(tensor="kv", page=p, head=0, layer=1) for p in range(request_count)]
+    op = TransferOp(kind=TransferKind.H2D, src="tier://n/tier0", dst="tier://n/tier1", length=4096, kv_refs=refs, note=f"t={now_ms}")
+    return cache_plan(plan_id, [op], prefetch=refs[:1])
+
+
+def test_proto_round_trip_matches_ir() -> None:
+    plan = _planner("w", 7, 3)
+    assert cache_plan_from_proto(cache_plan_to_proto(plan)) == plan
+    manifest = weight_manifest("m", "v1", [file_chunk("a.bin", 0, 16, "ab")])
+    swap = swap_plan("s", manifest, manifest, [TransferOp(kind=TransferKind.STORAGE2H, src="a", dst="b", length=16)], window=swap_window(1, 2))
+    assert swap_plan_from_proto(swap_plan_to_proto(swap)) == swap
+
+
+def test_stand_in_executor_streams_batched_windows() -> None:
+    server, port = serve("127.0.0.1:0", cache_planner=_planner)
+    try:
+        with StandInExecutor(f"127.0.0.1:{port}") as executor:
+            executor.wait_ready()
+            streamed = executor.stream(windows=10, batch_size=4, request_count=2)
+            unary = executor.submit(calls=2, windows=3, request_count=2)
+    finally:
+        server.stop(grace=None)
+    assert (streamed.batches, streamed.plans, streamed.ops) == (3, 10, 10)
+    assert (unary.batches, unary.plans) == (2, 6)
+    assert streamed.to_dict()["p50_delivery_us"] >= 0
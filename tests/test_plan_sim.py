@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+
+from bstack_apis import PlanColumns, TransferKind, TransferOp, swap_plan, swap_window, weight_manifest
+from integration.plan_sim import SimConfig, simulate_transfers
+
+
+def _reference_finish(ops: list[TransferOp], config: SimConfig, release: list[int]) -> list[int]:
+    bandwidth = dict(config.bandwidth_gbps)
+    lanes: dict[tuple[TransferKind, int], int] = {}
+    seen: dict[TransferKind, int] = {}
+    out = []
+    for op, ready in zip(ops, release):
+        streams = config.streams if isinstance(config.streams, int) else config.streams[op.kind]
+        lane = (op.kind, seen.get(op.kind, 0) % streams)
+        seen[op.kind] = seen.get(op.kind, 0) + 1
+        duration = int(np.ceil(op.length / (bandwidth[op.kind] / streams))) + int(config.op_overhead_us * 1e3)
+        lanes[lane] = max(lanes.get(lane, 0), ready) + duration
+        out.append(lanes[lane])
+    return out
+
+
+def test_simulator_matches_sequential_reference() -> None:
+    rng = np.random.default_rng(7)
+    kinds = list(TransferKind)
+    ops = [
+        TransferOp(kind=kinds[int(k)], src="s", dst="d", length=int(length))
+        for k, length in zip(rng.integers(0, 4, 500), rng.integers(1, 1 << 22, 500))
+    ]
+    release = rng.integers(0, 2_000_000, 500).tolist()
+    config = SimConfig(streams={TransferKind.H2D: 2, TransferKind.D2H: 3, TransferKind.P2P: 1, TransferKind.STORAGE2H: 4})
+    result = simulate_transfers(ops, config, release_ns=np.asarray(release))
+    assert result.finish_ns.tolist() == _reference_finish(ops, config, release)
+    assert (result.start_ns >= np.asarray(release)).all()
+    assert all(0 < u <= 1 for u in result.utilization.values())
+
+
+def test_serial_links_do_not_overlap() -> None:
+    cols = PlanColumns(kind=np.array([0, 3, 0, 3], dtype=np.uint8), length=np.full(4, 1 << 20, dtype=np.int64))
+    overlapped = simulate_transfers(cols, SimConfig(streams=1))
+    serial = simulate_transfers(cols, SimConfig(streams=1, overlap=False))
+    storage_start = serial.start_ns[cols.kind == 3].min()
+    assert storage_start >= serial.finish_ns[cols.kind == 0].max()
+    assert serial.makespan_ns > overlapped.makespan_ns
+
+
+def test_swap_plan_uses_window_deadline() -> None:
+    manifest = weight_manifest("m", "v", [])
+    ops = [TransferOp(kind=TransferKind.STORAGE2H, src="file://a", dst="device://bucket/0", length=7_000_000)] * 3
+    plan = swap_plan("s", manifest, manifest, ops, window=swap_window(1_000, 1_000 + 2_500_000))
+    result = simulate_transfers(plan, SimConfig(streams=1, op_overhead_us=0))
+    assert result.finish_ns.tolist() == [1_000_000, 2_000_000, 3_000_000]
+    assert result.deadline_misses == 1
+    assert abs(result.summary()["prefetch_timeliness"] - 2 / 3) < 1e-9
+
+
+def test_tier_utilization_and_absolute_release() -> None:
+    ops = [
+        TransferOp(kind=TransferKind.H2D, src="tier://node-0/tier1", dst="tier://node-0/tier0", length=1_000_000),
+        TransferOp(kind=TransferKind.D2H, src="tier://node-0/tier0", dst="tier://node-0/tier2", length=1_000_000),
+    ]
+    config = SimConfig(streams=1, op_overhead_us=0)
+    result = simulate_transfers(ops, config, release_ns=np.array([0, 10_000_000]))
+    util = result.tier_utilization
+    assert set(util) == {"tier://node-0/tier0", "tier://node-0/tier1", "tier://node-0/tier2"}
+    assert util["tier://node-0/tier0"] > util["tier://node-0/tier1"]
+    assert all(0 < u <= 1 for u in util.values())
+    summary = result.summary()
+    assert "prefetch_timeliness" not in summary and "tier_util_tier://node-0/tier0" in summary
+
+    epoch = 1_700_000_000_000_000_000
+    shifted = simulate_transfers(ops, config, release_ns=np.array([epoch, epoch + 10_000_000]))
+    assert (shifted.finish_ns - epoch).tolist() == result.finish_ns.tolist()
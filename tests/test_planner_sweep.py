@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("bodocache")
+
+from integration.kv_data_plane import load_runtime_config  # noqa: E402
+from integration.kv_data_plane.sweep import SweepWorkload, apply_overrides, pareto_frontier, run_sweep  # noqa: E402
+
+
+def test_apply_overrides_maps_nested_parameters() -> None:
+    cfg = load_runtime_config()
+    tuned = apply_overrides(cfg, {"alpha": 0.25, "enable_admission": False, "window_ms": 7, "streams_per_tier": 2})
+    assert tuned.popularity.alpha == 0.25
+    assert tuned.ab_flags.enable_admission is False
+    assert tuned.window_ms == 7
+    assert tuned.popularity is not cfg.popularity
+
+
+def test_pareto_frontier_drops_dominated_rows() -> None:
+    df = pd.DataFrame(
+        {
+            "avg_finish_ms": [1.0, 2.0, 1.0, 3.0],
+            "ops": [10, 5, 10, 12],
+            "prefetch_timeliness": [0.9, 0.9, 0.8, 0.5],
+        }
+    )
+    assert sorted(pareto_frontier(df).index) == [0, 1]
+
+
+def test_sweep_resumes_from_partial_results(tmp_path: Path) -> None:
+    space = {"window_ms": [10, 20], "streams_per_tier": [2, 4]}
+    workload = SweepWorkload.synthetic(128)
+    log = tmp_path / "sweep.jsonl"
+    first = run_sweep(space, request_count=128, max_workers=0, results_path=log, workload=workload)
+    assert len(first.trials) == 4 and len(log.read_text().splitlines()) == 4
+    assert not first.frontier.empty
+    again = run_sweep(space, request_count=128, max_workers=0, results_path=log, workload=workload)
+    assert len(log.read_text().splitlines()) == 4
+    assert list(again.trials["trial_id"]) == list(first.trials["trial_id"])
+
+    other_cfg = apply_overrides(load_runtime_config(), {"enable_overlap": False})
+    third = run_sweep(space, request_count=128, max_workers=0, results_path=log, workload=workload, base_cfg=other_cfg)
+    assert len(log.read_text().splitlines()) == 8
+    assert set(third.trials["trial_id"]).isdisjoint(first.trials["trial_id"])
+
+
+def test_sweep_reruns_trials_after_truncated_log(tmp_path: Path) -> None:
+    space = {"window_ms": [10, 20]}
+    workload = SweepWorkload.synthetic(64)
+    log = tmp_path / "sweep.jsonl"
+    first = run_sweep(space, request_count=64, max_workers=0, results_path=log, workload=workload)
+    complete, partial = log.read_text().splitlines()
+    log.write_text(complete + "\n" + partial[: len(partial) // 2])
+    again = run_sweep(space, request_count=64, max_workers=0, results_path=log, workload=workload)
+    assert list(again.trials["trial_id"]) == list(first.trials["trial_id"])
+    assert [json.loads(line)["trial_id"] for line in log.read_text().splitlines()] == list(first.trials["trial_id"])
+
+
+def test_successive_halving_narrows_candidates() -> None:
+    space = {"window_ms": [5, 10, 20], "alpha": [0.5, 1.0, 2.0]}
+    result = run_sweep(space, strategy="halving", request_count=90, eta=3, rounds=2, max_workers=0, workload=SweepWorkload.synthetic(90))
+    assert result.trials.groupby("round").size().tolist() == [9, 3]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bstack_apis import KvPageRef, TransferKind, TransferOp, cache_plan
+from integration.kv_data_plane import PageSet, ResidencyTracker
+
+
+def _op(node: str, tier: int, layer: int, pages: range, src_tier: int = 2) -> TransferOp:
+    refs = [KvPageRef(tensor="kv", page=p, head=0, layer=layer) for p in pages]
+    return TransferOp(kind=TransferKind.H2D, src=f"tier://{node}/tier{src_tier}", dst=f"tier://{node}/tier{tier}", length=len(refs), kv_refs=refs)
+
+
+def test_page_set_spans_containers() -> None:
+    pages = PageSet()
+    values = np.array([0, 5, 63, 64, 65_535, 65_536, 1 << 33])
+    pages.add(values)
+    pages.add([5])
+    assert len(pages) == len(values)
+    assert pages.contains([5, 6, 1 << 33, 65_536, 70_000]).tolist() == [True, False, True, True, False]
+    pages.discard([5, 1 << 33, 123])
+    assert pages.to_array().tolist() == [0, 63, 64, 65_535, 65_536]
+
+
+def test_tracker_filters_resident_requests_and_honours_evictions() -> None:
+    tracker = ResidencyTracker(prefetch_tier=0, page_bytes=1024)
+    tracker.apply(
+        cache_plan(
+            "w0",
+            [_op("node-0", 0, 1, range(10, 20)), _op("node-1", 0, 1, range(30, 32))],
+            prefetch=[KvPageRef(tensor="kv", page=50, head=0, layer=2)],
+        )
+    )
+    req = pd.DataFrame(
+        {
+            "req_id": range(5),
+            "node": ["node-0", "node-0", "node-0", "node-1", "node-0"],
+            "layer": [1, 1, 2, 1, 1],
+            "start_pid": [10, 18, 50, 30, 30],
+            "end_pid": [14, 21, 50, 31, 31],
+        }
+    )
+    kept, report = tracker.filter_requests(req)
+    assert kept["req_id"].tolist() == [1, 2, 4]
+    assert report.filtered_requests == 2
+    assert report.avoided_bytes == (5 + 2) * 1024
+    assert report.resident_pages == 5 + 2 + 2
+
+    tracker.apply(cache_plan("w1", [], evict=[KvPageRef(tensor="kv", page=12, head=0, layer=1)]))
+    kept, report = tracker.filter_requests(req)
+    assert kept["req_id"].tolist() == [0, 1, 2, 4]
+    assert tracker.stats()["avoided_bytes"] == float((7 + 2) * 1024)
+    assert 12 not in tracker.resident_pages("node-0", 0, 1).tolist()
+
+
+def test_ops_move_pages_between_tiers() -> None:
+    tracker = ResidencyTracker(prefetch_tier=0)
+    admitted = [KvPageRef(tensor="kv", page=p, head=0, layer=0) for p in (3, 4)]
+    tracker.apply(cache_plan("w0", [_op("node-0", 1, 0, range(0, 6))], prefetch=admitted))
+    assert tracker.resident_pages("node-0", 1, 0).tolist() == [0, 1, 2, 3, 4, 5]
+    assert tracker.resident_pages("node-0", 0, 0).size == 0
+
+    tracker.apply(cache_plan("w1", [_op("node-0", 0, 0, range(3, 5), src_tier=1)]))
+    assert tracker.resident_pages("node-0", 1, 0).tolist() == [0, 1, 2, 5]
+    assert tracker.resident_pages("node-0", 0, 0).tolist() == [3, 4]
+    assert tracker.filter_requests(pd.DataFrame({"layer": [0, 0], "start_pid": [3, 0], "end_pid": [4, 1]}))[1].filtered_requests == 1
+
+
+def test_build_cache_plan_skips_requests_resident_from_previous_window() -> None:
+    pytest.importorskip("bodocache")
+    from integration.kv_data_plane import build_cache_plan, load_runtime_config, synthetic_window_inputs
+
+    cfg = load_runtime_config()
+    inputs = synthetic_window_inputs(cfg, request_count=200)
+    probe = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs)
+    tracker = ResidencyTracker(prefetch_tier=int(probe.plan_df["tier_dst"].mode().iloc[0]))
+
+    first = build_cache_plan(now_ms=1_000, cfg=cfg, inputs=inputs, residency=tracker)
+    assert first.residency is not None and first.residency.filtered_requests == 0
+    second = build_cache_plan(now_ms=1_020, cfg=cfg, inputs=inputs, residency=tracker)
+    assert second.residency is not None and second.residency.filtered_requests > 0
+    assert second.residency.avoided_bytes == tracker.avoided_bytes > 0
+    assert second.plan_df["bytes"].sum() < first.plan_df["bytes"].sum()
+    assert tracker.plans_applied == 2
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from bstack_apis import SwapWindow, swap_plan, weight_manifest
+from integration.runtime_waves import WaveBufferPool, WaveSubmitter, aligned_empty, run_wave_benchmark, swap_range_for_window
+
+
+class _RecordingRuntime:
+    def __init__(self) -> None:
+        self.outstanding: set[int] = set()
+        self.max_outstanding = 0
+        self.pointers: set[tuple[int, int, int]] = set()
+        self._next = 0
+
+    def submit_wave(self, spec, a_ptr: int, b_ptr: int, c_ptr: int) -> int:
+        self._next += 1
+        self.outstanding.add(self._next)
+        self.max_outstanding = max(self.max_outstanding, len(self.outstanding))
+        self.pointers.add((a_ptr, b_ptr, c_ptr))
+        return self._next
+
+    def wait(self, event: int, timeout_ms: int = 0) -> None:
+        self.outstanding.remove(event)
+
+
+def test_aligned_empty_respects_alignment() -> None:
+    arr = aligned_empty((3, 5), alignment=128)
+    assert arr.ctypes.data % 128 == 0
+    assert arr.shape == (3, 5)
+
+
+def test_submitter_bounds_inflight_and_reuses_pool() -> None:
+    runtime = _RecordingRuntime()
+    pool = WaveBufferPool(4, bm=2, bn=2, bk=2)
+    submitter = WaveSubmitter(runtime, pool, max_inflight=3, spec_factory=SimpleNamespace)
+    stats = submitter.run(50, swap_range=(2, 7))
+    assert stats.waves == 50
+    assert stats.latencies_us.size == 50
+    assert runtime.max_outstanding == 3
+    assert not runtime.outstanding
+    assert len(runtime.pointers) <= 4
+    assert pool.available == 4
+    assert set(stats.percentiles()) == {"p50_us", "p95_us", "p99_us"}
+
+
+def test_submitter_rejects_inflight_beyond_pool() -> None:
+    with pytest.raises(ValueError):
+        WaveSubmitter(_RecordingRuntime(), WaveBufferPool(2, bm=1, bn=1, bk=1), max_inflight=3, spec_factory=SimpleNamespace)
+
+
+def test_swap_range_for_window_clamps_to_run() -> None:
+    window = SwapWindow(t_start_ns=1_000, t_deadline_ns=9_500)
+    assert swap_range_for_window(window, t0_ns=0, wave_ns=1_000, total_waves=100) == (1, 10)
+    assert swap_range_for_window(window, t0_ns=5_000, wave_ns=1_000, total_waves=3) == (0, 3)
+
+
+def test_benchmark_swap_range_follows_plan_window() -> None:
+    manifest = weight_manifest("m", "v", [])
+
+    def run(window: SwapWindow, **kw) -> tuple[float, float]:
+        plan = swap_plan("s", manifest, manifest, [], window=window)
+        report = run_wave_benchmark(_RecordingRuntime(), waves=20, bm=1, bn=1, bk=1, pool_size=4, max_inflight=2, swap_plan=plan, spec_factory=SimpleNamespace, **kw)
+        return report["swap_begin"], report["swap_end"]
+
+    assert run(SwapWindow(t_start_ns=5_000, t_deadline_ns=9_000), t0_ns=0, wave_ns=500.0) == (10.0, 18.0)
+    # Default t0 is the start of the measured run: a window 10.5-15.5 s ahead lands on waves [10, 16).
+    now = time.time_ns()
+    assert run(SwapWindow(t_start_ns=now + 10_500_000_000, t_deadline_ns=now + 15_500_000_000), wave_ns=1e9) == (10.0, 16.0)
+    assert run(SwapWindow(t_start_ns=now + 60_000_000_000, t_deadline_ns=now + 70_000_000_000), wave_ns=1e9) == (20.0, 20.0)
+    assert run(SwapWindow(t_start_ns=1, t_deadline_ns=2)) == (0.0, 0.0)
+    with pytest.raises(ValueError, match="wave_ns"):
+        run(SwapWindow(t_start_ns=1, t_deadline_ns=2), warmup=0)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from bstack_apis import FileChunk, TransferKind, TransferOp
+from integration.weight_swapper import (
+    STAGING_SCHEME,
+    HostStagingCache,
+    bucket_ops,
+    diff_manifests,
+    manifest_frame,
+    rollback_items,
+    swap_ops,
+    to_weight_manifest,
+)
+from integration.workloads import CheckpointSpec, generate_checkpoint_pair
+
+
+@pytest.fixture(scope="module")
+def checkpoints(tmp_path_factory):
+    pytest.importorskip("hotweights")
+    spec = CheckpointSpec(shards=64, shard_bytes=4096, shards_per_dir=16, changed_fraction=0.1, change_bytes=256, seed=1)
+    return generate_checkpoint_pair(tmp_path_factory.mktemp("ckpt"), spec)
+
+
+def test_lean_swap_plan_drops_buckets_but_keeps_ir(checkpoints) -> None:
+    from integration.weight_swapper import build_swap_plan
+
+    full = build_swap_plan(checkpoints.prev_dir, checkpoints.next_dir, deadline_ns=10**12)
+    lean = build_swap_plan(checkpoints.prev_dir, checkpoints.next_dir, deadline_ns=10**12, lean=True)
+    assert full.buckets and not lean.buckets
+    assert lean.bucket_stats == full.bucket_stats
+    assert sum(b["items"] for b in full.bucket_stats) == len(full.plan.ops) == int(checkpoints.shards["changed"].sum())
+    assert [(op.src, op.length) for op in lean.plan.ops] == [(op.src, op.length) for op in full.plan.ops]
+    assert lean.plan.manifest_to is lean.next_manifest
+
+
+def _manifest(root: str, hashes: dict[str, str]) -> dict:
+    tensors = [{"name": name, "shards": [{"uri": f"file://{root}/{name}.bin", "bytes": 8, "hash": h}]} for name, h in hashes.items()]
+    return {"model_id": "m", "version": root, "tensors": tensors}
+
+
+def test_to_weight_manifest_matches_shard_order() -> None:
+    manifest = _manifest("/ckpt/a", {"w0": "aa", "w1": "bb"})
+    wm = to_weight_manifest(manifest)
+    assert (wm.model_id, wm.version) == ("m", "/ckpt/a")
+    assert wm.files == [FileChunk("/ckpt/a/w0.bin", 0, 8, "aa"), FileChunk("/ckpt/a/w1.bin", 0, 8, "bb")]
+
+
+def test_diff_manifests_classifies_by_relative_path() -> None:
+    prev = manifest_frame(_manifest("/ckpt/a", {"same": "1", "edit": "2", "gone": "3"}), root="/ckpt/a")
+    next_ = manifest_frame(_manifest("/ckpt/b", {"same": "1", "edit": "9", "new": "4"}), root="/ckpt/b")
+    diff = diff_manifests(prev, next_)
+    assert list(zip(diff["rel_path"], diff["status"])) == [("edit.bin", "changed"), ("new.bin", "added"), ("gone.bin", "removed")]
+    assert diff["path"].tolist()[:2] == ["/ckpt/b/edit.bin", "/ckpt/b/new.bin"]
+
+
+def test_bucket_ops_and_swap_ops_agree() -> None:
+    buckets = [
+        {"bucket_id": 0, "items": [{"uri": "file:///x", "nbytes": 4, "offset": 0, "tensor": "t", "shard_rank": 1}]},
+        {"bucket_id": 3, "items": [{"uri": "file:///y", "nbytes": 6, "offset": 2, "tensor": "u", "shard_rank": 0}]},
+    ]
+    expected = [
+        TransferOp(TransferKind.STORAGE2H, "file:///x", "device://bucket/0", 4, 0, 0, [], "tensor=t shard=1 bucket=0 offset=0"),
+        TransferOp(TransferKind.STORAGE2H, "file:///y", "device://bucket/3", 6, 2, 2, [], "tensor=u shard=0 bucket=3 offset=2"),
+    ]
+    assert bucket_ops(buckets) == expected
+    items = pd.DataFrame(
+        {"bucket_id": [0, 3], "uri": ["file:///x", "file:///y"], "nbytes": [4, 6], "offset": [0, 2], "tensor": ["t", "u"], "shard_rank": [1, 0]}
+    )
+    assert swap_ops(items) == expected
+    assert bucket_ops([]) == [] and swap_ops(items.iloc[:0]) == []
+
+
+def test_rollback_plan_restores_displaced_prev_shards(checkpoints) -> None:
+    from integration.weight_swapper import build_swap_plan
+
+    result = build_swap_plan(checkpoints.prev_dir, checkpoints.next_dir, deadline_ns=10**12, rollback=True)
+    reverse = result.rollback
+    assert reverse is not None
+    assert (reverse.manifest_from, reverse.manifest_to) == (result.next_manifest, result.prev_manifest)
+    changed = checkpoints.shards.loc[checkpoints.shards["changed"], "path"].tolist()
+    assert [op.src for op in reverse.ops] == [f"file://{checkpoints.prev_dir}/{p}" for p in changed]
+    assert all(op.kind is TransferKind.STORAGE2H for op in reverse.ops)
+    assert (reverse.window.t_start_ns, reverse.window.t_deadline_ns) == (0, 5_000_000_000)
+    stamped = result.rollback_plan(now_ns=10**15)
+    assert (stamped.window.t_start_ns, stamped.window.t_deadline_ns) == (10**15, 10**15 + 5_000_000_000)
+    assert stamped.ops == reverse.ops
+    assert build_swap_plan(checkpoints.prev_dir, checkpoints.next_dir).rollback is None
+
+
+def test_rollback_resolves_relative_roots(checkpoints, monkeypatch) -> None:
+    from integration.weight_swapper import build_swap_plan
+
+    monkeypatch.chdir(checkpoints.prev_dir.parent)
+    result = build_swap_plan(checkpoints.prev_dir.name, checkpoints.next_dir.name, rollback=True)
+    changed = checkpoints.shards.loc[checkpoints.shards["changed"], "path"].tolist()
+    assert [op.src for op in result.rollback.ops] == [f"file://{checkpoints.prev_dir}/{p}" for p in changed]
+
+
+def test_rollback_items_keep_prev_shard_ranks() -> None:
+    def manifest(root: str, digest: str) -> dict:
+        shards = [{"uri": f"file://{root}/s{i}.bin", "bytes": 10, "hash": f"{digest}{i}", "rank": i % 2} for i in range(4)]
+        return {"tensors": [{"name": f"t{i}", "shards": [shard]} for i, shard in enumerate(shards)]}
+
+    items = rollback_items(manifest_frame(manifest("/a", "x"), root="/a"), manifest_frame(manifest("/b", "y"), root="/b"), bucket_bytes=20)
+    assert items["shard_rank"].tolist() == [0, 1, 0, 1]
+    assert items["bucket_id"].tolist() == [0, 0, 1, 1]
+
+
+def test_staged_rollback_reads_from_host_cache(checkpoints, tmp_path) -> None:
+    from integration.weight_swapper import build_swap_plan
+
+    cache = HostStagingCache(3 * 4096, directory=tmp_path / "stage")
+    reverse = build_swap_plan(checkpoints.prev_dir, checkpoints.next_dir, staging=cache).rollback
+    staged = [op for op in reverse.ops if op.kind is TransferKind.H2D]
+    assert len(staged) == 3 and len(reverse.ops) > 3
+    path = staged[0].src[len(STAGING_SCHEME) :]
+    assert bytes(cache.get(path, 0, 4096)) == Path(path).read_bytes()
+
+    cache.discard(path, 0, 4096)
+    resolved = cache.resolve(reverse)
+    assert resolved.ops[0].kind is TransferKind.STORAGE2H and resolved.ops[0].src == f"file://{path}"
+    assert sum(op.kind is TransferKind.H2D for op in resolved.ops) == 2
+
+
+def test_staging_cache_evicts_least_recently_used(tmp_path) -> None:
+    for name in "abc":
+        (tmp_path / name).write_bytes(name.encode() * 10)
+    cache = HostStagingCache(20)
+    assert cache.stage(str(tmp_path / "a"), 0, 10) and cache.stage(str(tmp_path / "b"), 0, 10)
+    assert cache.get(str(tmp_path / "a"), 0, 10) is not None
+    assert cache.stage(str(tmp_path / "c"), 2, 8)
+    assert (str(tmp_path / "b"), 0, 10) not in cache
+    assert bytes(cache.get(str(tmp_path / "c"), 2, 8)) == b"c" * 8
+    assert not cache.stage(str(tmp_path / "a"), 0, 21) and cache.used_bytes == 18
+    assert cache.stats()["evictions"] == 1.0
+
+
+def test_staging_cache_pins_chunks_with_live_views(tmp_path) -> None:
+    for name in "abcd":
+        (tmp_path / name).write_bytes(name.encode() * 20)
+    cache = HostStagingCache(20, directory=tmp_path / "stage")
+    a, b, c, d = (str(tmp_path / name) for name in "abcd")
+    assert cache.stage(a, 0, 10) and cache.stage(b, 0, 10)
+    view = cache.get(a, 0, 10)
+    assert cache.stage(c, 0, 10)
+    assert (a, 0, 10) in cache and (b, 0, 10) not in cache
+    with pytest.raises(BufferError):
+        cache.discard(a, 0, 10)
+    assert not cache.stage(d, 0, 20)
+    assert (c, 0, 10) in cache and cache.used_bytes == 20 and cache.stats()["evictions"] == 1.0
+    assert not cache.stage(d, 0, 15)
+    assert (c, 0, 10) in cache and cache.used_bytes == 20
+    assert cache.stage(d, 0, 5)
+    assert (c, 0, 10) not in cache and cache.used_bytes == 15
+    cache.discard(d, 0, 5)
+    assert bytes(view) == b"a" * 10
+    with pytest.raises(BufferError):
+        cache.clear()
+    assert len(cache) == 1 and cache.used_bytes == 10
+    view.release()
+    cache.clear()
+    assert len(cache) == 0 and not list((tmp_path / "stage").iterdir())
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from integration.workloads import CheckpointSpec, WorkloadSpec, generate_checkpoint_pair, generate_requests, iter_windows
+
+
+def test_request_stream_is_deterministic_and_shaped() -> None:
+    spec = WorkloadSpec(requests=200_000, tenants=4, tenant_weights=[0.7, 0.1, 0.1, 0.1], prefixes=400, prefix_zipf=1.2, layers=8, nodes=2, seed=7)
+    df = generate_requests(spec)
+    pd.testing.assert_frame_equal(df, generate_requests(spec))
+    assert not generate_requests(WorkloadSpec(requests=1000, seed=8)).equals(generate_requests(WorkloadSpec(requests=1000, seed=7)))
+
+    assert len(df) == spec.requests and df["arrival_ms"].is_monotonic_increasing
+    assert df["arrival_ms"].iloc[-1] == spec.duration_ms
+    assert abs((df["tenant"] == 0).mean() - 0.7) < 0.01
+    assert ((df["prefix_id"] % spec.tenants) == df["tenant"]).all()
+    assert (df["context_tokens"].between(1, spec.max_context_tokens)).all()
+    assert (df["end_pid"] - df["start_pid"] + 1 == -(-df["context_tokens"] // spec.page_tokens)).all()
+    # Zipf: the head prefix of tenant 0 is far more popular than its median prefix.
+    counts = df.loc[df["tenant"] == 0, "prefix_id"].value_counts()
+    assert counts.iloc[0] > 20 * counts.median()
+    assert set(df["node"].unique()) == {"node-0", "node-1"}
+
+
+def test_burstiness_controls_arrival_gap_variation() -> None:
+    def gap_cv(burstiness: float) -> float:
+        gaps = np.diff(generate_requests(WorkloadSpec(requests=50_000, burstiness=burstiness))["arrival_ms"].to_numpy())
+        return float(gaps.std() / gaps.mean())
+
+    assert abs(gap_cv(1.0) - 1.0) < 0.05
+    assert gap_cv(4.0) > 3.0
+    assert gap_cv(0.1) < 0.2
+
+
+def test_iter_windows_partitions_by_arrival() -> None:
+    df = generate_requests(WorkloadSpec(requests=10_000, duration_ms=1_000.0))
+    windows = list(iter_windows(df, 100.0))
+    assert sum(len(w) for _, w in windows) == len(df)
+    for start, w in windows:
+        assert w["arrival_ms"].between(start, start + 100.0, inclusive="left").all()
+
+
+def test_checkpoint_pair_changes_controlled_bytes(tmp_path) -> None:
+    spec = CheckpointSpec(shards=300, shard_bytes=8192, shards_per_dir=64, changed_fraction=0.05, change_bytes=1024, seed=3)
+    pair = generate_checkpoint_pair(tmp_path, spec)
+    summary = pair.summary()
+    assert summary["shards"] == 300 and summary["changed_shards"] == 120
+    assert summary["changed_fraction"] == 0.05
+
+    digests = set()
+    for row in pair.shards.itertuples(index=False):
+        prev = (pair.prev_dir / row.path).read_bytes()
+        nxt = (pair.next_dir / row.path).read_bytes()
+        assert len(prev) == len(nxt) == spec.shard_bytes
+        diff = np.flatnonzero(np.frombuffer(prev, np.uint8) != np.frombuffer(nxt, np.uint8))
+        if row.changed:
+            assert diff.size and diff.min() >= row.change_offset and diff.max() < row.change_offset + row.changed_bytes
+        else:
+            assert diff.size == 0
+        digests.add(hashlib.sha256(prev).hexdigest())
+    assert len(digests) == 300
+
+    again = generate_checkpoint_pair(tmp_path / "again", spec)
+    pd.testing.assert_frame_equal(pair.shards, again.shards)
+
+
+def test_checkpoint_pair_stacks_spans_for_large_fractions(tmp_path) -> None:
+    spec = CheckpointSpec(shards=8, shard_bytes=65536, shards_per_dir=8, changed_fraction=0.5, change_bytes=4096, seed=2)
+    pair = generate_checkpoint_pair(tmp_path, spec)
+    assert pair.summary()["changed_fraction"] == 0.5 and pair.summary()["changed_shards"] == 8
+    for row in pair.shards.itertuples(index=False):
+        prev = np.frombuffer((pair.prev_dir / row.path).read_bytes(), np.uint8)
+        nxt = np.frombuffer((pair.next_dir / row.path).read_bytes(), np.uint8)
+        assert int((prev != nxt).sum()) == row.changed_bytes == 8 * 4096
+    with pytest.raises(ValueError, match="spans"):
+        generate_checkpoint_pair(tmp_path / "full", CheckpointSpec(shards=8, shard_bytes=65536, changed_fraction=1.0, change_bytes=4096))